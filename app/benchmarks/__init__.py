@@ -0,0 +1,3 @@
+"""
+Benchmarks for the task manager, run against a throwaway test database.
+"""
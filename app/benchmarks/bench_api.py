@@ -0,0 +1,123 @@
+"""
+Benchmark the task and user API endpoints against a seeded database.
+
+Requests go through the whole Django stack in-process, without a network
+or an application server in front.
+
+Usage:
+    python -m benchmarks.bench_api --tasks 100000 --repeat 200 --keepdb \\
+        --save baseline.json
+    python -m benchmarks.bench_api --keepdb --compare baseline.json
+"""
+
+import argparse
+import itertools
+
+from benchmarks import utils
+
+utils.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext,
+    setup_test_environment,
+)
+from django.urls import reverse  # noqa: E402
+
+from rest_framework.authtoken.models import Token  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from core.management.commands.seed_tasks import SEED_PASSWORD  # noqa: E402
+from core.models import Task, User  # noqa: E402
+
+
+TASK_URL = reverse("task:task-list")
+TOKEN_URL = reverse("user:token")
+SAMPLE_TASKS = 1000
+
+
+def detail_url(task_id):
+    """Create and return a task detail URL."""
+    return reverse("task:task-detail", args=[task_id])
+
+
+def get_endpoints(client, user):
+    """Return (label, request) pairs of the benchmarked endpoints."""
+    task_ids = itertools.cycle(
+        Task.objects.order_by("?").values_list("id", flat=True)[:SAMPLE_TASKS]
+    )
+    statuses = itertools.cycle(["new", "in_progress", "done"])
+    credentials = {"email": user.email, "password": SEED_PASSWORD}
+
+    return [
+        ("GET /api/task/tasks/", lambda: client.get(TASK_URL)),
+        (
+            "GET /api/task/tasks/?status=done",
+            lambda: client.get(TASK_URL, {"status": "done"}),
+        ),
+        ("GET /api/task/tasks/{id}/", lambda: client.get(detail_url(next(task_ids)))),
+        (
+            "PATCH /api/task/tasks/{id}/",
+            lambda: client.patch(
+                detail_url(next(task_ids)), {"status": next(statuses)}
+            ),
+        ),
+        ("POST /api/user/token/", lambda: client.post(TOKEN_URL, credentials)),
+    ]
+
+
+def count_queries(request):
+    """Return the number of queries a request runs."""
+    with CaptureQueriesContext(connection) as queries:
+        res = request()
+    if res.status_code >= 400:
+        raise RuntimeError(f"Request failed with {res.status_code}: {res.content}")
+
+    return len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--assignees-per-task", type=int, default=2)
+    parser.add_argument("--history-per-task", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--keepdb", action="store_true")
+    parser.add_argument("--save", help="Write the results to a JSON baseline.")
+    parser.add_argument("--compare", help="Compare the results to a JSON baseline.")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    with utils.benchmark_database(keepdb=args.keepdb):
+        if Task.objects.count() < args.tasks:
+            call_command(
+                "seed_tasks",
+                users=args.users,
+                tasks=args.tasks - Task.objects.count(),
+                assignees_per_task=args.assignees_per_task,
+                history_per_task=args.history_per_task,
+            )
+        print(f"{User.objects.count()} users, {Task.objects.count()} tasks\n")
+
+        user = User.objects.filter(email__startswith="seed").order_by("id").first()
+        token, _ = Token.objects.get_or_create(user=user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        results = []
+        for label, request in get_endpoints(client, user):
+            queries = count_queries(request)
+            summary = utils.summarize(utils.measure(request, args.repeat))
+            results.append((label, {**summary, "queries": queries}))
+
+        utils.print_table(results)
+        if args.save:
+            utils.save_results(args.save, results)
+        if args.compare:
+            utils.compare_results(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
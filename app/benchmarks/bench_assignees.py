@@ -0,0 +1,106 @@
+"""
+Benchmark list queries on the denormalized assignee columns against joining
+the assignees.
+
+Each pair reads one page of the task list: filtered by assignee, sorted by
+first assignee email, or with the assignee ids of every task.
+
+Usage:
+    python -m benchmarks.bench_assignees --tasks 1000000 --repeat 50 --keepdb
+"""
+
+import argparse
+
+from benchmarks import utils
+
+utils.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.contrib.postgres.expressions import ArraySubquery  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db.models import OuterRef, Subquery  # noqa: E402
+
+from core.models import Task  # noqa: E402
+
+
+PAGE_SIZE = 50
+
+
+def get_queries(user_id):
+    """Return (label, query) pairs joining the assignees then not."""
+    through = Task.assigned_to.through
+    first_email = (
+        get_user_model()
+        .objects.filter(tasks_assigned=OuterRef("pk"))
+        .order_by("email")
+        .values("email")[:1]
+    )
+    assignee_ids = ArraySubquery(
+        through.objects.filter(task_id=OuterRef("pk"))
+        .order_by("user_id")
+        .values("user_id")
+    )
+    return [
+        (
+            "filter assignee, join",
+            Task.objects.filter(assigned_to__id=user_id).order_by("-id"),
+        ),
+        (
+            "filter assignee, array",
+            Task.objects.filter(assignee_ids__contains=[user_id]).order_by("-id"),
+        ),
+        (
+            "sort first assignee, subquery",
+            Task.objects.annotate(email=Subquery(first_email)).order_by("email", "id"),
+        ),
+        (
+            "sort first assignee, column",
+            Task.objects.order_by("primary_assignee_email", "id"),
+        ),
+        (
+            "assignee ids, subquery",
+            Task.objects.annotate(ids=assignee_ids).order_by("-id").values("ids"),
+        ),
+        (
+            "assignee ids, column",
+            Task.objects.order_by("-id").values("assignee_ids"),
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--assignees-per-task", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    with utils.benchmark_database(keepdb=args.keepdb):
+        if Task.objects.count() < args.tasks:
+            call_command(
+                "seed_tasks",
+                users=args.users,
+                tasks=args.tasks - Task.objects.count(),
+                assignees_per_task=args.assignees_per_task,
+                history_per_task=0,
+            )
+        print(f"{Task.objects.count()} tasks\n")
+
+        user_id = Task.assigned_to.through.objects.values_list(
+            "user_id", flat=True
+        ).first()
+        results = []
+        for label, queryset in get_queries(user_id):
+            page = queryset[:PAGE_SIZE]
+            summary = utils.summarize(
+                utils.measure(lambda: list(page.all()), args.repeat)
+            )
+            results.append((label, summary))
+
+        utils.print_table(results)
+
+
+if __name__ == "__main__":
+    main()
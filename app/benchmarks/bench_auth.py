@@ -0,0 +1,67 @@
+"""
+Benchmark token authentication with and without the token cache.
+
+Usage:
+    python -m benchmarks.bench_auth --repeat 500 --keepdb
+"""
+
+import argparse
+
+from benchmarks import utils
+
+utils.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext,
+    setup_test_environment,
+)
+from django.urls import reverse  # noqa: E402
+
+from rest_framework.authentication import TokenAuthentication  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from user.authentication import CachedTokenAuthentication  # noqa: E402
+from user.views import ManagerUserView  # noqa: E402
+
+
+ME_URL = reverse("user:me")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    with utils.benchmark_database(keepdb=args.keepdb):
+        user, _ = get_user_model().objects.get_or_create(email="bench@example.com")
+        token, _ = Token.objects.get_or_create(user=user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        results = []
+        for authentication in (TokenAuthentication, CachedTokenAuthentication):
+            ManagerUserView.authentication_classes = [authentication]
+            client.get(ME_URL)
+            with CaptureQueriesContext(connection) as queries:
+                client.get(ME_URL)
+            query_count = len(queries)
+            summary = utils.summarize(
+                utils.measure(lambda: client.get(ME_URL), args.repeat)
+            )
+            results.append(
+                (
+                    f"me/ with {authentication.__name__}",
+                    {**summary, "queries": query_count},
+                )
+            )
+
+        utils.print_table(results)
+
+
+if __name__ == "__main__":
+    main()
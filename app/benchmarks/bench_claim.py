@@ -0,0 +1,110 @@
+"""
+Benchmark claiming tasks with a growing number of parallel workers.
+
+Each round queues new tasks and lets every worker, a forked process with
+its own connection, claim batches and spend ``--work-ms`` on each like a
+worker processing it, until none are left. Claims skip the tasks locked by
+other workers instead of waiting on them, so throughput grows with the
+workers until the CPUs are busy, and no task is claimed twice.
+
+Usage:
+    python -m benchmarks.bench_claim --tasks 2000 --limit 5 --workers 1 2 4 8
+"""
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks import utils
+
+utils.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from rest_framework.test import APIClient  # noqa: E402
+
+from core.models import Task, User  # noqa: E402
+
+
+CLAIM_URL = reverse("task:task-claim")
+
+
+def claim_all(user, limit, work_ms):
+    """Claim and work on tasks as a user until none are left."""
+    client = APIClient()
+    client.force_authenticate(user)
+    claimed = []
+    try:
+        while True:
+            res = client.post(f"{CLAIM_URL}?status=new&limit={limit}")
+            if not res.data:
+                return claimed
+            claimed += [task["id"] for task in res.data]
+            time.sleep(work_ms / 1000)
+    finally:
+        connection.close()
+
+
+def run_round(workers, tasks, limit, work_ms):
+    """Queue tasks, claim them with the workers and return the results."""
+    Task.objects.bulk_create(Task(name=f"Job {i}") for i in range(tasks))
+    # Forked workers open their own connections.
+    connection.close()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        len(workers), mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        claims = list(
+            executor.map(
+                claim_all,
+                workers,
+                [limit] * len(workers),
+                [work_ms] * len(workers),
+            )
+        )
+    elapsed = time.perf_counter() - start
+
+    claimed = [task_id for ids in claims for task_id in ids]
+    return {
+        "claimed": len(claimed),
+        "duplicates": len(claimed) - len(set(claimed)),
+        "seconds": elapsed,
+        "throughput": len(claimed) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--work-ms", type=float, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    with utils.benchmark_database(keepdb=args.keepdb):
+        users = [
+            User.objects.get_or_create(email=f"claim-worker{i}@example.com")[0]
+            for i in range(max(args.workers))
+        ]
+        print(
+            f"{'workers':>7} {'claimed':>8} {'duplicates':>10} {'seconds':>8} "
+            f"{'tasks/s':>8} {'speedup':>8}"
+        )
+        base = None
+        for count in args.workers:
+            result = run_round(users[:count], args.tasks, args.limit, args.work_ms)
+            base = base or result["throughput"]
+            print(
+                f"{count:>7} {result['claimed']:>8} {result['duplicates']:>10} "
+                f"{result['seconds']:>8.2f} {result['throughput']:>8.1f} "
+                f"{result['throughput'] / base:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
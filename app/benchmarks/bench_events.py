@@ -0,0 +1,189 @@
+"""
+Load test how many idle subscribers one ASGI worker holds on the task events
+stream.
+
+A single uvicorn worker is started on a test database. Subscribers are
+opened in steps, then a task is created and the time until every subscriber
+received its event is measured, along with the memory of the worker.
+
+Usage:
+    python -m benchmarks.bench_events --steps 100 1000 5000 --keepdb
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+from benchmarks import utils
+
+utils.setup()
+
+from asgiref.sync import sync_to_async  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from core.models import Task  # noqa: E402
+
+
+EVENTS_URL = reverse("task:events")
+HOST = "127.0.0.1"
+CONNECT_BATCH = 100
+
+
+def raise_open_files_limit():
+    """Allow this process and the worker to open as many sockets as allowed."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def start_worker(port, database):
+    """Start one uvicorn worker on a database and wait for it to listen."""
+    env = {**os.environ, "DB_NAME": database}
+    worker = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "config.asgi:application",
+            "--host",
+            HOST,
+            "--port",
+            str(port),
+            "--workers",
+            "1",
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=1).close()
+            return worker
+        except OSError:
+            time.sleep(0.1)
+
+    worker.kill()
+    raise RuntimeError("The worker did not start.")
+
+
+def worker_memory(worker):
+    """Return the resident memory of the worker in megabytes."""
+    with open(f"/proc/{worker.pid}/status") as file:
+        for line in file:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def subscribe(port, token):
+    """Open the events stream and return its reader once it is ready."""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(
+        f"GET {EVENTS_URL} HTTP/1.1\r\nHost: {HOST}\r\n"
+        f"Authorization: Token {token}\r\n\r\n".encode()
+    )
+    await reader.readuntil(b"event: ready")
+    return reader, writer
+
+
+async def wait_for_event(reader, started):
+    """Return the milliseconds until the next task event is received."""
+    await reader.readuntil(b"event: created")
+    return (time.perf_counter() - started) * 1000
+
+
+async def run_steps(worker, port, token, steps, timeout):
+    """Open subscribers step by step and measure the fan out of one event."""
+    user = await Token.objects.select_related("user").aget(key=token)
+    subscribers = []
+    results = []
+    for step in steps:
+        started = time.perf_counter()
+        try:
+            while len(subscribers) < step:
+                batch = min(CONNECT_BATCH, step - len(subscribers))
+                subscribers += await asyncio.wait_for(
+                    asyncio.gather(*(subscribe(port, token) for _ in range(batch))),
+                    timeout,
+                )
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as error:
+            print(f"Stopped at {len(subscribers)} subscribers: {error!r}")
+            break
+        connect_time = time.perf_counter() - started
+
+        rss = worker_memory(worker)
+
+        started = time.perf_counter()
+        await Task.objects.acreate(user=user.user, name="Bench")
+        latencies = await asyncio.wait_for(
+            asyncio.gather(
+                *(wait_for_event(reader, started) for reader, _ in subscribers)
+            ),
+            timeout,
+        )
+        results.append((step, connect_time, rss, utils.summarize(latencies)))
+
+    for _, writer in subscribers:
+        writer.close()
+    await sync_to_async(connections.close_all)()
+    return results
+
+
+def print_results(results, baseline):
+    """Print the fan out latency and worker memory of every step."""
+    print(
+        f"{'subscribers':>11} {'connect':>9} {'p50':>9} {'p95':>9} {'p99':>9} "
+        f"{'rss':>9} {'per sub':>9}"
+    )
+    for step, connect_time, rss, summary in results:
+        print(
+            f"{step:>11} {connect_time:>8.2f}s "
+            + " ".join(f"{summary[key]:>7.2f}ms" for key in ("p50", "p95", "p99"))
+            + f" {rss:>7.1f}MB {(rss - baseline) * 1024 / step:>7.1f}KB"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--steps", type=int, nargs="+", default=[100, 500, 1000, 2000, 5000]
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    limit = raise_open_files_limit()
+    if max(args.steps) + 100 > limit:
+        print(f"Open files are limited to {limit}, later steps may fail.")
+
+    with utils.benchmark_database(keepdb=args.keepdb) as connection:
+        user, _ = get_user_model().objects.get_or_create(email="bench@example.com")
+        token, _ = Token.objects.get_or_create(user=user)
+
+        worker = start_worker(args.port, connection.settings_dict["NAME"])
+        try:
+            baseline = worker_memory(worker)
+            results = asyncio.run(
+                run_steps(worker, args.port, token.key, args.steps, args.timeout)
+            )
+        finally:
+            worker.terminate()
+            worker.wait()
+
+        print_results(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
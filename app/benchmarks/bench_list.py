@@ -0,0 +1,79 @@
+"""
+Benchmark building the task list from rows against serializing tasks.
+
+Both paths read the same tasks and render them to the same JSON. The
+serializer path prefetches the assignees as model instances and runs
+``TaskSerializer``; the rows path reads dicts with ``values()`` and the
+assignee ids aggregated by the same query.
+
+Usage:
+    python -m benchmarks.bench_list --rows 1000 10000 100000 --repeat 10 --keepdb
+"""
+
+import argparse
+
+from benchmarks import utils
+
+utils.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db.models import Prefetch  # noqa: E402
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from core.models import Task  # noqa: E402
+from task import listing  # noqa: E402
+from task.serializers import TaskSerializer  # noqa: E402
+
+
+def serialize(size):
+    """Return the JSON of ``size`` tasks serialized by ``TaskSerializer``."""
+    users = get_user_model().objects.order_by("id")
+    tasks = Task.objects.order_by("-id").prefetch_related(
+        Prefetch("assigned_to", users)
+    )[:size]
+    return JSONRenderer().render(TaskSerializer(tasks, many=True).data)
+
+
+def build(size):
+    """Return the JSON of ``size`` tasks built from rows."""
+    values = listing.list_values(Task.objects.order_by("-id"))[:size]
+    return JSONRenderer().render(listing.build_rows(values))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--assignees-per-task", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    with utils.benchmark_database(keepdb=args.keepdb):
+        if Task.objects.count() < max(args.rows):
+            call_command(
+                "seed_tasks",
+                users=args.users,
+                tasks=max(args.rows) - Task.objects.count(),
+                assignees_per_task=args.assignees_per_task,
+                history_per_task=0,
+            )
+        print(f"{Task.objects.count()} tasks\n")
+
+        results = []
+        for size in args.rows:
+            if serialize(size) != build(size):
+                raise RuntimeError(f"The outputs of {size} rows differ.")
+            for label, func in (("serializer", serialize), ("rows", build)):
+                summary = utils.summarize(
+                    utils.measure(lambda: func(size), args.repeat, warmup=1)
+                )
+                results.append((f"{label} {size} rows", summary))
+
+        utils.print_table(results)
+
+
+if __name__ == "__main__":
+    main()
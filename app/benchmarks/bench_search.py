@@ -0,0 +1,105 @@
+"""
+Benchmark full-text task search against the icontains filters.
+
+Usage:
+    python -m benchmarks.bench_search --rows 1000000 --repeat 50 --keepdb
+"""
+
+import argparse
+
+from benchmarks import utils
+
+utils.setup()
+
+from django.db.models import Q  # noqa: E402
+
+from core.models import Task  # noqa: E402
+from task.filters import TaskFilter  # noqa: E402
+
+
+WORDS = [
+    "deploy",
+    "review",
+    "invoice",
+    "migrate",
+    "customer",
+    "backend",
+    "frontend",
+    "report",
+    "meeting",
+    "release",
+    "database",
+    "security",
+    "onboarding",
+    "budget",
+    "design",
+    "testing",
+]
+TERMS = ["invoice", "security review", "onboarding -budget", "ref4242", "zebra"]
+PAGE_SIZE = 50
+
+
+def seed(connection, rows):
+    """Insert rows of random tasks with a single INSERT ... SELECT."""
+    if Task.objects.count() >= rows:
+        return
+
+    words = "ARRAY[" + ", ".join(f"'{word}'" for word in WORDS) + "]"
+    pick = f"({words})[1 + floor(random() * {len(WORDS)})::int]"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO core_task (name, description, status)
+            SELECT
+                initcap({pick}) || ' ' || {pick} || ' #' || i,
+                {pick} || ' ' || {pick} || ' ' || {pick}
+                    || ' ref' || floor(random() * 100000)::int,
+                'new'
+            FROM generate_series(1, %s) AS i
+            """,
+            [rows - Task.objects.count()],
+        )
+        cursor.execute("ANALYZE core_task")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    with utils.benchmark_database(keepdb=args.keepdb) as connection:
+        seed(connection, args.rows)
+        print(f"{Task.objects.count()} tasks\n")
+
+        results = []
+        for term in TERMS:
+            word = term.split()[0]
+            icontains = Task.objects.filter(
+                Q(name__icontains=word) | Q(description__icontains=word)
+            ).order_by("-id")[:PAGE_SIZE]
+            search = TaskFilter({"search": term}, Task.objects.all()).qs[:PAGE_SIZE]
+
+            results.append(
+                (
+                    f"icontains {word!r}",
+                    utils.summarize(
+                        utils.measure(lambda: list(icontains.all()), args.repeat)
+                    ),
+                )
+            )
+            results.append(
+                (
+                    f"search {term!r}",
+                    utils.summarize(
+                        utils.measure(lambda: list(search.all()), args.repeat)
+                    ),
+                )
+            )
+
+        utils.print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Helpers shared by the benchmarks.
+"""
+
+import json
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    """Configure Django for a standalone benchmark script."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    """Create a test database and point the default connection at it."""
+    from django.db import connection
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def measure(func, repeat, warmup=3):
+    """Call func repeatedly and return the latencies in milliseconds."""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return samples
+
+
+def summarize(samples):
+    """Return latency percentiles of the samples in milliseconds."""
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    return {
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "mean": statistics.fmean(ordered),
+        "throughput": len(ordered) / sum(ordered) * 1000,
+    }
+
+
+def print_table(rows):
+    """Print a latency table of (label, summary) rows."""
+    print(
+        f"{'benchmark':<40} {'p50':>9} {'p95':>9} {'p99':>9} {'mean':>9} "
+        f"{'req/s':>8} {'queries':>7}"
+    )
+    for label, summary in rows:
+        print(
+            f"{label:<40} "
+            + " ".join(
+                f"{summary[key]:>7.2f}ms" for key in ("p50", "p95", "p99", "mean")
+            )
+            + f" {summary['throughput']:>8.1f} {summary.get('queries', ''):>7}"
+        )
+
+
+def save_results(path, rows):
+    """Write (label, summary) rows to a JSON baseline file."""
+    with open(path, "w") as file:
+        json.dump(dict(rows), file, indent=2, sort_keys=True)
+
+
+def compare_results(path, rows):
+    """Print how (label, summary) rows changed against a JSON baseline."""
+    with open(path) as file:
+        baseline = json.load(file)
+
+    print(
+        f"\n{'change vs ' + path:<40} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>9}"
+    )
+    for label, summary in rows:
+        if label not in baseline:
+            continue
+        old = baseline[label]
+        print(
+            f"{label:<40} "
+            + " ".join(
+                f"{(summary[key] / old[key] - 1) * 100:>+8.1f}%"
+                for key in ("p50", "p95", "p99")
+            )
+            + f" {summary.get('queries', 0) - old.get('queries', 0):>+9}"
+        )
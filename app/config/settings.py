@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "core",
     "django",
     "rest_framework",
@@ -49,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.routers.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -94,6 +96,34 @@ DATABASES = {
     }
 }
 
+# Optional read replica of the database, with the credentials of the primary.
+# Tests use the primary in its place.
+if os.environ.get("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.environ.get("DB_REPLICA_HOST"),
+        "TEST": {"MIRROR": "default"},
+    }
+
+# Aliases of the replicas that reads of safe requests are sent to, and seconds
+# a client reads from the primary after a write so it sees its own changes.
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_REPLICA_PIN_SECONDS = 10
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -138,6 +168,40 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "core.User"
 
+# Number of most recent changes embedded in the task detail response.
+TASK_DETAIL_CHANGES = 10
+
+# Number of task history records between two full snapshots, the others only
+# store the fields a change modified.
+TASK_HISTORY_SNAPSHOT_INTERVAL = 10
+
+# Months of task history partitions created ahead of the current one, and
+# months of history kept when expiring old partitions (None keeps it all).
+TASK_HISTORY_PARTITIONS_AHEAD = 3
+TASK_HISTORY_RETENTION_MONTHS = None
+
+# Seconds the task list and detail responses are cached for. Writes to tasks
+# invalidate them before that.
+TASK_RESPONSE_CACHE_TIMEOUT = 300
+
+# Seconds the task sync cursor stays behind the clock, so changes committed
+# later than their timestamp are still returned. It should exceed the longest
+# transaction writing tasks.
+TASK_SYNC_LAG = 30
+
+# Task events a subscriber may fall behind by before its stream is reset,
+# and seconds without events after which the stream sends a keepalive.
+TASK_EVENTS_QUEUE_SIZE = 1000
+TASK_EVENTS_KEEPALIVE = 15
+
+# Most tasks one request to the claim endpoint may take.
+TASK_CLAIM_MAX_LIMIT = 100
+
+# Authenticated tokens kept in memory by each process and for how many
+# seconds they are cached, both in memory and in the shared cache.
+TOKEN_AUTH_CACHE_SIZE = 1024
+TOKEN_AUTH_CACHE_TIMEOUT = 300
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_FILTER_BACKENDS": [
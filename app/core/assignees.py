@@ -0,0 +1,91 @@
+"""
+Denormalized assignees of tasks.
+
+Each task keeps the sorted ids of its assignees in ``assignee_ids`` and the
+first of their emails in ``primary_assignee_email``, so the task list shows
+the assignee ids and sorts on an indexed column without joining the
+assignees. Both columns are rewritten from the assignees table whenever it
+changes.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import connection
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from core.models import Task
+
+
+FILL_SQL = """
+UPDATE core_task
+SET assignee_ids = assignees.ids, primary_assignee_email = assignees.email
+FROM (
+    SELECT assigned.task_id,
+        array_agg(assigned.user_id ORDER BY assigned.user_id) AS ids,
+        min(core_user.email) AS email
+    FROM core_task_assigned_to AS assigned
+    JOIN core_user ON core_user.id = assigned.user_id
+    WHERE assigned.task_id >= %s
+    GROUP BY assigned.task_id
+) AS assignees
+WHERE core_task.id = assignees.task_id
+"""
+
+
+def assignee_columns():
+    """Return the expressions of the assignee columns of a task."""
+    return {
+        "assignee_ids": ArraySubquery(
+            Task.assigned_to.through.objects.filter(task_id=OuterRef("pk"))
+            .order_by("user_id")
+            .values("user_id")
+        ),
+        "primary_assignee_email": Coalesce(
+            Subquery(
+                get_user_model()
+                .objects.filter(tasks_assigned=OuterRef("pk"))
+                .order_by("email")
+                .values("email")[:1]
+            ),
+            Value(""),
+        ),
+    }
+
+
+def refresh_assignees(queryset, **fields):
+    """
+    Rewrite the assignee columns, and any other fields, of the tasks and
+    bump their version.
+    """
+    return queryset.update(**assignee_columns(), version=F("version") + 1, **fields)
+
+
+def fill_assignees(first_task=0):
+    """
+    Fill the assignee columns of tasks from ``first_task`` on whose
+    assignees were inserted without signals, with one set-based update.
+    """
+    with connection.cursor() as cursor:
+        # Assignees inserted in bulk have no statistics yet, without which
+        # the update may be planned as a nested loop over every task.
+        cursor.execute("ANALYZE core_user, core_task, core_task_assigned_to")
+        cursor.execute(FILL_SQL, [first_task])
+        return cursor.rowcount
+
+
+def stale_assignees(queryset):
+    """Return the ids of the tasks whose assignee columns are out of date."""
+    columns = assignee_columns()
+    return list(
+        queryset.annotate(
+            expected_ids=columns["assignee_ids"],
+            expected_email=columns["primary_assignee_email"],
+        )
+        .exclude(
+            assignee_ids=F("expected_ids"),
+            primary_assignee_email=F("expected_email"),
+        )
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
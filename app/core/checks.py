@@ -0,0 +1,33 @@
+"""
+System checks of the deployment settings.
+"""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+# Cache backends keeping their entries inside each process.
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Warn when the default cache is not shared between processes."""
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            f"The default cache {backend} is not shared between processes.",
+            hint=(
+                "Cached task responses, tokens and replica pins are invalidated "
+                "through the cache, so with several web workers or a history "
+                "worker set CACHE_BACKEND and CACHE_LOCATION to a shared cache "
+                "such as Redis."
+            ),
+            id="core.W001",
+        )
+    ]
@@ -0,0 +1,316 @@
+"""
+Delta-encoded task change history.
+
+Every history record holds the state of a task before a change. Most records
+only keep the fields the change modified, with the value they had before it.
+Every ``TASK_HISTORY_SNAPSHOT_INTERVAL`` records a full snapshot is stored, so
+rebuilding a version never replays more than that many records.
+
+Requests don't write records themselves. They queue the full state before
+their change in an outbox, in their own transaction, and the history worker
+turns queued changes into records in batches.
+"""
+
+import itertools
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.dispatch import Signal
+from django.utils import timezone
+
+from core.models import TaskChangesHistory, TaskHistoryOutbox
+
+
+# Sent once queued changes are written to the history.
+history_recorded = Signal()
+
+
+SNAPSHOT_FIELDS = ["name", "description", "status", "assigned_to"]
+
+
+def take_snapshot(task):
+    """Return the tracked fields of a task, reusing prefetched assignees."""
+    snapshot = {field: getattr(task, field) for field in SNAPSHOT_FIELDS[:-1]}
+    snapshot["assigned_to"] = sorted(user.pk for user in task.assigned_to.all())
+    return snapshot
+
+
+def apply_changes(snapshot, data):
+    """Return the snapshot updated with validated serializer data."""
+    snapshot = dict(snapshot)
+    for field in SNAPSHOT_FIELDS:
+        if field in data:
+            snapshot[field] = data[field]
+    if "assigned_to" in data:
+        snapshot["assigned_to"] = sorted(
+            getattr(user, "pk", user) for user in data["assigned_to"]
+        )
+    return snapshot
+
+
+def diff_snapshots(before, after):
+    """Return the fields of ``before`` whose value differs in ``after``."""
+    return {
+        field: value for field, value in before.items() if after.get(field) != value
+    }
+
+
+def tasks_needing_snapshot(task_ids):
+    """Return the ids of the tasks whose next record should be a full snapshot."""
+    interval = settings.TASK_HISTORY_SNAPSHOT_INTERVAL
+    recent = (
+        TaskChangesHistory.objects.filter(task_id__in=task_ids)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("task_id"),
+                order_by=[F("change_date").desc(), F("id").desc()],
+            )
+        )
+        .filter(position__lt=interval)
+        .values_list("task_id", "is_snapshot")
+    )
+    with_snapshot = {task_id for task_id, is_snapshot in recent if is_snapshot}
+    return set(task_ids) - with_snapshot
+
+
+def enqueue_changes(changes, changed_by, change_date=None):
+    """
+    Queue the states of tasks before changes for their history.
+
+    ``changes`` are ``(task, before, after)`` triples, all queued with one
+    insert which commits or rolls back with the changes.
+    """
+    change_date = change_date or timezone.now()
+    return TaskHistoryOutbox.objects.bulk_create(
+        TaskHistoryOutbox(
+            task=task,
+            changed_by=changed_by,
+            change_date=change_date,
+            before=before,
+            changed_fields=sorted(diff_snapshots(before, after)),
+        )
+        for task, before, after in changes
+    )
+
+
+def enqueue_change(task, changed_by, before, after, change_date=None):
+    """Queue the state of a task before a change for its history."""
+    return enqueue_changes([(task, before, after)], changed_by, change_date)[0]
+
+
+def write_queued(entries):
+    """
+    Store queued changes of distinct tasks as history records.
+
+    Whether each record needs a full snapshot is decided with one query and
+    every record is written with one insert.
+    """
+    full = tasks_needing_snapshot([entry.task_id for entry in entries])
+    return TaskChangesHistory.objects.bulk_create(
+        TaskChangesHistory(
+            task_id=entry.task_id,
+            changed_by_id=entry.changed_by_id,
+            change_date=entry.change_date,
+            is_snapshot=entry.task_id in full,
+            task_snapshot=(
+                entry.before
+                if entry.task_id in full
+                else {field: entry.before[field] for field in entry.changed_fields}
+            ),
+        )
+        for entry in entries
+    )
+
+
+def drain_outbox(limit):
+    """
+    Write a batch of queued changes to the history and return their number.
+
+    Rows are claimed with ``FOR UPDATE SKIP LOCKED``, so several workers
+    drain the outbox without waiting on each other. A task with an earlier
+    change claimed by another worker is left for the next batch, so the
+    records of a task are written in order and their snapshot decisions
+    see every record before them.
+    """
+    with transaction.atomic():
+        claimed = list(
+            TaskHistoryOutbox.objects.select_for_update(skip_locked=True).order_by(
+                "id"
+            )[:limit]
+        )
+        if not claimed:
+            return 0
+
+        claimed_ids = [entry.id for entry in claimed]
+        blocked = set(
+            TaskHistoryOutbox.objects.filter(
+                task_id__in={entry.task_id for entry in claimed},
+                id__lt=claimed_ids[-1],
+            )
+            .exclude(id__in=claimed_ids)
+            .values_list("task_id", flat=True)
+        )
+        entries = [entry for entry in claimed if entry.task_id not in blocked]
+
+        # Changes of the same task are written in rounds, so each round
+        # decides its snapshots knowing the records of the previous one.
+        rounds = defaultdict(list)
+        seen = Counter()
+        for entry in entries:
+            rounds[seen[entry.task_id]].append(entry)
+            seen[entry.task_id] += 1
+        for round_entries in rounds.values():
+            write_queued(round_entries)
+
+        TaskHistoryOutbox.objects.filter(
+            id__in=[entry.id for entry in entries]
+        ).delete()
+        if entries:
+            transaction.on_commit(
+                lambda: history_recorded.send(sender=TaskChangesHistory)
+            )
+
+    return len(entries)
+
+
+def queued_snapshots(task_ids, after):
+    """
+    Return the state before the oldest change queued after a moment, keyed
+    by task id, for tasks whose history does not reach their live state yet.
+    """
+    return dict(
+        TaskHistoryOutbox.objects.filter(task_id__in=task_ids, change_date__gt=after)
+        .order_by("task_id", "change_date", "id")
+        .distinct("task_id")
+        .values_list("task_id", "before")
+    )
+
+
+def replay(records, task):
+    """
+    Return the state stored by the first of consecutive records.
+
+    ``records`` are ``(is_snapshot, task_snapshot)`` pairs, oldest first,
+    starting at the wanted record. Deltas are applied backwards from the
+    first full snapshot among them, or from the live task if there is none.
+    """
+    deltas = []
+    snapshot = None
+    for is_snapshot, task_snapshot in records:
+        if is_snapshot:
+            snapshot = dict(task_snapshot)
+            break
+        deltas.append(task_snapshot)
+    if snapshot is None:
+        snapshot = take_snapshot(task)
+
+    for delta in reversed(deltas):
+        snapshot.update(delta)
+
+    return snapshot
+
+
+def rebuild_snapshot(change):
+    """Return the full state of the task before the given change."""
+    if change.is_snapshot:
+        return change.task_snapshot
+
+    later = (
+        TaskChangesHistory.objects.filter(task_id=change.task_id)
+        .filter(
+            Q(change_date__gt=change.change_date)
+            | Q(change_date=change.change_date, id__gt=change.id)
+        )
+        .order_by("change_date", "id")
+        .values_list("is_snapshot", "task_snapshot")
+    )
+
+    def queued():
+        queued = queued_snapshots([change.task_id], change.change_date)
+        if change.task_id in queued:
+            yield True, queued[change.task_id]
+
+    records = itertools.chain(
+        later.iterator(chunk_size=settings.TASK_HISTORY_SNAPSHOT_INTERVAL), queued()
+    )
+    snapshot = replay(records, change.task)
+    snapshot.update(change.task_snapshot)
+
+    return snapshot
+
+
+def snapshots_as_of(tasks, as_of):
+    """
+    Return the state of each task at ``as_of``, keyed by task id.
+
+    The state at a moment is the one stored by the first change after it.
+    One query fetches, for every task, the records from that change on,
+    capped at the snapshot interval which always reaches a full snapshot.
+    Tasks not changed since ``as_of`` keep their live state, once changes
+    still queued for the history are accounted for.
+    """
+    tasks = {task.pk: task for task in tasks}
+    records = (
+        TaskChangesHistory.objects.filter(task_id__in=list(tasks))
+        .filter(change_date__gt=as_of)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("task_id"),
+                order_by=[F("change_date").asc(), F("id").asc()],
+            )
+        )
+        .filter(position__lte=settings.TASK_HISTORY_SNAPSHOT_INTERVAL)
+        .order_by("task_id", "change_date", "id")
+        .values_list("task_id", "is_snapshot", "task_snapshot")
+    )
+    chains = defaultdict(list)
+    for task_id, is_snapshot, task_snapshot in records:
+        chains[task_id].append((is_snapshot, task_snapshot))
+
+    unresolved = [
+        task_id
+        for task_id in tasks
+        if not any(is_snapshot for is_snapshot, _ in chains[task_id])
+    ]
+    if unresolved:
+        for task_id, before in queued_snapshots(unresolved, as_of).items():
+            chains[task_id].append((True, before))
+
+    return {task_id: replay(chains[task_id], task) for task_id, task in tasks.items()}
+
+
+def compact_history(task):
+    """Rewrite the history of a task as deltas with periodic full snapshots."""
+    records = list(task.changes.order_by("change_date", "id"))
+    live = take_snapshot(task)
+
+    states = []
+    snapshot = live
+    for record in reversed(records):
+        if record.is_snapshot:
+            snapshot = dict(record.task_snapshot)
+        else:
+            snapshot = {**snapshot, **record.task_snapshot}
+        states.append(snapshot)
+    states.reverse()
+
+    interval = settings.TASK_HISTORY_SNAPSHOT_INTERVAL
+    changed = []
+    for index, (record, before) in enumerate(zip(records, states)):
+        after = states[index + 1] if index + 1 < len(states) else live
+        is_snapshot = index % interval == 0
+        task_snapshot = before if is_snapshot else diff_snapshots(before, after)
+        if (record.is_snapshot, record.task_snapshot) != (is_snapshot, task_snapshot):
+            record.is_snapshot = is_snapshot
+            record.task_snapshot = task_snapshot
+            changed.append(record)
+
+    TaskChangesHistory.objects.bulk_update(
+        changed, ["is_snapshot", "task_snapshot"], batch_size=500
+    )
+    return len(changed)
@@ -0,0 +1,48 @@
+"""
+Django command to check the denormalized assignees of tasks.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from core.assignees import refresh_assignees, stale_assignees
+from core.models import Task
+
+
+class Command(BaseCommand):
+    """Django command to find and fix tasks with stale assignee columns."""
+
+    help = (
+        "Compare the assignee columns of tasks with their assignees, in batches "
+        "of task ids, and optionally rewrite the stale ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Rewrite the assignee columns of the stale tasks.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        last_id = Task.objects.aggregate(last=Max("id"))["last"] or 0
+        stale = []
+        for start in range(0, last_id + 1, options["batch_size"]):
+            batch = Task.objects.filter(
+                id__gte=start, id__lt=start + options["batch_size"]
+            )
+            stale_ids = stale_assignees(batch)
+            if stale_ids and options["fix"]:
+                refresh_assignees(Task.objects.filter(id__in=stale_ids))
+            stale += stale_ids
+
+        if stale and not options["fix"]:
+            raise CommandError(
+                f"{len(stale)} tasks have stale assignees, "
+                f"the first ones: {stale[:10]}. Run with --fix to rewrite them."
+            )
+        if stale:
+            self.stdout.write(f"Fixed the assignees of {len(stale)} tasks.")
+        self.stdout.write(self.style.SUCCESS("Task assignees are consistent."))
@@ -0,0 +1,37 @@
+"""
+Django command to convert full task history snapshots into deltas.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.history import compact_history
+from core.models import Task, TaskChangesHistory
+
+
+class Command(BaseCommand):
+    """Django command to compact the task change history."""
+
+    help = "Store task history as field diffs with periodic full snapshots."
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        task_ids = (
+            TaskChangesHistory.objects.order_by("task_id")
+            .values_list("task_id", flat=True)
+            .distinct()
+        )
+        tasks = records = 0
+        for task_id in task_ids.iterator():
+            with transaction.atomic():
+                task = (
+                    Task.objects.select_for_update()
+                    .prefetch_related("assigned_to")
+                    .get(pk=task_id)
+                )
+                records += compact_history(task)
+            tasks += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Compacted {records} records of {tasks} tasks.")
+        )
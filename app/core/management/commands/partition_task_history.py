@@ -0,0 +1,64 @@
+"""
+Django command to maintain the monthly partitions of the task history.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import partitions
+
+
+class Command(BaseCommand):
+    """Django command to create and expire task history partitions."""
+
+    help = (
+        "Create the task history partitions of the coming months and expire "
+        "the partitions older than the retention."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.TASK_HISTORY_PARTITIONS_AHEAD,
+            help="Months of partitions to create after the current one.",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=settings.TASK_HISTORY_RETENTION_MONTHS,
+            help="Months of history to keep, all of it when omitted.",
+        )
+        parser.add_argument(
+            "--expire",
+            choices=partitions.EXPIRE_ACTIONS,
+            default="detach",
+            help="What to do with the partitions older than the retention.",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            help="Directory expired partitions are archived to.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options["expire"] == "archive" and not options["archive_dir"]:
+            raise CommandError("--expire archive needs --archive-dir.")
+
+        created = partitions.ensure_partitions(options["ahead"])
+        for month in created:
+            self.stdout.write(f"Created {partitions.partition_name(month)}.")
+
+        if options["retain_months"] is not None:
+            expired = partitions.expire_partitions(
+                options["retain_months"],
+                options["expire"],
+                archive_dir=options["archive_dir"],
+            )
+            for month in expired:
+                self.stdout.write(
+                    f"Expired {partitions.partition_name(month)} "
+                    f"({options['expire']})."
+                )
+
+        self.stdout.write(self.style.SUCCESS("Task history partitions are ready."))
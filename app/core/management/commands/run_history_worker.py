@@ -0,0 +1,42 @@
+"""
+Django command to write queued task changes to their history.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.history import drain_outbox
+
+
+class Command(BaseCommand):
+    """Django command to drain the task history outbox."""
+
+    help = "Write queued task changes to the task history in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the outbox is drained.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the outbox is drained instead of waiting.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        written = 0
+        while True:
+            count = drain_outbox(options["batch_size"])
+            written += count
+            if count < options["batch_size"]:
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} history records."))
@@ -0,0 +1,158 @@
+"""
+Django command to fill the database with synthetic users and tasks.
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.assignees import fill_assignees
+
+
+WORDS = [
+    "deploy",
+    "review",
+    "invoice",
+    "migrate",
+    "customer",
+    "backend",
+    "frontend",
+    "report",
+    "meeting",
+    "release",
+    "database",
+    "security",
+    "onboarding",
+    "budget",
+    "design",
+    "testing",
+]
+SEED_PASSWORD = "seed-password"
+
+
+class Command(BaseCommand):
+    """Django command to seed users, tasks, assignees and task history."""
+
+    help = "Insert synthetic users and tasks with set-based INSERT ... SELECT."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--tasks", type=int, default=100000)
+        parser.add_argument("--assignees-per-task", type=int, default=2)
+        parser.add_argument("--history-per-task", type=int, default=5)
+        parser.add_argument(
+            "--password",
+            default=SEED_PASSWORD,
+            help="Password of every seeded user, seed<n>@example.com.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        users = options["users"]
+        if users < 1:
+            raise CommandError("At least one user is required.")
+        if options["assignees_per_task"] > users:
+            raise CommandError("Tasks can't have more assignees than users.")
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            first_user = self.insert_users(cursor, users, options["password"])
+            first_task = self.insert_tasks(cursor, first_user, users, options["tasks"])
+            self.insert_assignees(
+                cursor, first_user, first_task, users, options["assignees_per_task"]
+            )
+            self.insert_history(cursor, first_task, options["history_per_task"])
+            fill_assignees(first_task)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "ANALYZE core_user, core_task, core_task_assigned_to, "
+                "core_taskchangeshistory"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {users} users and {options['tasks']} tasks "
+                f"with password {options['password']!r}."
+            )
+        )
+
+    def insert_users(self, cursor, users, password):
+        """Insert users sharing one password hash and return the first id."""
+        cursor.execute("SELECT coalesce(max(id), 0) FROM core_user")
+        offset = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            INSERT INTO core_user
+                (email, name, password, is_active, is_staff, is_superuser)
+            SELECT 'seed' || i || '@example.com', 'Seed user ' || i, %s, true,
+                false, false
+            FROM generate_series(%s, %s) AS i
+            """,
+            [make_password(password), offset + 1, offset + users],
+        )
+        cursor.execute("SELECT min(id) FROM core_user WHERE id > %s", [offset])
+        return cursor.fetchone()[0]
+
+    def insert_tasks(self, cursor, first_user, users, tasks):
+        """Insert tasks with random words spread over users and statuses."""
+        cursor.execute("SELECT coalesce(max(id), 0) FROM core_task")
+        offset = cursor.fetchone()[0]
+        words = "ARRAY[" + ", ".join(f"'{word}'" for word in WORDS) + "]"
+        pick = f"({words})[1 + floor(random() * {len(WORDS)})::int]"
+        cursor.execute(
+            f"""
+            INSERT INTO core_task (name, description, status, user_id)
+            SELECT
+                initcap({pick}) || ' ' || {pick} || ' #' || i,
+                {pick} || ' ' || {pick} || ' ' || {pick},
+                (ARRAY['new', 'in_progress', 'done'])[1 + i %% 3],
+                %s + floor(random() * %s)::int
+            FROM generate_series(1, %s) AS i
+            """,
+            [first_user, users, tasks],
+        )
+        cursor.execute("SELECT min(id) FROM core_task WHERE id > %s", [offset])
+        return cursor.fetchone()[0]
+
+    def insert_assignees(self, cursor, first_user, first_task, users, per_task):
+        """Assign every new task to distinct consecutive users."""
+        cursor.execute(
+            """
+            INSERT INTO core_task_assigned_to (task_id, user_id)
+            SELECT task.id, %s + (task.id + k) %% %s
+            FROM core_task AS task CROSS JOIN generate_series(0, %s - 1) AS k
+            WHERE task.id >= %s
+            """,
+            [first_user, users, per_task, first_task],
+        )
+
+    def insert_history(self, cursor, first_task, per_task):
+        """
+        Insert hourly history records of new tasks, oldest first, with a full
+        snapshot every TASK_HISTORY_SNAPSHOT_INTERVAL records.
+        """
+        cursor.execute(
+            """
+            INSERT INTO core_taskchangeshistory
+                (task_id, changed_by_id, change_date, is_snapshot, task_snapshot)
+            SELECT task.id, task.user_id, now() - k * interval '1 hour',
+                (%s - k) %% %s = 0,
+                CASE WHEN (%s - k) %% %s = 0 THEN jsonb_build_object(
+                    'name', task.name,
+                    'description', task.description,
+                    'status', 'new',
+                    'assigned_to', '[]'::jsonb
+                ) ELSE jsonb_build_object('status', 'new') END
+            FROM core_task AS task CROSS JOIN generate_series(1, %s) AS k
+            WHERE task.id >= %s
+            """,
+            [
+                per_task,
+                settings.TASK_HISTORY_SNAPSHOT_INTERVAL,
+                per_task,
+                settings.TASK_HISTORY_SNAPSHOT_INTERVAL,
+                per_task,
+                first_task,
+            ],
+        )
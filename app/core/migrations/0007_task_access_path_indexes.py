@@ -0,0 +1,45 @@
+# Generated by Django 5.0.6 on 2026-10-18 03:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_task_name_trgm_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["status", "id"], name="task_status_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["user", "id"], name="task_user_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["name", "id"], name="task_name_id_idx"),
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX task_assigned_to_user_task_idx "
+                "ON core_task_assigned_to (user_id, task_id)"
+            ),
+            reverse_sql="DROP INDEX task_assigned_to_user_task_idx",
+        ),
+        migrations.AlterField(
+            model_name="task",
+            name="user",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-18 03:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_task_access_path_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="taskchangeshistory",
+            index=models.Index(
+                fields=["task", "-change_date", "-id"],
+                name="task_changes_task_date_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="taskchangeshistory",
+            name="task",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="changes",
+                to="core.task",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 03:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_taskchangeshistory_task_date_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskchangeshistory",
+            name="is_snapshot",
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_task_sync"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskHistoryOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "change_date",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("before", models.JSONField()),
+                ("changed_fields", models.JSONField(default=list)),
+                (
+                    "changed_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.task",
+                    ),
+                ),
+            ],
+        ),
+    ]
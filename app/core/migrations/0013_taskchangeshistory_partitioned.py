@@ -0,0 +1,144 @@
+"""
+Range partition the task history by month of its change date.
+
+PostgreSQL cannot partition a table in place, so the history is copied to a
+new partitioned table. Its primary key must include the partition key, and
+identity columns cannot be partitioned before PostgreSQL 17, so the id is
+filled from a sequence. The table has no foreign key to tasks anymore:
+deleting a task leaves its history to expire with its partitions.
+"""
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+CREATE_PARTITIONED = """
+ALTER TABLE core_taskchangeshistory RENAME TO core_taskchangeshistory_old;
+ALTER INDEX core_taskchangeshistory_pkey
+    RENAME TO core_taskchangeshistory_old_pkey;
+CREATE TABLE core_taskchangeshistory (
+    id bigint NOT NULL,
+    change_date timestamp with time zone NOT NULL,
+    task_snapshot jsonb NOT NULL,
+    changed_by_id bigint NOT NULL,
+    task_id bigint NOT NULL,
+    is_snapshot boolean NOT NULL,
+    PRIMARY KEY (id, change_date)
+) PARTITION BY RANGE (change_date);
+CREATE TABLE core_taskchangeshistory_default
+    PARTITION OF core_taskchangeshistory DEFAULT;
+"""
+
+COPY_HISTORY = """
+INSERT INTO core_taskchangeshistory
+    (id, change_date, task_snapshot, changed_by_id, task_id, is_snapshot)
+SELECT id, change_date, task_snapshot, changed_by_id, task_id, is_snapshot
+FROM core_taskchangeshistory_old;
+DROP TABLE core_taskchangeshistory_old;
+CREATE SEQUENCE core_taskchangeshistory_id_seq
+    OWNED BY core_taskchangeshistory.id;
+SELECT setval(
+    'core_taskchangeshistory_id_seq',
+    COALESCE(MAX(id), 0) + 1,
+    false
+) FROM core_taskchangeshistory;
+ALTER TABLE core_taskchangeshistory
+    ALTER COLUMN id SET DEFAULT nextval('core_taskchangeshistory_id_seq');
+CREATE INDEX task_changes_task_date_idx
+    ON core_taskchangeshistory (task_id, change_date DESC, id DESC);
+CREATE INDEX core_taskchangeshistory_changed_by_id_6b7d69e0
+    ON core_taskchangeshistory (changed_by_id);
+ALTER TABLE core_taskchangeshistory
+    ADD CONSTRAINT core_taskchangeshistory_changed_by_id_6b7d69e0_fk_core_user_id
+    FOREIGN KEY (changed_by_id) REFERENCES core_user (id)
+    DEFERRABLE INITIALLY DEFERRED;
+"""
+
+CREATE_PLAIN = """
+CREATE TABLE core_taskchangeshistory_plain (
+    id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    change_date timestamp with time zone NOT NULL,
+    task_snapshot jsonb NOT NULL,
+    changed_by_id bigint NOT NULL,
+    task_id bigint NOT NULL,
+    is_snapshot boolean NOT NULL
+);
+INSERT INTO core_taskchangeshistory_plain
+    (id, change_date, task_snapshot, changed_by_id, task_id, is_snapshot)
+SELECT history.id, history.change_date, history.task_snapshot,
+    history.changed_by_id, history.task_id, history.is_snapshot
+FROM core_taskchangeshistory AS history
+JOIN core_task ON core_task.id = history.task_id;
+DROP TABLE core_taskchangeshistory;
+ALTER TABLE core_taskchangeshistory_plain RENAME TO core_taskchangeshistory;
+ALTER INDEX core_taskchangeshistory_plain_pkey
+    RENAME TO core_taskchangeshistory_pkey;
+ALTER SEQUENCE core_taskchangeshistory_plain_id_seq
+    RENAME TO core_taskchangeshistory_id_seq;
+SELECT setval(
+    'core_taskchangeshistory_id_seq',
+    COALESCE(MAX(id), 0) + 1,
+    false
+) FROM core_taskchangeshistory;
+CREATE INDEX task_changes_task_date_idx
+    ON core_taskchangeshistory (task_id, change_date DESC, id DESC);
+CREATE INDEX core_taskchangeshistory_changed_by_id_6b7d69e0
+    ON core_taskchangeshistory (changed_by_id);
+ALTER TABLE core_taskchangeshistory
+    ADD CONSTRAINT core_taskchangeshistory_changed_by_id_6b7d69e0_fk_core_user_id
+    FOREIGN KEY (changed_by_id) REFERENCES core_user (id)
+    DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE core_taskchangeshistory
+    ADD CONSTRAINT core_taskchangeshistory_task_id_d921aa00_fk_core_task_id
+    FOREIGN KEY (task_id) REFERENCES core_task (id)
+    DEFERRABLE INITIALLY DEFERRED;
+"""
+
+
+def create_partitions(apps, schema_editor):
+    """Create the partitions of every month with history, and those ahead."""
+    from core import partitions
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT MIN(change_date) FROM core_taskchangeshistory_old")
+        oldest = cursor.fetchone()[0]
+
+    now = timezone.now()
+    month = partitions.month_start(min(oldest or now, now))
+    last = partitions.add_months(
+        partitions.month_start(now), settings.TASK_HISTORY_PARTITIONS_AHEAD
+    )
+    while month <= last:
+        partitions.create_partition(month, using=schema_editor.connection.alias)
+        month = partitions.add_months(month, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_task_history_outbox"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_PARTITIONED, migrations.RunSQL.noop),
+                migrations.RunPython(create_partitions, migrations.RunPython.noop),
+                migrations.RunSQL(COPY_HISTORY, CREATE_PLAIN),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="taskchangeshistory",
+                    name="task",
+                    field=models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=models.deletion.DO_NOTHING,
+                        related_name="changes",
+                        to="core.task",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:50
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+BACKFILL_ASSIGNEES = """
+UPDATE core_task
+SET assignee_ids = assignees.ids, primary_assignee_email = assignees.email
+FROM (
+    SELECT assigned.task_id,
+        array_agg(assigned.user_id ORDER BY assigned.user_id) AS ids,
+        min(core_user.email) AS email
+    FROM core_task_assigned_to AS assigned
+    JOIN core_user ON core_user.id = assigned.user_id
+    GROUP BY assigned.task_id
+) AS assignees
+WHERE core_task.id = assignees.task_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_taskchangeshistory_partitioned"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="assignee_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.BigIntegerField(),
+                blank=True,
+                db_default=[],
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="primary_assignee_email",
+            field=models.EmailField(
+                blank=True, db_default="", default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.RunSQL(BACKFILL_ASSIGNEES, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["primary_assignee_email", "id"],
+                name="task_primary_assignee_id_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:49
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+# Tasks existing before the column count as created by their first recorded
+# change, or when the column was added if they have none.
+BACKFILL_CREATED_AT = """
+UPDATE core_task
+SET created_at = changes.first_change
+FROM (
+    SELECT task_id, MIN(change_date) AS first_change
+    FROM (
+        SELECT task_id, change_date FROM core_taskchangeshistory
+        UNION ALL
+        SELECT task_id, change_date FROM core_taskhistoryoutbox
+    ) AS recorded
+    GROUP BY task_id
+) AS changes
+WHERE core_task.id = changes.task_id
+AND changes.first_change < core_task.created_at;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0016_history_changed_by_set_null"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, db_default=django.db.models.functions.datetime.Now()
+            ),
+        ),
+        migrations.RunSQL(BACKFILL_CREATED_AT, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["created_at", "id"], name="task_created_at_id_idx"
+            ),
+        ),
+    ]
@@ -3,7 +3,11 @@ Databases models.
 """
 
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models.functions import Now, Upper
 from django.utils import timezone
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -58,12 +62,25 @@ class Task(models.Model):
         on_delete=models.CASCADE,
         blank=True,
         null=True,
+        db_index=False,
     )
     assigned_to = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
         related_name="tasks_assigned",
         blank=True,
     )
+    # Copies of the assignees kept in sync by ``core.assignees``, so reads
+    # show and sort on them without joining the assignees.
+    assignee_ids = ArrayField(
+        models.BigIntegerField(),
+        default=list,
+        db_default=[],
+        blank=True,
+        editable=False,
+    )
+    primary_assignee_email = models.EmailField(
+        max_length=255, default="", db_default="", blank=True, editable=False
+    )
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     status = models.CharField(
@@ -71,22 +88,140 @@ class Task(models.Model):
         default="new",
         choices=STATUS_CHOICES,
     )
+    created_at = models.DateTimeField(auto_now_add=True, db_default=Now())
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
+    # Incremented by every write, it identifies the state of the task an
+    # update is made against (see ``task.conditional``).
+    version = models.PositiveIntegerField(default=1, db_default=1, editable=False)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", weight="A", config="english")
+            + SearchVector("description", weight="B", config="english")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="task_status_id_idx"),
+            models.Index(fields=["user", "id"], name="task_user_id_idx"),
+            models.Index(fields=["name", "id"], name="task_name_id_idx"),
+            models.Index(fields=["updated_at", "id"], name="task_updated_at_id_idx"),
+            models.Index(fields=["created_at", "id"], name="task_created_at_id_idx"),
+            models.Index(
+                fields=["primary_assignee_email", "id"],
+                name="task_primary_assignee_id_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="task_search_vector_idx"),
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="task_name_trgm_idx",
+            ),
+        ]
+
+    DENORMALIZED_FIELDS = ["assignee_ids", "primary_assignee_email"]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        Save the task with its next version, without writing back its
+        assignee columns, which may have changed since it was loaded.
+        """
+        bump = False
+        if not self._state.adding and not kwargs.get("force_insert"):
+            deferred = self.get_deferred_fields()
+            if kwargs.get("update_fields") is None:
+                kwargs["update_fields"] = [
+                    field.name
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key
+                    and not field.generated
+                    and field.attname not in deferred
+                    and field.name not in self.DENORMALIZED_FIELDS
+                ]
+            if "version" not in deferred:
+                # Increment the version of the row, not the one loaded, so
+                # a stale instance never reuses a version of another state.
+                self.version = models.F("version") + 1
+                bump = True
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        super().save(*args, **kwargs)
+        if bump:
+            self.refresh_from_db(using=self._state.db, fields=["version"])
+
+
+class TaskTombstone(models.Model):
+    """Model to remember deleted tasks for clients syncing changes."""
+
+    task_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["deleted_at", "id"], name="task_tombstone_deleted_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id} deleted on {self.deleted_at}"
+
 
 class TaskChangesHistory(models.Model):
-    """Model to track changes in tasks."""
+    """
+    Model to track changes in tasks.
+
+    The table is partitioned by month of ``change_date`` (see
+    ``core.partitions``). It has no foreign key to tasks so deleting a task
+    does not delete its history, which expires with its partitions instead.
+    """
 
     task = models.ForeignKey(
         "Task",
-        on_delete=models.CASCADE,
+        on_delete=models.DO_NOTHING,
         related_name="changes",
+        db_index=False,
+        db_constraint=False,
+    )
+    # Records are rebuilt from the ones after them, so deleting a user keeps
+    # their records.
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL
     )
-    changed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     change_date = models.DateTimeField(default=timezone.now)
+    is_snapshot = models.BooleanField(default=True)
     task_snapshot = models.JSONField()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["task", "-change_date", "-id"],
+                name="task_changes_task_date_idx",
+            ),
+        ]
+
+    def __str__(self):
+        # Records outlive their task and the user who made them.
+        changed_by = self.changed_by.email if self.changed_by else "a deleted user"
+        return f"Change in task {self.task_id} by {changed_by} on {self.change_date}"
+
+
+class TaskHistoryOutbox(models.Model):
+    """Model to queue task changes until they are written to the history."""
+
+    task = models.ForeignKey("Task", on_delete=models.CASCADE, related_name="+")
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    change_date = models.DateTimeField(default=timezone.now)
+    before = models.JSONField()
+    changed_fields = models.JSONField(default=list)
+
     def __str__(self):
-        return f"Change in task {self.task.id} by {self.changed_by.email} on {self.change_date}"
+        return f"Pending change in task {self.task_id} on {self.change_date}"
@@ -0,0 +1,154 @@
+"""
+Monthly partitions of the task change history.
+
+``core_taskchangeshistory`` is range partitioned by ``change_date``, one
+partition per calendar month (UTC) plus a default partition catching rows
+outside them. Partitions are created ahead of time, and old ones are
+detached, dropped or archived whole instead of deleting their rows.
+"""
+
+import datetime
+import gzip
+import io
+import os
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils import timezone
+
+
+TABLE = "core_taskchangeshistory"
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{TABLE}_y(\d{{4}})m(\d{{2}})$")
+EXPIRE_ACTIONS = ["detach", "drop", "archive"]
+
+
+def month_start(moment):
+    """Return the first moment of the UTC month of a moment."""
+    moment = moment.astimezone(datetime.timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month, count):
+    """Return the start of the month ``count`` months after a month start."""
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month):
+    """Return the name of the partition holding a month."""
+    return f"{TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def list_partitions():
+    """Return the start of the month of every monthly partition, sorted."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            """,
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            year, month = map(int, match.groups())
+            months.append(
+                datetime.datetime(year, month, 1, tzinfo=datetime.timezone.utc)
+            )
+    return sorted(months)
+
+
+def create_partition(month, using=DEFAULT_DB_ALIAS):
+    """
+    Create the partition of a month in the ``using`` database.
+
+    Rows of the month which landed in the default partition are moved to
+    the new partition in the same transaction.
+    """
+    name = partition_name(month)
+    bounds = [month, add_months(month, 1)]
+    with transaction.atomic(using), connections[using].cursor() as cursor:
+        cursor.execute(
+            f"""
+            CREATE TABLE "{name}"
+                (LIKE "{TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+            """
+        )
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM "{DEFAULT_PARTITION}"
+                WHERE change_date >= %s AND change_date < %s
+                RETURNING *
+            )
+            INSERT INTO "{name}" SELECT * FROM moved
+            """,
+            bounds,
+        )
+        cursor.execute(
+            f"""
+            ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}"
+                FOR VALUES FROM (%s) TO (%s)
+            """,
+            bounds,
+        )
+
+
+def ensure_partitions(ahead, now=None):
+    """
+    Create the missing partitions from the current month to ``ahead``
+    months later, and return the months created.
+    """
+    current = month_start(now or timezone.now())
+    existing = set(list_partitions())
+    created = []
+    for count in range(ahead + 1):
+        month = add_months(current, count)
+        if month not in existing:
+            create_partition(month)
+            created.append(month)
+    return created
+
+
+def archive_partition(name, directory):
+    """Write the rows of a partition to a gzipped CSV file and return its path."""
+    path = os.path.join(directory, f"{name}.csv.gz")
+    with gzip.open(path, "wb") as archive, connection.cursor() as cursor:
+        with io.TextIOWrapper(archive, encoding="utf-8") as text:
+            cursor.copy_expert(
+                f'COPY "{name}" TO STDOUT WITH (FORMAT csv, HEADER)', text
+            )
+    return path
+
+
+def expire_partitions(retain, action, archive_dir=None, now=None):
+    """
+    Remove the partitions of months older than ``retain`` months from the
+    history, and return the months removed.
+
+    ``detach`` keeps each partition as a standalone table, ``drop`` deletes
+    it and ``archive`` writes it to ``archive_dir`` before deleting it.
+    """
+    if action not in EXPIRE_ACTIONS:
+        raise ValueError(f"Unknown action {action!r}.")
+    if action == "archive" and not archive_dir:
+        raise ValueError("Archiving partitions needs a directory.")
+
+    horizon = add_months(month_start(now or timezone.now()), -retain)
+    expired = [month for month in list_partitions() if month < horizon]
+    for month in expired:
+        name = partition_name(month)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+            if action == "archive":
+                archive_partition(name, archive_dir)
+            if action != "detach":
+                cursor.execute(f'DROP TABLE "{name}"')
+    return expired
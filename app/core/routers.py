@@ -0,0 +1,120 @@
+"""
+Routing of reads to read replicas.
+
+Reads made while serving safe requests go to one of the
+``DATABASE_REPLICAS``, everything else to the primary. A client that wrote
+is pinned to the primary for ``DATABASE_REPLICA_PIN_SECONDS``, so it reads
+its own writes before the replicas catch up. Clients are told apart by the
+hash of their ``Authorization`` header.
+"""
+
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Whether the reads of the current request may go to a replica.
+_use_replicas = ContextVar("use_replicas", default=False)
+
+
+@contextmanager
+def read_from_replicas(enabled=True):
+    """Send the reads of the block to the replicas, or to the primary."""
+    token = _use_replicas.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replicas.reset(token)
+
+
+def reading_from_replicas():
+    """Return whether reads currently go to a replica."""
+    return bool(settings.DATABASE_REPLICAS) and _use_replicas.get()
+
+
+def client_key(request):
+    """Return the pin cache key of the client of a request, if it has one."""
+    authorization = request.META.get("HTTP_AUTHORIZATION")
+    if not authorization:
+        return None
+    return "db:pinned:" + hashlib.sha256(authorization.encode()).hexdigest()
+
+
+class ReplicaRouter:
+    """Database router sending reads to the replicas when allowed."""
+
+    def db_for_read(self, model, **hints):
+        """Return a random replica if reads may go to one."""
+        if reading_from_replicas():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        """Return the primary, even for objects read from a replica."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Allow relations between objects of the primary and its replicas."""
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware letting safe requests read from the replicas unless their
+    client is pinned, and pinning the clients of other requests.
+
+    It runs natively under ASGI too, so async views like the task events
+    stream aren't moved to a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        key = client_key(request)
+        if request.method in SAFE_METHODS:
+            pinned = key is not None and cache.get(key) is not None
+            with read_from_replicas(not pinned):
+                return self.get_response(request)
+
+        response = self.get_response(request)
+        if key is not None:
+            cache.set(key, True, settings.DATABASE_REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        key = client_key(request)
+        if request.method in SAFE_METHODS:
+            pinned = key is not None and await cache.aget(key) is not None
+            with read_from_replicas(not pinned):
+                return await self.get_response(request)
+
+        response = await self.get_response(request)
+        if key is not None:
+            await cache.aset(key, True, settings.DATABASE_REPLICA_PIN_SECONDS)
+        return response
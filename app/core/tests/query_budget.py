@@ -0,0 +1,68 @@
+"""
+Helpers asserting how many SQL queries API requests run.
+"""
+
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+BUDGET_SIZES = [1, 10, 1000]
+
+
+def format_queries(queries):
+    """Return captured queries as numbered lines."""
+    return "\n".join(
+        f"{number}. {query['sql']}" for number, query in enumerate(queries, 1)
+    )
+
+
+class QueryBudgetMixin:
+    """
+    Mixin for test cases declaring the query budget of API requests.
+
+    A budget is the most queries a request may run, whatever the amount of
+    data it touches. Failures list every query the request ran.
+    """
+
+    budget_sizes = BUDGET_SIZES
+
+    @contextmanager
+    def assertQueryBudget(self, budget):
+        """Assert the block runs at most ``budget`` queries."""
+        with CaptureQueriesContext(connection) as queries:
+            yield queries
+
+        if len(queries) > budget:
+            self.fail(
+                f"{len(queries)} queries run, the budget is {budget}:\n"
+                f"{format_queries(queries)}"
+            )
+
+    def assertConstantQueryBudget(self, budget, seed, request, sizes=None):
+        """
+        Assert a request stays within budget and runs the same number of
+        queries as the data it reads grows.
+
+        ``seed(size)`` creates data of the given size and returns what
+        ``request`` takes; ``request`` sends the request and returns the
+        response. ``sizes`` replace the budget sizes of the test case.
+        """
+        sizes = sizes or self.budget_sizes
+        expected = None
+        for size in sizes:
+            with self.subTest(size=size):
+                state = seed(size)
+                with self.assertQueryBudget(budget) as queries:
+                    res = request(state)
+
+                self.assertLess(res.status_code, 400, res.data)
+                if expected is None:
+                    expected = queries
+                elif len(queries) != len(expected):
+                    self.fail(
+                        f"{len(queries)} queries run for {size} rows and "
+                        f"{len(expected)} for {sizes[0]}:\n"
+                        f"{format_queries(queries)}"
+                    )
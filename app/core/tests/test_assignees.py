@@ -0,0 +1,141 @@
+"""
+Tests for the denormalized assignees of tasks.
+"""
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core import assignees
+from core.models import Task
+
+
+def create_user(email):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email=email, password="Test123")
+
+
+class TaskAssigneesTests(TestCase):
+    """Test the assignee columns follow the assignees of tasks."""
+
+    def setUp(self):
+        self.owner = create_user("owner@example.com")
+        self.bob = create_user("bob@example.com")
+        self.alice = create_user("alice@example.com")
+        self.task = Task.objects.create(user=self.owner, name="Task")
+
+    def assertAssignees(self, task, ids, email):
+        """Assert the assignee columns of a task."""
+        task.refresh_from_db()
+        self.assertEqual(task.assignee_ids, ids)
+        self.assertEqual(task.primary_assignee_email, email)
+
+    def test_new_task_has_no_assignees(self):
+        """Test tasks start without assignees."""
+        self.assertAssignees(self.task, [], "")
+
+    def test_add_and_remove(self):
+        """Test assigning and unassigning users through the task."""
+        self.task.assigned_to.add(self.bob, self.alice)
+        self.assertAssignees(
+            self.task, sorted([self.bob.id, self.alice.id]), "alice@example.com"
+        )
+
+        self.task.assigned_to.remove(self.alice)
+        self.assertAssignees(self.task, [self.bob.id], "bob@example.com")
+
+        self.task.assigned_to.clear()
+        self.assertAssignees(self.task, [], "")
+
+    def test_reverse_add_and_clear(self):
+        """Test assigning and unassigning tasks through the user."""
+        other = Task.objects.create(user=self.owner, name="Other")
+
+        self.bob.tasks_assigned.add(self.task, other)
+        self.assertAssignees(other, [self.bob.id], "bob@example.com")
+
+        self.bob.tasks_assigned.clear()
+        self.assertAssignees(self.task, [], "")
+        self.assertAssignees(other, [], "")
+
+    def test_email_change(self):
+        """Test changing the email of an assignee updates the sort key."""
+        self.task.assigned_to.add(self.bob, self.alice)
+
+        self.alice.email = "zoe@example.com"
+        self.alice.save()
+
+        self.assertAssignees(
+            self.task, sorted([self.bob.id, self.alice.id]), "bob@example.com"
+        )
+
+    def test_user_deleted(self):
+        """Test deleting an assignee removes them from the columns."""
+        self.task.assigned_to.add(self.bob, self.alice)
+
+        self.alice.delete()
+
+        self.assertAssignees(self.task, [self.bob.id], "bob@example.com")
+
+    def test_saving_loaded_task_keeps_assignees(self):
+        """Test saving a task loaded before its assignees changed."""
+        loaded = Task.objects.get(id=self.task.id)
+        self.task.assigned_to.add(self.bob)
+
+        loaded.name = "Renamed"
+        loaded.save()
+
+        self.assertAssignees(self.task, [self.bob.id], "bob@example.com")
+        self.assertEqual(self.task.name, "Renamed")
+
+    def test_stale_assignees(self):
+        """Test tasks updated around the signals are found and refreshed."""
+        self.task.assigned_to.add(self.bob)
+        Task.objects.filter(id=self.task.id).update(assignee_ids=[])
+
+        self.assertEqual(assignees.stale_assignees(Task.objects.all()), [self.task.id])
+
+        assignees.refresh_assignees(Task.objects.all())
+        self.assertEqual(assignees.stale_assignees(Task.objects.all()), [])
+
+    def test_fill_assignees(self):
+        """Test filling the columns of tasks assigned without signals."""
+        Task.assigned_to.through.objects.create(task=self.task, user=self.bob)
+
+        assignees.fill_assignees(self.task.id)
+
+        self.assertAssignees(self.task, [self.bob.id], "bob@example.com")
+
+
+class CheckTaskAssigneesCommandTests(TestCase):
+    """Test the check_task_assignees command."""
+
+    def setUp(self):
+        self.user = create_user("user@example.com")
+        self.task = Task.objects.create(user=self.user, name="Task")
+        self.task.assigned_to.add(self.user)
+
+    def test_consistent(self):
+        """Test consistent tasks pass the check."""
+        out = StringIO()
+
+        call_command("check_task_assignees", "--batch-size=1", stdout=out)
+
+        self.assertIn("consistent", out.getvalue())
+
+    def test_stale(self):
+        """Test stale tasks fail the check until fixed."""
+        Task.objects.update(primary_assignee_email="")
+
+        with self.assertRaisesMessage(CommandError, str(self.task.id)):
+            call_command("check_task_assignees", stdout=StringIO())
+
+        out = StringIO()
+        call_command("check_task_assignees", "--fix", stdout=out)
+
+        self.assertIn("Fixed the assignees of 1 tasks.", out.getvalue())
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.primary_assignee_email, "user@example.com")
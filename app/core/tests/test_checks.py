@@ -0,0 +1,32 @@
+"""
+Tests for the system checks of the deployment settings.
+"""
+
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_shared_cache
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    """Test the check of the cache shared between processes."""
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_process_local_cache(self):
+        """Test a cache kept in each process is reported."""
+        errors = check_shared_cache(None)
+
+        self.assertEqual([error.id for error in errors], ["core.W001"])
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://localhost:6379",
+            }
+        }
+    )
+    def test_shared_cache(self):
+        """Test a cache shared between processes passes."""
+        self.assertEqual(check_shared_cache(None), [])
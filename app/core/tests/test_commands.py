@@ -2,13 +2,17 @@
 Test custom Django management commands.
 """
 
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+
+from core.models import Task, TaskChangesHistory
 
 
 @patch("core.management.commands.wait_for_db.Command.check")
@@ -34,3 +38,36 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+
+class SeedTasksCommandTests(TestCase):
+    """Test the seed_tasks command."""
+
+    def test_seed_tasks(self):
+        """Test seeding users, tasks, assignees and history."""
+        call_command(
+            "seed_tasks",
+            "--users=5",
+            "--tasks=20",
+            "--assignees-per-task=2",
+            "--history-per-task=3",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(get_user_model().objects.count(), 5)
+        self.assertEqual(Task.objects.count(), 20)
+        self.assertEqual(Task.assigned_to.through.objects.count(), 40)
+        self.assertEqual(TaskChangesHistory.objects.count(), 60)
+        task = Task.objects.prefetch_related("assigned_to").first()
+        self.assertEqual(len({user.id for user in task.assigned_to.all()}), 2)
+        self.assertTrue(task.changes.order_by("change_date").first().is_snapshot)
+        user = get_user_model().objects.first()
+        self.assertTrue(user.check_password("seed-password"))
+
+    def test_seed_tasks_twice(self):
+        """Test seeding again adds new users and tasks."""
+        call_command("seed_tasks", "--users=2", "--tasks=3", stdout=StringIO())
+        call_command("seed_tasks", "--users=2", "--tasks=3", stdout=StringIO())
+
+        self.assertEqual(get_user_model().objects.count(), 4)
+        self.assertEqual(Task.objects.count(), 6)
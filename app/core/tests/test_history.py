@@ -0,0 +1,219 @@
+"""
+Tests for the delta-encoded task history.
+"""
+
+from io import StringIO
+
+import psycopg2
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core import history
+from core.models import Task, TaskChangesHistory, TaskHistoryOutbox
+
+
+def update_task(task, user, **changes):
+    """Apply changes to a task and queue them like the task API does."""
+    before = history.take_snapshot(task)
+    assigned_to = changes.pop("assigned_to", None)
+    for field, value in changes.items():
+        setattr(task, field, value)
+    task.save()
+    if assigned_to is not None:
+        task.assigned_to.set(assigned_to)
+        changes["assigned_to"] = assigned_to
+    history.enqueue_change(task, user, before, history.apply_changes(before, changes))
+    history.drain_outbox(limit=100)
+    return task.changes.latest("change_date", "id")
+
+
+@override_settings(TASK_HISTORY_SNAPSHOT_INTERVAL=3)
+class TaskHistoryTests(TestCase):
+    """Test recording and rebuilding task history."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="Test123"
+        )
+        self.other = get_user_model().objects.create_user(
+            email="other@example.com", password="Test123"
+        )
+        self.task = Task.objects.create(
+            user=self.user, name="Draft", description="Long text", status="new"
+        )
+
+    def test_changes_store_diff_between_snapshots(self):
+        """Test only the first of every interval records stores a full snapshot."""
+        changes = [
+            update_task(self.task, self.user, status="in_progress"),
+            update_task(self.task, self.user, name="Final"),
+            update_task(self.task, self.user, assigned_to=[self.other]),
+            update_task(self.task, self.user, status="done"),
+        ]
+
+        self.assertEqual(
+            [change.is_snapshot for change in changes], [True, False, False, True]
+        )
+        self.assertEqual(
+            changes[0].task_snapshot,
+            {
+                "name": "Draft",
+                "description": "Long text",
+                "status": "new",
+                "assigned_to": [],
+            },
+        )
+        self.assertEqual(changes[1].task_snapshot, {"name": "Draft"})
+        self.assertEqual(changes[2].task_snapshot, {"assigned_to": []})
+
+    def test_rebuild_snapshot_every_version(self):
+        """Test every version is rebuilt to the full state before its change."""
+        expected = []
+        for changes in [
+            {"status": "in_progress"},
+            {"name": "Renamed"},
+            {"assigned_to": [self.other]},
+            {"description": "Short"},
+            {"status": "done", "name": "Final"},
+        ]:
+            self.task.refresh_from_db()
+            expected.append(history.take_snapshot(self.task))
+            update_task(self.task, self.user, **changes)
+
+        changes = TaskChangesHistory.objects.order_by("change_date", "id")
+        self.assertEqual(
+            [history.rebuild_snapshot(change) for change in changes], expected
+        )
+
+    def test_compact_history_converts_full_snapshots(self):
+        """Test compacting legacy full snapshots keeps every version intact."""
+        now = timezone.now()
+        states = [
+            {"name": "A", "description": "Text", "status": "new", "assigned_to": []},
+            {"name": "B", "description": "Text", "status": "new", "assigned_to": []},
+            {"name": "B", "description": "Text", "status": "done", "assigned_to": []},
+            {"name": "C", "description": "Text", "status": "done", "assigned_to": []},
+        ]
+        for i, state in enumerate(states):
+            TaskChangesHistory.objects.create(
+                task=self.task,
+                changed_by=self.user,
+                change_date=now - timezone.timedelta(minutes=10 - i),
+                task_snapshot=state,
+            )
+
+        out = StringIO()
+        call_command("compact_task_history", stdout=out)
+
+        changes = list(TaskChangesHistory.objects.order_by("change_date", "id"))
+        self.assertIn("Compacted 2 records of 1 tasks.", out.getvalue())
+        self.assertEqual(
+            [change.is_snapshot for change in changes], [True, False, False, True]
+        )
+        self.assertEqual(changes[1].task_snapshot, {"status": "new"})
+        self.assertEqual(
+            [history.rebuild_snapshot(change) for change in changes], states
+        )
+
+
+@override_settings(TASK_HISTORY_SNAPSHOT_INTERVAL=3)
+class TaskHistoryOutboxTests(TestCase):
+    """Test queueing changes and writing them to the history in batches."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="Test123"
+        )
+
+    def queue(self, task, **changes):
+        """Apply changes to a task and queue them without writing the history."""
+        before = history.take_snapshot(task)
+        for field, value in changes.items():
+            setattr(task, field, value)
+        task.save()
+        history.enqueue_change(
+            task, self.user, before, history.apply_changes(before, changes)
+        )
+
+    def test_drain_writes_queued_changes_in_order(self):
+        """Test several changes of a task in one batch keep their order."""
+        task = Task.objects.create(user=self.user, name="Draft")
+        for name in ["First", "Second", "Third", "Fourth"]:
+            self.queue(task, name=name)
+
+        written = history.drain_outbox(limit=100)
+
+        changes = list(task.changes.order_by("change_date", "id"))
+        self.assertEqual(written, 4)
+        self.assertFalse(TaskHistoryOutbox.objects.exists())
+        self.assertEqual(
+            [change.is_snapshot for change in changes], [True, False, False, True]
+        )
+        self.assertEqual(
+            [history.rebuild_snapshot(change)["name"] for change in changes],
+            ["Draft", "First", "Second", "Third"],
+        )
+
+    def test_drain_queries_do_not_grow_with_tasks(self):
+        """Test a batch runs the same queries for one or many tasks."""
+        tasks = [Task.objects.create(user=self.user, name="Task") for _ in range(20)]
+        for task in tasks:
+            self.queue(task, status="done")
+
+        # Claim, check for blocked tasks, snapshot decisions, insert and
+        # delete, within a savepoint as tests already run in a transaction.
+        with self.assertNumQueries(7):
+            history.drain_outbox(limit=100)
+
+        self.assertEqual(TaskChangesHistory.objects.count(), 20)
+
+    def test_run_history_worker_drains_outbox(self):
+        """Test the worker command writes every queued change and exits."""
+        task = Task.objects.create(user=self.user, name="Draft")
+        for name in ["First", "Second", "Third"]:
+            self.queue(task, name=name)
+
+        out = StringIO()
+        call_command("run_history_worker", "--once", "--batch-size=2", stdout=out)
+
+        self.assertIn("Wrote 3 history records.", out.getvalue())
+        self.assertEqual(task.changes.count(), 3)
+        self.assertFalse(TaskHistoryOutbox.objects.exists())
+
+
+class TaskHistoryOutboxConcurrencyTests(TransactionTestCase):
+    """Test draining the outbox while another worker holds a batch."""
+
+    def test_drain_skips_tasks_with_earlier_changes_claimed(self):
+        """Test a task is left for later while its earlier change is claimed."""
+        user = get_user_model().objects.create_user(
+            email="user@example.com", password="Test123"
+        )
+        task = Task.objects.create(user=user, name="Draft")
+        other = Task.objects.create(user=user, name="Other")
+        snapshot = history.take_snapshot(task)
+        claimed = history.enqueue_change(task, user, snapshot, snapshot)
+        history.enqueue_change(other, user, snapshot, snapshot)
+        history.enqueue_change(task, user, snapshot, snapshot)
+
+        worker = psycopg2.connect(**connection.get_connection_params())
+        try:
+            with worker.cursor() as cursor:
+                cursor.execute(
+                    "SELECT id FROM core_taskhistoryoutbox WHERE id = %s FOR UPDATE",
+                    [claimed.id],
+                )
+                written = history.drain_outbox(limit=100)
+        finally:
+            worker.close()
+
+        self.assertEqual(written, 1)
+        self.assertEqual(
+            list(TaskChangesHistory.objects.values_list("task_id", flat=True)),
+            [other.id],
+        )
+        self.assertEqual(history.drain_outbox(limit=100), 2)
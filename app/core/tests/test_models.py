@@ -107,3 +107,21 @@ class ModelTest(TestCase):
         )
         expected_str = f"Change in task {task.id} by {user2.email} on {change_date}"
         self.assertEqual(str(change_history), expected_str)
+
+    def test_task_change_history_of_deleted_task(self):
+        """Test a history record outliving its task still has a string."""
+        user = get_user_model().objects.create_user(
+            email="example@test.com",
+            password="Pass123",
+        )
+        task = models.Task.objects.create(user=user, name="Test Name")
+        change_history = models.TaskChangesHistory.objects.create(
+            task=task,
+            changed_by=user,
+            task_snapshot={"name": "Test Name"},
+        )
+        task_id = task.id
+        task.delete()
+
+        change_history = models.TaskChangesHistory.objects.get(id=change_history.id)
+        self.assertIn(f"Change in task {task_id} by", str(change_history))
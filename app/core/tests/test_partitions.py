@@ -0,0 +1,193 @@
+"""
+Tests for the monthly partitions of the task history.
+"""
+
+import datetime
+import gzip
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from core import partitions
+from core.models import Task, TaskChangesHistory
+
+
+def month(year, number):
+    """Return the start of a month in UTC."""
+    return datetime.datetime(year, number, 1, tzinfo=datetime.timezone.utc)
+
+
+def partition_rows(name):
+    """Return the number of rows stored in a partition."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM "{name}"')
+        return cursor.fetchone()[0]
+
+
+def table_exists(name):
+    """Return whether a table exists."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+        return cursor.fetchone()[0]
+
+
+class PartitionTests(TestCase):
+    """Test creating and expiring task history partitions."""
+
+    def setUp(self):
+        # Partitions with rows inserted in the same transaction cannot be
+        # dropped while their deferred foreign key checks are pending.
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.task = Task.objects.create(user=self.user, name="Task")
+
+    def record(self, change_date):
+        return TaskChangesHistory.objects.create(
+            task=self.task,
+            changed_by=self.user,
+            change_date=change_date,
+            task_snapshot={"name": "Task"},
+        )
+
+    def test_add_months(self):
+        """Test moving across years by months."""
+        self.assertEqual(partitions.add_months(month(2024, 11), 3), month(2025, 2))
+        self.assertEqual(partitions.add_months(month(2024, 1), -1), month(2023, 12))
+
+    def test_month_start_is_utc(self):
+        """Test the month of a moment is taken in UTC."""
+        moment = datetime.datetime(
+            2024, 3, 1, 0, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2))
+        )
+
+        self.assertEqual(partitions.month_start(moment), month(2024, 2))
+
+    def test_ensure_partitions(self):
+        """Test the current and coming months get a partition once."""
+        now = datetime.datetime(2031, 11, 15, tzinfo=datetime.timezone.utc)
+
+        created = partitions.ensure_partitions(2, now=now)
+
+        self.assertEqual(created, [month(2031, 11), month(2031, 12), month(2032, 1)])
+        self.assertEqual(partitions.ensure_partitions(2, now=now), [])
+        self.assertTrue(set(created).issubset(partitions.list_partitions()))
+
+    def test_create_partition_moves_default_rows(self):
+        """Test rows of a new partition's month leave the default partition."""
+        inside = self.record(
+            datetime.datetime(2033, 5, 10, tzinfo=datetime.timezone.utc)
+        )
+        outside = self.record(
+            datetime.datetime(2033, 6, 10, tzinfo=datetime.timezone.utc)
+        )
+        in_default = partition_rows(partitions.DEFAULT_PARTITION)
+
+        partitions.create_partition(month(2033, 5))
+
+        self.assertEqual(partition_rows("core_taskchangeshistory_y2033m05"), 1)
+        self.assertEqual(partition_rows(partitions.DEFAULT_PARTITION), in_default - 1)
+        self.assertEqual(
+            set(TaskChangesHistory.objects.values_list("id", flat=True)),
+            {inside.id, outside.id},
+        )
+
+    def test_expire_detach(self):
+        """Test detached partitions leave the history but keep their rows."""
+        partitions.create_partition(month(2020, 1))
+        self.record(datetime.datetime(2020, 1, 10, tzinfo=datetime.timezone.utc))
+        kept = self.record(timezone.now())
+
+        expired = partitions.expire_partitions(12, "detach")
+
+        self.assertIn(month(2020, 1), expired)
+        self.assertNotIn(month(2020, 1), partitions.list_partitions())
+        self.assertEqual(list(TaskChangesHistory.objects.all()), [kept])
+        self.assertEqual(partition_rows("core_taskchangeshistory_y2020m01"), 1)
+
+    def test_expire_drop(self):
+        """Test dropped partitions are deleted."""
+        partitions.create_partition(month(2020, 1))
+        self.record(datetime.datetime(2020, 1, 10, tzinfo=datetime.timezone.utc))
+
+        partitions.expire_partitions(12, "drop")
+
+        self.assertFalse(table_exists("core_taskchangeshistory_y2020m01"))
+        self.assertFalse(TaskChangesHistory.objects.exists())
+
+    def test_expire_archive(self):
+        """Test archived partitions are written to a gzipped CSV file."""
+        partitions.create_partition(month(2020, 1))
+        record = self.record(
+            datetime.datetime(2020, 1, 10, tzinfo=datetime.timezone.utc)
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            partitions.expire_partitions(12, "archive", archive_dir=directory)
+
+            path = os.path.join(directory, "core_taskchangeshistory_y2020m01.csv.gz")
+            with gzip.open(path, "rt") as archive:
+                lines = archive.read().splitlines()
+
+        self.assertTrue(lines[0].startswith("id,change_date,"))
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(f"{record.id},"))
+        self.assertFalse(table_exists("core_taskchangeshistory_y2020m01"))
+
+    def test_expire_keeps_recent_partitions(self):
+        """Test partitions within the retention are kept."""
+        partitions.ensure_partitions(0)
+
+        self.assertEqual(partitions.expire_partitions(0, "drop"), [])
+        self.assertIn(
+            partitions.month_start(timezone.now()), partitions.list_partitions()
+        )
+
+    def test_deleting_task_keeps_history(self):
+        """Test deleting a task does not touch its history."""
+        record = self.record(timezone.now())
+
+        self.task.delete()
+
+        self.assertTrue(TaskChangesHistory.objects.filter(id=record.id).exists())
+
+
+class PartitionTaskHistoryCommandTests(TestCase):
+    """Test the partition_task_history command."""
+
+    def test_creates_and_expires(self):
+        """Test partitions are created ahead and old ones expired."""
+        partitions.create_partition(month(2020, 1))
+        out = StringIO()
+
+        call_command(
+            "partition_task_history",
+            "--ahead=6",
+            "--retain-months=12",
+            "--expire=drop",
+            stdout=out,
+        )
+
+        current = partitions.month_start(timezone.now())
+        months = partitions.list_partitions()
+        self.assertIn(partitions.add_months(current, 6), months)
+        self.assertNotIn(month(2020, 1), months)
+        self.assertIn(
+            "Expired core_taskchangeshistory_y2020m01 (drop).", out.getvalue()
+        )
+
+    def test_archive_needs_directory(self):
+        """Test archiving without a directory is refused."""
+        with self.assertRaises(CommandError):
+            call_command(
+                "partition_task_history", "--expire=archive", stdout=StringIO()
+            )
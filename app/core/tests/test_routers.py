@@ -0,0 +1,175 @@
+"""
+Tests for routing reads to read replicas.
+"""
+
+import copy
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Task
+from core.routers import ReplicaRouter, read_from_replicas
+
+
+# Alias of the second local database standing in for a replica.
+REPLICA = "test_replica"
+
+TASK_URL = reverse("task:task-list")
+CHANGES_SINCE_URL = reverse("task:task-changes-since")
+
+
+def detail_url(task_id):
+    """Create and return a task detail URL."""
+    return reverse("task:task-detail", args=[task_id])
+
+
+def add_database(alias):
+    """
+    Configure an alias for a new database on the server of the primary,
+    migrated like it.
+    """
+    settings_dict = copy.deepcopy(connections["default"].settings_dict)
+    name = f"{settings_dict['NAME']}_{alias}"
+    settings_dict["NAME"] = name
+    settings_dict["TEST"].update({"NAME": name, "MIRROR": None})
+    connections.settings[alias] = settings_dict
+    connections[alias].creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+
+
+def remove_database(alias):
+    """Drop the database of an alias added by ``add_database``."""
+    connection = connections[alias]
+    connection.creation.destroy_test_db(connection.settings_dict["NAME"], verbosity=0)
+    del connections[alias]
+    del connections.settings[alias]
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRouterTests(SimpleTestCase):
+    """Test the router picks the database of reads and writes."""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_primary_by_default(self):
+        """Test reads outside of safe requests use the primary."""
+        self.assertEqual(self.router.db_for_read(Task), "default")
+
+    def test_reads_go_to_replicas_when_allowed(self):
+        """Test reads allowed to use replicas are routed to one."""
+        with read_from_replicas():
+            self.assertEqual(self.router.db_for_read(Task), REPLICA)
+            with read_from_replicas(False):
+                self.assertEqual(self.router.db_for_read(Task), "default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test reads use the primary when no replica is configured."""
+        with read_from_replicas():
+            self.assertEqual(self.router.db_for_read(Task), "default")
+
+    def test_writes_go_to_primary(self):
+        """Test writes use the primary, even while reads use replicas."""
+        with read_from_replicas():
+            self.assertEqual(self.router.db_for_write(Task), "default")
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], DATABASE_REPLICA_PIN_SECONDS=60)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Test requests against a primary and a replica, two local databases the
+    tests keep apart to tell which one a request read.
+    """
+
+    databases = {"default", REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        add_database(REPLICA)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        remove_database(REPLICA)
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="Test123"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.task = Task.objects.create(user=self.user, name="Primary")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def replicate(self, name):
+        """Copy the user, token and task to the replica, with another name."""
+        self.user.save(using=REPLICA, force_insert=True)
+        self.token.save(using=REPLICA, force_insert=True)
+        Task.objects.using(REPLICA).create(
+            id=self.task.id, user_id=self.user.id, name=name
+        )
+
+    def test_reads_from_replica(self):
+        """Test safe requests read tasks from the replica."""
+        self.replicate("Replica")
+
+        res = self.client.get(CHANGES_SINCE_URL)
+
+        self.assertEqual(res.data["upserts"][0]["name"], "Replica")
+
+    def test_cached_responses_read_from_primary(self):
+        """Test responses stored in the response cache are read from the primary."""
+        self.replicate("Replica")
+
+        for url in [TASK_URL, detail_url(self.task.id)]:
+            with self.subTest(url=url):
+                res = self.client.get(url)
+
+                self.assertContains(res, "Primary")
+
+    def test_reads_own_writes_from_primary(self):
+        """Test a client reads from the primary after writing, until unpinned."""
+        self.replicate("Replica")
+
+        res = self.client.patch(detail_url(self.task.id), {"status": "done"})
+        self.assertEqual(res.data["name"], "Primary")
+
+        res = self.client.get(CHANGES_SINCE_URL)
+        self.assertEqual(res.data["upserts"][0]["status"], "done")
+
+        other = APIClient()
+        other.force_authenticate(
+            get_user_model().objects.create_user(email="other@example.com")
+        )
+        res = other.get(CHANGES_SINCE_URL)
+        self.assertEqual(res.data["upserts"][0]["status"], "new")
+
+        cache.clear()
+        res = self.client.get(CHANGES_SINCE_URL)
+        self.assertEqual(res.data["upserts"][0]["name"], "Replica")
+
+    def test_new_token_missing_from_replica(self):
+        """Test a token not replicated yet is authenticated on the primary."""
+        res = self.client.get(reverse("user:me"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_deleted_token_left_on_replica(self):
+        """Test a token deleted on the primary is rejected, even replicated."""
+        self.replicate("Replica")
+        self.token.delete()
+
+        res = self.client.get(CHANGES_SINCE_URL)
+
+        self.assertEqual(res.status_code, 401)
@@ -0,0 +1,84 @@
+"""
+Versioned cache of task API responses.
+
+Cached responses are keyed on a version shared by every task. Any write to
+tasks bumps the version, which invalidates every cached response at once
+without having to find them.
+"""
+
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.routers import read_from_replicas
+
+
+VERSION_KEY = "task:version"
+
+
+def get_version():
+    """Return the current version of the tasks."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock so a lost counter never reuses an old version.
+        cache.add(VERSION_KEY, time.time_ns())
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _increment_version():
+    """Increment the version of the tasks."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns())
+
+
+def bump_version():
+    """
+    Invalidate every cached task response.
+
+    The version is bumped right away and again once the transaction commits,
+    so a response computed from data read before the commit can't be cached
+    under the new version.
+    """
+    _increment_version()
+    transaction.on_commit(_increment_version)
+
+
+def normalized_query(request):
+    """Return the query string of a request with sorted parameters."""
+    return urlencode(sorted(request.query_params.lists()), doseq=True)
+
+
+def response_cache_key(request):
+    """Return the cache key of a response for the user, path and query."""
+    query = normalized_query(request)
+    digest = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+    return f"task:response:{get_version()}:{request.user.pk}:{digest}"
+
+
+def cached_response(request, get_response):
+    """
+    Return a response from the cache, or get it and cache it if it's a 200.
+
+    Responses to cache are read from the primary: a lagging replica would
+    store data older than the version they are cached under.
+    """
+    key = response_cache_key(request)
+    data = cache.get(key)
+    if data is not None:
+        return Response(data)
+
+    with read_from_replicas(False):
+        response = get_response()
+    if response.status_code == status.HTTP_200_OK:
+        cache.set(key, response.data, settings.TASK_RESPONSE_CACHE_TIMEOUT)
+    return response
@@ -0,0 +1,122 @@
+"""
+HTTP validators of task responses for conditional requests.
+
+Validators are computed without running the serializers: the detail from
+the version and update timestamp of the task and the state of its history,
+the list from the tasks version of the response cache. The detail ETag
+starts with the version of the task, which updates sending it back in
+``If-Match`` are applied to.
+"""
+
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import BigIntegerField, OuterRef, Subquery, Value
+from django.utils.http import parse_etags
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from core.models import Task, TaskChangesHistory, TaskHistoryOutbox
+from task.cache import get_version, normalized_query
+
+
+class PreconditionFailed(APIException):
+    """The task changed since the version an update was made against."""
+
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "The task has changed since the version given in If-Match."
+    default_code = "precondition_failed"
+
+
+def make_etag(*parts):
+    """Return an ETag value hashing the given parts."""
+    return hashlib.md5(":".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def shows_changes(request):
+    """Return whether the requested task detail embeds the changes of the task."""
+    fields = request.query_params.get("fields", "")
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    return not names or "changes" in names
+
+
+def task_validators(request, pk):
+    """
+    Return the version, update timestamp, latest history record and latest
+    queued change of the requested task, looked up once per request.
+
+    The history of a task is written after its change, without touching
+    the task, so the history state is part of the validators of the detail
+    when it embeds the changes.
+    """
+    if not hasattr(request, "task_validators"):
+        if shows_changes(request):
+            latest_change = Subquery(
+                TaskChangesHistory.objects.filter(task_id=OuterRef("pk"))
+                .order_by("-change_date", "-id")
+                .values("id")[:1]
+            )
+            latest_queued = Subquery(
+                TaskHistoryOutbox.objects.filter(task_id=OuterRef("pk"))
+                .order_by("-id")
+                .values("id")[:1]
+            )
+        else:
+            latest_change = latest_queued = Value(None, BigIntegerField())
+        try:
+            request.task_validators = (
+                Task.objects.filter(pk=pk)
+                .annotate(latest_change=latest_change, latest_queued=latest_queued)
+                .values_list("version", "updated_at", "latest_change", "latest_queued")
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            request.task_validators = None
+    return request.task_validators
+
+
+def task_updated_at(request, pk=None, **kwargs):
+    """
+    Return when the requested task last changed, unless changes are still
+    queued for its history, whose records will change the detail later.
+    """
+    validators = task_validators(request, pk)
+    if validators is None or validators[3] is not None:
+        return None
+    return validators[1]
+
+
+def task_etag(request, pk=None, **kwargs):
+    """Return the ETag of a task detail response."""
+    validators = task_validators(request, pk)
+    if validators is None:
+        return None
+    version, _, latest_change, latest_queued = validators
+    query = normalized_query(request)
+    return f"{version}-{make_etag(pk, latest_change, latest_queued, query)}"
+
+
+def if_match_versions(request):
+    """
+    Return the task versions the ``If-Match`` header of a request accepts,
+    or None if it has none or accepts any version.
+    """
+    header = request.headers.get("If-Match")
+    if header is None:
+        return None
+    etags = parse_etags(header)
+    if etags == ["*"]:
+        return None
+
+    versions = set()
+    for etag in etags:
+        version = etag.strip('"').partition("-")[0]
+        if version.isdigit():
+            versions.add(int(version))
+    return versions
+
+
+def task_list_etag(request, **kwargs):
+    """Return the ETag of a task list response."""
+    return make_etag(get_version(), normalized_query(request))
@@ -0,0 +1,148 @@
+"""
+Task change events pushed to subscribers through PostgreSQL LISTEN/NOTIFY.
+
+Writes queue a notification in their transaction, which PostgreSQL only
+delivers once it commits. Each worker process holds a single listening
+connection and fans its notifications out to the queues of its subscribers,
+so idle subscribers cost no database connection and no outside broker is
+needed.
+"""
+
+import asyncio
+import json
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from django.conf import settings
+from django.db import connection, connections
+
+
+CHANNEL = "task_events"
+# NOTIFY payloads are limited to 8000 bytes, which 200 ids always fit in.
+NOTIFY_CHUNK_SIZE = 200
+
+
+def notify(event, task_ids):
+    """Queue an event about tasks, sent when the transaction commits."""
+    task_ids = list(task_ids)
+    for start in range(0, len(task_ids), NOTIFY_CHUNK_SIZE):
+        end = start + NOTIFY_CHUNK_SIZE
+        payload = json.dumps(
+            {"event": event, "ids": task_ids[start:end]}, separators=(",", ":")
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+
+
+class Broadcaster:
+    """
+    Fan the notifications of one listening connection out to subscribers.
+
+    Each subscriber gets a bounded queue of payloads. A subscriber too slow
+    to keep up, or still subscribed when the connection is lost, gets
+    ``None`` instead of the events it missed and should resync.
+    """
+
+    def __init__(self, channel, queue_size):
+        self.channel = channel
+        self.queue_size = queue_size
+        self.queues = set()
+        self.connection = None
+        self.loop = None
+
+    def start(self):
+        """Listen to the channel on a new connection of the running loop."""
+        self.stop()
+        params = connections["default"].get_connection_params()
+        self.connection = psycopg2.connect(**params)
+        self.connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        self.loop = asyncio.get_running_loop()
+        self.loop.add_reader(self.connection.fileno(), self.receive)
+
+    def stop(self):
+        """Close the listening connection and reset every subscriber."""
+        if self.connection is not None:
+            if not self.loop.is_closed():
+                self.loop.remove_reader(self.connection.fileno())
+            self.connection.close()
+            self.connection = None
+        for queue in list(self.queues):
+            self.reset(queue)
+
+    def running(self):
+        """Return whether the connection is listening for the running loop."""
+        return (
+            self.connection is not None
+            and not self.connection.closed
+            and self.loop is asyncio.get_running_loop()
+        )
+
+    def receive(self):
+        """Read the pending notifications and publish them."""
+        try:
+            self.connection.poll()
+        except psycopg2.Error:
+            self.stop()
+            return
+
+        while self.connection.notifies:
+            self.publish(self.connection.notifies.pop(0).payload)
+
+    def publish(self, payload):
+        """Add a payload to the queue of every subscriber."""
+        for queue in list(self.queues):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self.reset(queue)
+
+    def reset(self, queue):
+        """Drop the events of a subscriber and tell it to resync."""
+        self.queues.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def subscribe(self):
+        """Return a new subscriber queue, listening first if needed."""
+        if not self.running():
+            self.start()
+        queue = asyncio.Queue(self.queue_size)
+        self.queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        """Stop adding payloads to a subscriber queue."""
+        self.queues.discard(queue)
+
+
+broadcaster = Broadcaster(CHANNEL, settings.TASK_EVENTS_QUEUE_SIZE)
+
+
+async def stream(queue):
+    """
+    Yield the events of a subscriber queue as Server-Sent Events.
+
+    A comment is sent when no event came for ``TASK_EVENTS_KEEPALIVE``
+    seconds, so proxies keep the connection open and a gone client is
+    noticed. The stream ends with a ``reset`` event if events were lost.
+    """
+    try:
+        yield "event: ready\ndata: {}\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(
+                    queue.get(), settings.TASK_EVENTS_KEEPALIVE
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if payload is None:
+                yield "event: reset\ndata: {}\n\n"
+                return
+            yield f"event: {json.loads(payload)['event']}\ndata: {payload}\n\n"
+    finally:
+        broadcaster.unsubscribe(queue)
@@ -2,17 +2,30 @@
 Filters for task API.
 """
 
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
 from django_filters import rest_framework as filters
 
 from core.models import Task
 
 
 class TaskFilter(filters.FilterSet):
+    search = filters.CharFilter(method="filter_search")
     name = filters.CharFilter(field_name="name", lookup_expr="icontains")
-    description = filters.CharFilter(field_name="description", lookup_expr="iconstains")
+    description = filters.CharFilter(field_name="description", lookup_expr="icontains")
     status = filters.ChoiceFilter(field_name="status", choices=Task.STATUS_CHOICES)
     assigned_to = filters.NumberFilter(field_name="assigned_to__id")
 
     class Meta:
         model = Task
         fields = ["id", "name", "description", "status", "user", "assigned_to"]
+
+    def filter_search(self, queryset, name, value):
+        """Filter by full-text search on name and description, best match first."""
+        query = SearchQuery(value, search_type="websearch", config="english")
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=Cast(SearchRank(F("search_vector"), query), FloatField()))
+            .order_by("-rank", "-id")
+        )
@@ -0,0 +1,309 @@
+"""
+Pagination for task APIs.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """JSON encoder keeping the microseconds DjangoJSONEncoder drops."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _is_nullable(model, path):
+    """Return whether a lookup path can evaluate to NULL."""
+    opts = model._meta
+    for part in path.split("__"):
+        try:
+            field = opts.get_field(part)
+        except FieldDoesNotExist:
+            return True
+        if field.null:
+            return True
+        if field.is_relation:
+            opts = field.related_model._meta
+
+    return False
+
+
+def _resolve(instance, path):
+    """
+    Follow a lookup path on an instance, stopping at the first None, or
+    read it from a row of ``values()``.
+    """
+    if isinstance(instance, dict):
+        return instance.get(path)
+
+    value = instance
+    for part in path.split("__"):
+        value = getattr(value, part, None)
+        if value is None:
+            break
+
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination which seeks on the ordering key instead of using OFFSET.
+
+    The queryset ordering (including any applied by ``OrderingFilter``) is
+    extended with the primary key as a tiebreaker, so every page is fetched
+    with ``WHERE (key) > :cursor ... LIMIT n`` and stays cheap however deep
+    the client pages.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("-id",)
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return a single page of results for the request cursor."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.keys = self.get_keys(queryset)
+        self.nullable = {
+            name: _is_nullable(queryset.model, name) for name, _ in self.keys
+        }
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor["reverse"]
+
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+        if cursor is not None:
+            try:
+                queryset = queryset.filter(self.get_seek_filter(cursor, reverse))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.next_position = self.get_position(rows[-1]) if rows else None
+        if rows:
+            self.previous_position = self.get_position(rows[0])
+        elif cursor is not None and not reverse:
+            self.previous_position = cursor["position"]
+        else:
+            self.previous_position = None
+
+        return rows
+
+    def get_page_size(self, request):
+        """Return the page size requested by the client, within bounds."""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_keys(self, queryset):
+        """Return the (lookup, descending) pairs the queryset is ordered by."""
+        ordering = [
+            field
+            for field in queryset.query.order_by or self.ordering
+            if isinstance(field, str)
+        ] or list(self.ordering)
+        pk_name = queryset.model._meta.pk.name
+
+        keys = []
+        for field in ordering:
+            name = field.lstrip("-")
+            name = pk_name if name == "pk" else name
+            keys.append((name, field.startswith("-")))
+        if pk_name not in [name for name, _ in keys]:
+            keys.append((pk_name, keys[0][1]))
+
+        return keys
+
+    def get_signature(self):
+        """Return the ordering a cursor is bound to."""
+        return [f"-{name}" if desc else name for name, desc in self.keys]
+
+    def get_order_by(self, reverse):
+        """Return ORDER BY expressions, flipped when paging backwards."""
+        order_by = []
+        for name, descending in self.keys:
+            if descending != reverse:
+                order_by.append(F(name).desc(nulls_first=True))
+            else:
+                order_by.append(F(name).asc(nulls_last=True))
+
+        return order_by
+
+    def get_seek_filter(self, cursor, reverse):
+        """
+        Return the row-value comparison selecting rows past the cursor.
+
+        The comparison is expanded into ORs, which PostgreSQL can not use as
+        an index condition, so it is combined with an inclusive bound on the
+        first key that lets the index scan start at the cursor.
+        """
+        seek = Q(pk__in=[])
+        equal = Q()
+        for (name, descending), value in zip(self.keys, cursor["position"]):
+            seek |= equal & self._past(name, descending != reverse, value)
+            if value is None:
+                equal &= Q(**{f"{name}__isnull": True})
+            else:
+                equal &= Q(**{name: value})
+
+        if len(self.keys) == 1:
+            return seek
+        (name, descending), value = self.keys[0], cursor["position"][0]
+        return self._bound(name, descending != reverse, value) & seek
+
+    def _bound(self, name, descending, value):
+        """Return a filter for values past or equal to ``value`` on one key."""
+        if descending:
+            if value is None:
+                return Q()
+            return Q(**{f"{name}__lte": value})
+
+        if value is None:
+            return Q(**{f"{name}__isnull": True})
+        bound = Q(**{f"{name}__gte": value})
+        if self.nullable[name]:
+            bound |= Q(**{f"{name}__isnull": True})
+        return bound
+
+    def _past(self, name, descending, value):
+        """Return a filter for values strictly past ``value`` on one key."""
+        if descending:
+            if value is None:
+                return Q(**{f"{name}__isnull": False})
+            return Q(**{f"{name}__lt": value})
+
+        if value is None:
+            return Q(pk__in=[])
+        past = Q(**{f"{name}__gt": value})
+        if self.nullable[name]:
+            past |= Q(**{f"{name}__isnull": True})
+        return past
+
+    def get_position(self, instance):
+        """Return the ordering key values of an instance."""
+        values = [_resolve(instance, name) for name, _ in self.keys]
+        return json.loads(json.dumps(values, cls=CursorEncoder))
+
+    def encode_cursor(self, position, reverse):
+        """Return a link to the page starting after ``position``."""
+        payload = {
+            "o": self.get_signature(),
+            "p": position,
+            "r": int(reverse),
+        }
+        data = json.dumps(payload, separators=(",", ":"))
+        cursor = base64.urlsafe_b64encode(data.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """Return the position encoded in the request cursor, if any."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            ordering = payload["o"]
+            position = payload["p"]
+            reverse = bool(payload["r"])
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if (
+            ordering != self.get_signature()
+            or not isinstance(position, list)
+            or len(position) != len(self.keys)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return {"position": position, "reverse": reverse}
+
+    def get_next_link(self):
+        """Return the URL of the next page."""
+        if not self.has_next or self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        """Return the URL of the previous page."""
+        if not self.has_previous or self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        """Return the page wrapped with its navigation links."""
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        """Return the OpenAPI schema of a paginated response."""
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        """Return the OpenAPI query parameters used for paging."""
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class TaskChangesPagination(KeysetPagination):
+    """Cursor pagination for the change history of a task, newest first."""
+
+    page_size = 20
+    ordering = ("-change_date", "-id")
@@ -0,0 +1,63 @@
+"""
+Renderers for task exports.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from rest_framework import renderers
+
+
+class Echo:
+    """File-like object which returns what is written instead of buffering it."""
+
+    def write(self, value):
+        """Return the written value."""
+        return value
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """Render rows as newline delimited JSON."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render a list of rows or a single object."""
+        rows = data if isinstance(data, list) else [data]
+        return "".join(self.iter_rows(rows)).encode(self.charset)
+
+    def iter_rows(self, rows, fields=None):
+        """Yield each row as one JSON line."""
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+class CSVRenderer(renderers.BaseRenderer):
+    """Render rows as CSV with a header line."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render a list of rows or a single object."""
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0].keys()) if rows else []
+        return "".join(self.iter_rows(rows, fields)).encode(self.charset)
+
+    def iter_rows(self, rows, fields):
+        """Yield the header and then each row as one CSV line."""
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([self.format_value(row[field]) for field in fields])
+
+    def format_value(self, value):
+        """Return a value as a CSV cell, joining lists with spaces."""
+        if isinstance(value, (list, tuple)):
+            return " ".join(str(item) for item in value)
+        return "" if value is None else value
@@ -2,6 +2,9 @@
 Serializers for task APIs.
 """
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
 from rest_framework import serializers
 
 from core.models import (
@@ -10,20 +13,61 @@ from core.models import (
 )
 
 
+BULK_MAX_ITEMS = 1000
+EXPANDABLE_FIELDS = ["assigned_to", "user"]
+
+
+class TaskUserSerializer(serializers.ModelSerializer):
+    """Serializer for the users expanded in a task."""
+
+    class Meta:
+        model = get_user_model()
+        fields = ["id", "email", "name"]
+        read_only_fields = fields
+
+
 class TaskSerializer(serializers.ModelSerializer):
-    """Serializer for tasks."""
+    """
+    Serializer for tasks.
+
+    Only the fields listed in the ``fields`` context are shown, when given,
+    and the users of the fields listed in ``expand`` are nested instead of
+    given as ids.
+    """
 
     class Meta:
         model = Task
         fields = ["id", "name", "assigned_to", "status"]
         read_only_fields = ["id"]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get("fields")
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in self.context.get("expand", []):
+            if name in self.fields:
+                self.fields[name] = TaskUserSerializer(
+                    many=name == "assigned_to", read_only=True
+                )
+
     def validate_status(self, value):
         """Check that the status is one of the allowed values."""
         if value not in dict(Task.STATUS_CHOICES).keys():
             raise serializers.ValidationError("Invalid status.")
         return value
 
+    def to_representation(self, instance):
+        """Return the task, as it was at ``as_of`` if it was requested."""
+        data = super().to_representation(instance)
+        snapshots = self.context.get("snapshots")
+        if snapshots is not None:
+            for field, value in snapshots[instance.pk].items():
+                if field in data:
+                    data[field] = value
+        return data
+
 
 class TaskDetailSerializer(TaskSerializer):
     """Serializer for task detail view."""
@@ -35,15 +79,133 @@ class TaskDetailSerializer(TaskSerializer):
         read_only_fields = ["user", "changes"]
 
     def get_changes(self, obj):
-        """Retrieve the last 10 changes for the given task."""
-        changes = obj.changes.order_by("-change_date")
+        """Retrieve the most recent changes for the given task."""
+        limit = settings.TASK_DETAIL_CHANGES
+        changes = obj.changes.order_by("-change_date", "-id")
+        if "as_of" in self.context:
+            changes = changes.filter(change_date__lte=self.context["as_of"])
+        changes = changes[:limit]
         return TaskChangesHistorySerializer(changes, many=True).data
 
 
+class TaskSyncSerializer(TaskSerializer):
+    """Serializer for tasks returned to clients syncing changes."""
+
+    class Meta(TaskSerializer.Meta):
+        fields = TaskSerializer.Meta.fields + ["description", "user", "updated_at"]
+        read_only_fields = fields
+
+
 class TaskChangesHistorySerializer(serializers.ModelSerializer):
     """Serializer for task changes history."""
 
     class Meta:
         model = TaskChangesHistory
-        fields = ["id", "task", "changed_by", "change_date", "task_snapshot"]
+        fields = [
+            "id",
+            "task",
+            "changed_by",
+            "change_date",
+            "is_snapshot",
+            "task_snapshot",
+        ]
         read_only_fields = fields
+
+
+class TaskBulkItemSerializer(TaskSerializer):
+    """Serializer for a task created in bulk, with assignees given as ids."""
+
+    assigned_to = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
+
+    class Meta(TaskSerializer.Meta):
+        fields = TaskSerializer.Meta.fields + ["description"]
+
+
+class TaskBulkUpdateItemSerializer(TaskBulkItemSerializer):
+    """Serializer for a task updated in bulk, identified by its id."""
+
+    id = serializers.IntegerField()
+
+    class Meta(TaskBulkItemSerializer.Meta):
+        read_only_fields = []
+        extra_kwargs = {"name": {"required": False}}
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """Serializer for creating, updating and deleting tasks in one request."""
+
+    create = TaskBulkItemSerializer(
+        many=True, required=False, max_length=BULK_MAX_ITEMS
+    )
+    update = TaskBulkUpdateItemSerializer(
+        many=True, required=False, max_length=BULK_MAX_ITEMS
+    )
+    delete = serializers.ListField(
+        child=serializers.IntegerField(), required=False, max_length=BULK_MAX_ITEMS
+    )
+
+    def validate(self, attrs):
+        """
+        Check referenced tasks and users exist, with one query each, and
+        report errors per item.
+        """
+        attrs = {"create": [], "update": [], "delete": [], **attrs}
+        task_ids = [item["id"] for item in attrs["update"]] + attrs["delete"]
+        tasks = (
+            Task.objects.select_for_update()
+            .prefetch_related("assigned_to")
+            .order_by("id")
+            .in_bulk(task_ids)
+        )
+        user_ids = set(
+            get_user_model()
+            .objects.filter(
+                id__in={
+                    user_id
+                    for item in attrs["create"] + attrs["update"]
+                    for user_id in item.get("assigned_to", [])
+                }
+            )
+            .values_list("id", flat=True)
+        )
+
+        errors = {
+            "create": [self.item_errors(item, user_ids) for item in attrs["create"]],
+            "update": [
+                self.item_errors(item, user_ids, tasks, task_ids)
+                for item in attrs["update"]
+            ],
+            "delete": [
+                self.id_errors(task_id, tasks, task_ids) for task_id in attrs["delete"]
+            ],
+        }
+        errors = {key: items for key, items in errors.items() if any(items)}
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        attrs["tasks"] = tasks
+        return attrs
+
+    def item_errors(self, item, user_ids, tasks=None, task_ids=None):
+        """Return the errors of a created or updated item."""
+        errors = {}
+        if tasks is not None:
+            errors.update(self.id_errors(item["id"], tasks, task_ids))
+        missing = [
+            user_id
+            for user_id in item.get("assigned_to", [])
+            if user_id not in user_ids
+        ]
+        if missing:
+            errors["assigned_to"] = [f"Invalid pk {missing} - objects do not exist."]
+        return errors
+
+    def id_errors(self, task_id, tasks, task_ids):
+        """Return the errors of a referenced task id."""
+        if task_id not in tasks:
+            return {"id": ["Task not found."]}
+        if task_ids.count(task_id) > 1:
+            return {"id": ["Task is referenced more than once."]}
+        return {}
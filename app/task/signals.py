@@ -0,0 +1,139 @@
+"""
+Signal handlers keeping task versions and denormalized assignees up to date
+and publishing task events.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.assignees import refresh_assignees, stale_assignees
+from core.history import history_recorded
+from core.models import Task, TaskChangesHistory, TaskTombstone
+from task import events
+from task.cache import bump_version
+
+
+# Ids of the tasks deleted in the current bulk deletion, buried together.
+_bulk_deleted = ContextVar("bulk_deleted", default=None)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=TaskChangesHistory)
+@receiver(history_recorded)
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def invalidate_task_responses(sender, **kwargs):
+    """Invalidate cached task responses when tasks change."""
+    if kwargs.get("action", "post_").startswith("post_"):
+        bump_version()
+
+
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def touch_assigned_tasks(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Update the timestamp and the assignee columns of tasks whose assignees
+    changed.
+    """
+    if reverse and action == "pre_clear":
+        instance._cleared_task_ids = list(
+            Task.objects.filter(assigned_to=instance).values_list("pk", flat=True)
+        )
+        return
+
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        task_ids = [instance.pk]
+    elif reverse and action in ("post_add", "post_remove"):
+        task_ids = list(pk_set)
+    elif reverse and action == "post_clear":
+        task_ids = instance.__dict__.pop("_cleared_task_ids", [])
+    else:
+        return
+
+    refresh_assignees(Task.objects.filter(pk__in=task_ids), updated_at=timezone.now())
+    events.notify("updated", task_ids)
+
+
+def touch_user_tasks(task_ids):
+    """
+    Refresh the assignee columns and the timestamp of tasks whose assignees
+    changed without ``m2m_changed``, invalidate cached task responses and
+    publish the tasks.
+    """
+    if not task_ids:
+        return
+
+    refresh_assignees(Task.objects.filter(pk__in=task_ids), updated_at=timezone.now())
+    bump_version()
+    events.notify("updated", task_ids)
+
+
+@receiver(post_save, sender=get_user_model())
+def refresh_user_assignments(sender, instance, created, update_fields, **kwargs):
+    """Refresh the tasks of a user whose email changed their assignee columns."""
+    if created or (update_fields and "email" not in update_fields):
+        return
+
+    touch_user_tasks(stale_assignees(Task.objects.filter(assigned_to=instance)))
+
+
+@receiver(pre_delete, sender=get_user_model())
+def remember_user_assignments(sender, instance, **kwargs):
+    """Remember the tasks of a user, whose assignments are deleted without signals."""
+    instance._assigned_task_ids = list(
+        Task.objects.filter(assigned_to=instance).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=get_user_model())
+def refresh_deleted_user_assignments(sender, instance, **kwargs):
+    """Refresh the tasks a deleted user was assigned to."""
+    touch_user_tasks(instance.__dict__.pop("_assigned_task_ids", []))
+
+
+@receiver(post_save, sender=Task)
+def publish_saved_task(sender, instance, created, **kwargs):
+    """Publish the creation or update of a task."""
+    events.notify("created" if created else "updated", [instance.pk])
+
+
+def bury_tasks(task_ids):
+    """
+    Leave tombstones of deleted tasks for clients syncing changes, publish
+    their deletion and invalidate cached task responses, with one insert and
+    one notification per chunk of ids rather than queries per task.
+    """
+    TaskTombstone.objects.bulk_create(TaskTombstone(task_id=pk) for pk in task_ids)
+    events.notify("deleted", task_ids)
+    bump_version()
+
+
+@contextmanager
+def bulk_deletion():
+    """Bury the tasks deleted in the block together once it ends."""
+    deleted = []
+    token = _bulk_deleted.set(deleted)
+    try:
+        yield
+    finally:
+        _bulk_deleted.reset(token)
+    if deleted:
+        bury_tasks(deleted)
+
+
+@receiver(post_delete, sender=Task)
+def bury_task(sender, instance, **kwargs):
+    """Bury a deleted task, or leave it to the bulk deletion it is part of."""
+    deleted = _bulk_deleted.get()
+    if deleted is None:
+        bury_tasks([instance.pk])
+    else:
+        deleted.append(instance.pk)
@@ -0,0 +1,132 @@
+"""
+Incremental sync of tasks changed since a cursor.
+
+Upserted tasks are read in ``(updated_at, id)`` order and deleted tasks in
+``(deleted_at, id)`` order from their tombstones. The cursor holds the
+position reached in both, so every call only reads what changed since.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from rest_framework.exceptions import NotFound
+
+from core.models import Task, TaskTombstone
+from task.pagination import CursorEncoder
+
+
+SYNC_PAGE_SIZE = 100
+SYNC_MAX_PAGE_SIZE = 1000
+INVALID_CURSOR_MESSAGE = "Invalid cursor."
+
+
+def get_page_size(value):
+    """Return the page size requested by the client, within bounds."""
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return SYNC_PAGE_SIZE
+
+    if page_size <= 0:
+        return SYNC_PAGE_SIZE
+    return min(page_size, SYNC_MAX_PAGE_SIZE)
+
+
+def encode_cursor(upserted, deleted):
+    """Return a cursor for the positions reached in both streams."""
+    data = json.dumps(
+        {"u": upserted, "d": deleted}, cls=CursorEncoder, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_position(value):
+    """Return a ``(moment, id)`` position from its JSON form."""
+    if value is None:
+        return None
+    moment, pk = value
+    moment = parse_datetime(moment)
+    if moment is None or timezone.is_naive(moment):
+        raise ValueError("Invalid moment.")
+    return moment, int(pk)
+
+
+def decode_cursor(cursor):
+    """Return the positions held by a cursor, ``None`` for the start."""
+    if not cursor:
+        return None, None
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return decode_position(payload["u"]), decode_position(payload["d"])
+    except (TypeError, ValueError, KeyError, binascii.Error):
+        raise NotFound(INVALID_CURSOR_MESSAGE)
+
+
+def seek(queryset, field, position):
+    """Return the rows of a queryset past a position, in position order."""
+    if position is not None:
+        moment, pk = position
+        queryset = queryset.filter(**{f"{field}__gte": moment}).filter(
+            Q(**{f"{field}__gt": moment}) | Q(id__gt=pk)
+        )
+    return queryset.order_by(field, "id")
+
+
+def settle(position, now):
+    """
+    Move a position back to the sync lag if it's more recent.
+
+    Timestamps are taken before their transaction commits, so changes of
+    the last ``TASK_SYNC_LAG`` seconds may still be missing. Syncing again
+    from before them returns such late commits, and the already returned
+    changes once more.
+    """
+    horizon = now - datetime.timedelta(seconds=settings.TASK_SYNC_LAG)
+    if position is not None and position[0] > horizon:
+        return horizon, 0
+    return position
+
+
+def changes_since(cursor, page_size, queryset=None):
+    """
+    Return a page of tasks upserted and ids of tasks deleted since a cursor.
+
+    Both streams are read up to ``page_size`` rows. ``has_more`` tells if
+    either was cut, in which case the client should continue right away
+    from the returned cursor.
+    """
+    now = timezone.now()
+    upserted, deleted = decode_cursor(cursor)
+    if queryset is None:
+        queryset = Task.objects.all()
+
+    tasks = list(seek(queryset, "updated_at", upserted)[: page_size + 1])
+    tombstones = list(
+        seek(TaskTombstone.objects.all(), "deleted_at", deleted).values_list(
+            "deleted_at", "id", "task_id"
+        )[: page_size + 1]
+    )
+    has_more = len(tasks) > page_size or len(tombstones) > page_size
+    tasks, tombstones = tasks[:page_size], tombstones[:page_size]
+
+    if tasks:
+        upserted = (tasks[-1].updated_at, tasks[-1].id)
+    if tombstones:
+        deleted = tombstones[-1][:2]
+    if not has_more:
+        upserted, deleted = settle(upserted, now), settle(deleted, now)
+
+    return {
+        "upserts": tasks,
+        "deletes": [task_id for _, _, task_id in tombstones],
+        "cursor": encode_cursor(upserted, deleted),
+        "has_more": has_more,
+    }
@@ -0,0 +1,161 @@
+"""
+Tests for reading tasks as they were at a past moment.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import history
+from core.models import Task
+
+
+TASK_URL = reverse("task:task-list")
+
+
+def detail_url(task_id):
+    """Create and return a task detail URL."""
+    return reverse("task:task-detail", args=[task_id])
+
+
+def create_user(**kwargs):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**kwargs)
+
+
+def history_queries(queries):
+    """Return the captured queries reading the task history."""
+    return [
+        query["sql"]
+        for query in queries
+        if query["sql"].startswith("SELECT")
+        and '"core_taskchangeshistory"' in query["sql"]
+    ]
+
+
+@override_settings(TASK_HISTORY_SNAPSHOT_INTERVAL=3)
+class TaskAsOfTests(TestCase):
+    """Test the as_of parameter of the task list and detail."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.other = create_user(email="other@example.com", password="Test123")
+        self.client.force_authenticate(self.user)
+
+    def create_task(self, **kwargs):
+        """Create a task through the API and return it."""
+        res = self.client.post(TASK_URL, {"name": "Draft", **kwargs})
+        return Task.objects.get(id=res.data["id"])
+
+    def update_task(self, task, **changes):
+        """Update a task through the API, record it and return the moment after."""
+        self.client.patch(detail_url(task.id), changes)
+        history.drain_outbox(limit=100)
+        return timezone.now()
+
+    def test_retrieve_task_as_of(self):
+        """Test the detail shows the task as it was at the given moment."""
+        task = self.create_task(description="First")
+        created = timezone.now()
+        renamed = self.update_task(task, name="Renamed")
+        assigned = self.update_task(task, assigned_to=[self.other.id])
+        self.update_task(task, status="done", description="Last")
+        self.update_task(task, status="in_progress")
+
+        res = self.client.get(detail_url(task.id), {"as_of": created.isoformat()})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["name"], "Draft")
+        self.assertEqual(res.data["changes"], [])
+
+        res = self.client.get(detail_url(task.id), {"as_of": renamed.isoformat()})
+        self.assertEqual(res.data["name"], "Renamed")
+        self.assertEqual(res.data["assigned_to"], [])
+        self.assertEqual(len(res.data["changes"]), 1)
+
+        res = self.client.get(detail_url(task.id), {"as_of": assigned.isoformat()})
+        self.assertEqual(res.data["assigned_to"], [self.other.id])
+        self.assertEqual(res.data["description"], "First")
+        self.assertEqual(res.data["status"], "new")
+
+    def test_retrieve_task_as_of_with_queued_changes(self):
+        """Test changes not written to the history yet are accounted for."""
+        task = self.create_task(description="First")
+        renamed = self.update_task(task, name="Renamed")
+        self.client.patch(detail_url(task.id), {"status": "done"})
+        self.client.patch(detail_url(task.id), {"description": "Last"})
+
+        res = self.client.get(detail_url(task.id), {"as_of": renamed.isoformat()})
+
+        self.assertEqual(res.data["name"], "Renamed")
+        self.assertEqual(res.data["status"], "new")
+        self.assertEqual(res.data["description"], "First")
+
+    def test_retrieve_task_as_of_now(self):
+        """Test a moment after the last change shows the live task."""
+        task = self.create_task()
+        now = self.update_task(task, name="Renamed", status="done")
+
+        res = self.client.get(detail_url(task.id), {"as_of": now.isoformat()})
+
+        self.assertEqual(res.data["name"], "Renamed")
+        self.assertEqual(res.data["status"], "done")
+
+    def test_list_tasks_as_of(self):
+        """Test the list shows every task as it was at the given moment."""
+        first = self.create_task()
+        second = self.create_task()
+        self.update_task(first, name="First v1")
+        moment = self.update_task(second, status="done")
+        self.update_task(first, name="First v2")
+        self.update_task(second, status="in_progress", name="Second v2")
+
+        res = self.client.get(TASK_URL, {"as_of": moment.isoformat()})
+
+        tasks = {task["id"]: task for task in res.data["results"]}
+        self.assertEqual(tasks[first.id]["name"], "First v1")
+        self.assertEqual(tasks[second.id]["name"], "Draft")
+        self.assertEqual(tasks[second.id]["status"], "done")
+
+    def test_tasks_created_after_as_of_are_not_found(self):
+        """Test tasks created after the given moment are left out."""
+        first = self.create_task()
+        moment = self.update_task(first, name="First v1")
+        second = self.create_task()
+
+        res = self.client.get(TASK_URL, {"as_of": moment.isoformat()})
+
+        self.assertEqual([task["id"] for task in res.data["results"]], [first.id])
+
+        res = self.client.get(detail_url(second.id), {"as_of": moment.isoformat()})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_tasks_as_of_reads_history_once(self):
+        """Test the history is read by one query whatever the page size."""
+        for count in (1, 10):
+            with self.subTest(count=count):
+                tasks = [self.create_task() for _ in range(count)]
+                moment = timezone.now()
+                for task in tasks:
+                    self.update_task(task, name="Renamed")
+
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(TASK_URL, {"as_of": moment.isoformat()})
+
+                self.assertEqual(len(history_queries(queries)), 1)
+
+    def test_as_of_invalid(self):
+        """Test an unparsable as_of returns an error."""
+        task = self.create_task()
+
+        res = self.client.get(detail_url(task.id), {"as_of": "yesterday"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("as_of", res.data)
@@ -0,0 +1,111 @@
+"""
+Tests for the task autocomplete API.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task
+
+
+AUTOCOMPLETE_URL = reverse("task:task-autocomplete")
+
+
+class TaskAutocompleteApiTests(TestCase):
+    """Test task name autocomplete."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="Test123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_tasks(self, *names):
+        """Create tasks with the given names and return them."""
+        return [Task.objects.create(user=self.user, name=name) for name in names]
+
+    def test_autocomplete_returns_id_and_name(self):
+        """Test matches contain only the id and the name of tasks."""
+        task, _ = self.create_tasks("Prepare invoice", "Call client")
+
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "VOIC"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [{"id": task.id, "name": task.name}])
+
+    def test_autocomplete_ranks_prefix_matches_first(self):
+        """Test names starting with the query come before other matches."""
+        inner, long_prefix, prefix = self.create_tasks(
+            "Send report", "Report quarterly numbers", "Report"
+        )
+
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "rep"})
+
+        self.assertEqual(
+            [task["id"] for task in res.data], [prefix.id, long_prefix.id, inner.id]
+        )
+
+    def test_autocomplete_short_query(self):
+        """Test queries below the minimum length return no matches."""
+        self.create_tasks("Report")
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(AUTOCOMPLETE_URL, {"q": "re"})
+
+        self.assertEqual(res.data, [])
+        self.assertEqual(len(queries), 0)
+
+    @patch("task.views.AUTOCOMPLETE_LIMIT", 2)
+    def test_autocomplete_limits_results(self):
+        """Test the number of matches is capped."""
+        self.create_tasks("Task one", "Task two", "Task three")
+
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "task"})
+
+        self.assertEqual(len(res.data), 2)
+
+    def test_autocomplete_narrows_cached_prefix(self):
+        """Test a longer query is answered from a complete cached prefix."""
+        _, report = self.create_tasks("Read docs", "Reading report")
+        self.client.get(AUTOCOMPLETE_URL, {"q": "rea"})
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(AUTOCOMPLETE_URL, {"q": "reading"})
+
+        self.assertEqual(res.data, [{"id": report.id, "name": report.name}])
+        self.assertEqual(len(queries), 0)
+
+    @patch("task.views.AUTOCOMPLETE_LIMIT", 1)
+    def test_autocomplete_queries_when_prefix_truncated(self):
+        """Test a truncated cached prefix is not used to answer a longer query."""
+        _, report = self.create_tasks("Read docs", "Reading report")
+        self.client.get(AUTOCOMPLETE_URL, {"q": "rea"})
+
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "reading"})
+
+        self.assertEqual(res.data, [{"id": report.id, "name": report.name}])
+
+    def test_autocomplete_uses_trigram_index(self):
+        """Test the name lookup can be served by the trigram index."""
+        self.create_tasks("Report")
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            sql, params = Task.objects.filter(
+                name__icontains="report"
+            ).query.sql_with_params()
+            cursor.execute(f"EXPLAIN {sql}", params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        self.assertIn("task_name_trgm_idx", plan)
@@ -0,0 +1,162 @@
+"""
+Tests for the bulk task API.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import history
+from core.models import (
+    Task,
+    TaskChangesHistory,
+    TaskHistoryOutbox,
+    TaskTombstone,
+)
+
+
+BULK_URL = reverse("task:task-bulk")
+
+
+def create_user(**kwargs):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**kwargs)
+
+
+class BulkTaskApiTests(TestCase):
+    """Test creating, updating and deleting tasks in bulk."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.other = create_user(email="other@example.com", password="Test123")
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_update_delete(self):
+        """Test every operation of a bulk request is applied."""
+        task = Task.objects.create(user=self.user, name="Old", status="new")
+        removed = Task.objects.create(user=self.user, name="Removed")
+        payload = {
+            "create": [
+                {"name": "First", "assigned_to": [self.other.id]},
+                {"name": "Second", "status": "done", "description": "Text"},
+            ],
+            "update": [
+                {"id": task.id, "status": "done", "assigned_to": [self.user.id]}
+            ],
+            "delete": [removed.id],
+        }
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["updated"], [task.id])
+        self.assertEqual(res.data["deleted"], [removed.id])
+        first, second = Task.objects.filter(id__in=res.data["created"]).order_by("id")
+        self.assertEqual(first.user, self.user)
+        self.assertEqual(list(first.assigned_to.all()), [self.other])
+        self.assertEqual(first.assignee_ids, [self.other.id])
+        self.assertEqual(first.primary_assignee_email, "other@example.com")
+        self.assertEqual(second.status, "done")
+        self.assertEqual(second.description, "Text")
+        task.refresh_from_db()
+        self.assertEqual(task.name, "Old")
+        self.assertEqual(task.status, "done")
+        self.assertEqual(list(task.assigned_to.all()), [self.user])
+        self.assertEqual(task.assignee_ids, [self.user.id])
+        self.assertFalse(Task.objects.filter(id=removed.id).exists())
+
+    def test_bulk_update_queues_history(self):
+        """Test each updated task gets a history record of its prior state."""
+        tasks = [
+            Task.objects.create(user=self.user, name=f"Task {i}") for i in range(3)
+        ]
+        payload = {"update": [{"id": task.id, "status": "done"} for task in tasks]}
+
+        self.client.post(BULK_URL, payload, format="json")
+        history.drain_outbox(limit=100)
+
+        changes = TaskChangesHistory.objects.order_by("task_id")
+        self.assertEqual([change.task_id for change in changes], [t.id for t in tasks])
+        self.assertEqual(changes[0].changed_by, self.user)
+        self.assertEqual(changes[0].task_snapshot["status"], "new")
+
+    def test_bulk_delete_leaves_tombstones(self):
+        """Test tasks deleted in bulk are buried and published together."""
+        tasks = [
+            Task.objects.create(user=self.user, name=f"Task {i}") for i in range(3)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
+                BULK_URL, {"delete": [task.id for task in tasks]}, format="json"
+            )
+
+        self.assertEqual(
+            sorted(TaskTombstone.objects.values_list("task_id", flat=True)),
+            [task.id for task in tasks],
+        )
+        notifications = [
+            query["sql"] for query in queries if "pg_notify" in query["sql"]
+        ]
+        self.assertEqual(len(notifications), 1)
+        self.assertIn('"deleted"', notifications[0])
+
+    def test_bulk_query_count_does_not_grow(self):
+        """Test the number of queries does not depend on the number of items."""
+        counts = []
+        for size in (1, 20):
+            tasks = [
+                Task.objects.create(user=self.user, name="Task") for _ in range(size)
+            ]
+            payload = {
+                "create": [{"name": "New", "assigned_to": [self.other.id]}] * size,
+                "update": [
+                    {"id": task.id, "name": "Renamed", "assigned_to": [self.user.id]}
+                    for task in tasks
+                ],
+            }
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(BULK_URL, payload, format="json")
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_bulk_errors_are_reported_per_item(self):
+        """Test invalid items are reported by position and nothing is applied."""
+        task = Task.objects.create(user=self.user, name="Task")
+        payload = {
+            "create": [{"name": "Valid"}, {"name": "Bad", "assigned_to": [0]}],
+            "update": [{"id": task.id, "status": "done"}, {"id": 0}],
+            "delete": [task.id],
+        }
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["create"][0], {})
+        self.assertIn("assigned_to", res.data["create"][1])
+        self.assertIn("id", res.data["update"][0])
+        self.assertIn("id", res.data["update"][1])
+        self.assertIn("id", res.data["delete"][0])
+        self.assertEqual(Task.objects.count(), 1)
+        self.assertFalse(TaskHistoryOutbox.objects.exists())
+
+    def test_bulk_field_errors_are_reported_per_item(self):
+        """Test field validation errors keep the position of their item."""
+        payload = {"create": [{"name": "Valid"}, {"status": "unknown"}]}
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["create"][0], {})
+        self.assertIn("name", res.data["create"][1])
+        self.assertIn("status", res.data["create"][1])
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,121 @@
+"""
+Tests for the versioned cache of task responses.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task
+from task.cache import bump_version, get_version
+
+
+TASK_URL = reverse("task:task-list")
+BULK_URL = reverse("task:task-bulk")
+
+
+def detail_url(task_id):
+    """Create and return a task detail URL."""
+    return reverse("task:task-detail", args=[task_id])
+
+
+def create_user(**kwargs):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**kwargs)
+
+
+class TaskResponseCacheTests(TestCase):
+    """Test task list and detail responses are cached until tasks change."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(user=self.user, name="Task")
+
+    def assertCached(self, url, params=None, validator_queries=0):
+        """Assert a request is answered from the cache."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            len(queries), validator_queries, [query["sql"] for query in queries]
+        )
+        return res
+
+    def test_list_and_detail_are_cached(self):
+        """Test repeating a request returns the cached response."""
+        # The detail looks up the version of the task for its ETag.
+        for url, validator_queries in [(TASK_URL, 0), (detail_url(self.task.id), 1)]:
+            with self.subTest(url=url):
+                res = self.client.get(url)
+
+                cached = self.assertCached(url, validator_queries=validator_queries)
+                self.assertEqual(cached.data, res.data)
+
+    def test_query_string_is_normalized(self):
+        """Test the order of query parameters doesn't matter."""
+        self.client.get(TASK_URL, {"status": "new", "name": "Task"})
+
+        self.assertCached(TASK_URL, {"name": "Task", "status": "new"})
+
+    def test_cache_is_per_user(self):
+        """Test responses cached for one user aren't served to another."""
+        self.client.get(TASK_URL)
+        self.client.force_authenticate(create_user(email="other@example.com"))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(TASK_URL)
+
+        self.assertGreater(len(queries), 0)
+
+    def test_writes_invalidate_cache(self):
+        """Test every kind of write to tasks serves fresh responses."""
+        other = create_user(email="other@example.com", password="Test123")
+        writes = [
+            lambda: self.client.post(TASK_URL, {"name": "New"}),
+            lambda: self.client.patch(detail_url(self.task.id), {"name": "Renamed"}),
+            lambda: self.task.assigned_to.add(other),
+            lambda: self.client.post(
+                BULK_URL, {"update": [{"id": self.task.id, "status": "done"}]}, "json"
+            ),
+            lambda: other.delete(),
+            lambda: self.client.delete(detail_url(self.task.id)),
+        ]
+        for write in writes:
+            self.client.get(TASK_URL)
+            write()
+
+            res = self.client.get(TASK_URL)
+
+            expected = list(Task.objects.order_by("-id").values_list("id", "status"))
+            self.assertEqual(
+                [(task["id"], task["status"]) for task in res.data["results"]],
+                expected,
+            )
+            assigned = [task["assigned_to"] for task in res.data["results"]]
+            self.assertEqual(
+                assigned,
+                [
+                    [user.id for user in task.assigned_to.all()]
+                    for task in Task.objects.order_by("-id")
+                ],
+            )
+
+    def test_bump_version_again_on_commit(self):
+        """Test the version is bumped again once the transaction commits."""
+        version = get_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_version()
+            self.assertEqual(get_version(), version + 1)
+
+        self.assertEqual(get_version(), version + 2)
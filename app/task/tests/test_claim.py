@@ -0,0 +1,178 @@
+"""
+Tests for claiming tasks as a work queue.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task, TaskHistoryOutbox
+
+
+CLAIM_URL = reverse("task:task-claim")
+
+
+def create_user(**kwargs):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**kwargs)
+
+
+def claim_all(user, limit):
+    """Claim tasks as a user until none are left, and return their ids."""
+    client = APIClient()
+    client.force_authenticate(user)
+    claimed = []
+    try:
+        while True:
+            res = client.post(f"{CLAIM_URL}?status=new&limit={limit}")
+            if not res.data:
+                return claimed
+            claimed += [task["id"] for task in res.data]
+    finally:
+        connection.close()
+
+
+class ClaimTaskApiTests(TestCase):
+    """Test claiming the oldest tasks matching filters."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.other = create_user(email="other@example.com", password="Test123")
+        self.client.force_authenticate(self.user)
+
+    def test_claim_oldest_matching_tasks(self):
+        """Test the oldest matching tasks are started and assigned."""
+        first = Task.objects.create(user=self.other, name="First")
+        Task.objects.create(user=self.other, name="Done", status="done")
+        second = Task.objects.create(user=self.other, name="Second")
+        second.assigned_to.add(self.other)
+        Task.objects.create(user=self.other, name="Third")
+
+        res = self.client.post(f"{CLAIM_URL}?status=new&limit=2")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([task["id"] for task in res.data], [first.id, second.id])
+        self.assertEqual(res.data[1]["status"], "in_progress")
+        self.assertEqual(
+            res.data[1]["assigned_to"], sorted([self.user.id, self.other.id])
+        )
+        second.refresh_from_db()
+        self.assertEqual(second.status, "in_progress")
+        self.assertEqual(second.assignee_ids, sorted([self.user.id, self.other.id]))
+
+    def test_claim_new_tasks_by_default(self):
+        """Test a claim without a status only takes new tasks."""
+        Task.objects.create(user=self.other, name="Done", status="done")
+        Task.objects.create(user=self.other, name="Started", status="in_progress")
+        task = Task.objects.create(user=self.other, name="New")
+
+        res = self.client.post(CLAIM_URL)
+
+        self.assertEqual([claimed["id"] for claimed in res.data], [task.id])
+        self.assertEqual(
+            set(Task.objects.exclude(id=task.id).values_list("status", flat=True)),
+            {"done", "in_progress"},
+        )
+        self.assertEqual(list(self.user.tasks_assigned.all()), [task])
+
+    def test_claim_other_status(self):
+        """Test a claim asking for another status takes tasks with it."""
+        Task.objects.create(user=self.other, name="New")
+        task = Task.objects.create(user=self.other, name="Done", status="done")
+
+        res = self.client.post(f"{CLAIM_URL}?status=done")
+
+        self.assertEqual([claimed["id"] for claimed in res.data], [task.id])
+
+    def test_claim_queues_history(self):
+        """Test claiming queues the state before the claim for the history."""
+        task = Task.objects.create(user=self.other, name="Task")
+
+        self.client.post(CLAIM_URL)
+
+        entry = TaskHistoryOutbox.objects.get()
+        self.assertEqual(entry.task_id, task.id)
+        self.assertEqual(entry.changed_by, self.user)
+        self.assertEqual(entry.before["status"], "new")
+        self.assertEqual(entry.changed_fields, ["assigned_to", "status"])
+
+    def test_claim_nothing(self):
+        """Test claiming when no task matches returns an empty list."""
+        Task.objects.create(user=self.other, name="Done", status="done")
+
+        res = self.client.post(f"{CLAIM_URL}?status=new")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [])
+        self.assertFalse(TaskHistoryOutbox.objects.exists())
+
+    @override_settings(TASK_CLAIM_MAX_LIMIT=5)
+    def test_invalid_limit(self):
+        """Test limits outside of 1 and the maximum are rejected."""
+        for limit in ["0", "6", "many"]:
+            with self.subTest(limit=limit):
+                res = self.client.post(f"{CLAIM_URL}?limit={limit}")
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("limit", res.data)
+
+
+class ClaimTaskConcurrencyTests(TransactionTestCase):
+    """Test concurrent claims never take the same task."""
+
+    def setUp(self):
+        self.owner = create_user(email="owner@example.com", password="Test123")
+
+    def test_claim_skips_locked_tasks(self):
+        """Test a task locked by another transaction is skipped, not awaited."""
+        locked = Task.objects.create(user=self.owner, name="Locked")
+        free = Task.objects.create(user=self.owner, name="Free")
+        client = APIClient()
+        client.force_authenticate(self.owner)
+
+        worker = psycopg2.connect(**connection.get_connection_params())
+        try:
+            with worker.cursor() as cursor:
+                cursor.execute(
+                    "SELECT id FROM core_task WHERE id = %s FOR UPDATE", [locked.id]
+                )
+                res = client.post(CLAIM_URL)
+        finally:
+            worker.close()
+
+        self.assertEqual([task["id"] for task in res.data], [free.id])
+
+    def test_parallel_claims_have_no_duplicates(self):
+        """Test parallel workers claim every task exactly once."""
+        Task.objects.bulk_create(
+            Task(user=self.owner, name=f"Task {i}") for i in range(200)
+        )
+        workers = [
+            create_user(email=f"worker{i}@example.com", password="Test123")
+            for i in range(8)
+        ]
+
+        with ThreadPoolExecutor(len(workers)) as executor:
+            claims = list(executor.map(claim_all, workers, [3] * len(workers)))
+
+        claimed = [task_id for ids in claims for task_id in ids]
+        self.assertEqual(len(claimed), 200)
+        self.assertEqual(set(claimed), set(Task.objects.values_list("id", flat=True)))
+        for worker, ids in zip(workers, claims):
+            self.assertEqual(
+                set(
+                    Task.objects.filter(assigned_to=worker).values_list("id", flat=True)
+                ),
+                set(ids),
+            )
+        self.assertFalse(Task.objects.filter(status="new").exists())
+        self.assertEqual(TaskHistoryOutbox.objects.count(), 200)
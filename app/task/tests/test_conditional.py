@@ -0,0 +1,246 @@
+"""
+Tests for conditional requests of task resources.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.history import drain_outbox
+from core.models import Task
+
+
+TASK_URL = reverse("task:task-list")
+
+
+def detail_url(task_id):
+    """Create and return a task detail URL."""
+    return reverse("task:task-detail", args=[task_id])
+
+
+def create_user(**kwargs):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**kwargs)
+
+
+class ConditionalTaskApiTests(TestCase):
+    """Test ETag and Last-Modified validators of task responses."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(user=self.user, name="Task")
+
+    def get_etag(self, url):
+        """Request the URL and return the ETag of the response."""
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res["ETag"]
+
+    def test_retrieve_not_modified(self):
+        """Test a matching ETag is answered by one lookup without a body."""
+        etag = self.get_etag(detail_url(self.task.id))
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(detail_url(self.task.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(len(queries), 1)
+
+    def test_retrieve_not_modified_since(self):
+        """Test a matching Last-Modified date returns not modified."""
+        res = self.client.get(detail_url(self.task.id))
+
+        res = self.client.get(
+            detail_url(self.task.id), HTTP_IF_MODIFIED_SINCE=res["Last-Modified"]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_retrieve_modified(self):
+        """Test updates and assignee changes give the detail a new ETag."""
+        other = create_user(email="other@example.com", password="Test123")
+        writes = [
+            lambda: self.client.patch(detail_url(self.task.id), {"status": "done"}),
+            lambda: self.task.assigned_to.add(other),
+            lambda: other.tasks_assigned.clear(),
+        ]
+        for write in writes:
+            etag = self.get_etag(detail_url(self.task.id))
+            write()
+
+            res = self.client.get(detail_url(self.task.id), HTTP_IF_NONE_MATCH=etag)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(res["ETag"], etag)
+
+    def test_retrieve_modified_by_history(self):
+        """Test writing queued changes to the history gives a new ETag."""
+        self.client.patch(detail_url(self.task.id), {"status": "done"})
+        res = self.client.get(detail_url(self.task.id))
+        self.assertEqual(res.data["changes"], [])
+        self.assertNotIn("Last-Modified", res)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            drain_outbox(limit=10)
+        res = self.client.get(detail_url(self.task.id), HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["changes"]), 1)
+        self.assertIn("Last-Modified", res)
+
+    def test_etag_depends_on_query(self):
+        """Test the same task requested with other parameters has another ETag."""
+        etag = self.get_etag(detail_url(self.task.id))
+
+        res = self.client.get(
+            detail_url(self.task.id),
+            {"as_of": timezone.now().isoformat()},
+            HTTP_IF_NONE_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_missing_task(self):
+        """Test a missing task is not found whatever the validators."""
+        res = self.client.get(detail_url(0), HTTP_IF_NONE_MATCH="*")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_not_modified(self):
+        """Test the list is not modified until a task changes."""
+        etag = self.get_etag(TASK_URL)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(TASK_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 0)
+
+        Task.objects.create(user=self.user, name="New")
+        res = self.client.get(TASK_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class ConditionalTaskUpdateTests(TestCase):
+    """Test updates made against a version of the task with If-Match."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(user=self.user, name="Task")
+
+    def get_etag(self):
+        """Retrieve the task and return its ETag."""
+        return self.client.get(detail_url(self.task.id))["ETag"]
+
+    def test_update_matching_version(self):
+        """Test an update against the current version returns the next one."""
+        etag = self.get_etag()
+
+        res = self.client.patch(
+            detail_url(self.task.id), {"status": "done"}, HTTP_IF_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["ETag"], self.get_etag())
+        self.assertNotEqual(res["ETag"], etag)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, "done")
+        self.assertEqual(self.task.version, 2)
+
+    def test_update_stale_version(self):
+        """Test the second of two updates against one version fails."""
+        etag = self.get_etag()
+        self.client.patch(
+            detail_url(self.task.id), {"name": "First"}, HTTP_IF_MATCH=etag
+        )
+
+        for method in [self.client.patch, self.client.put]:
+            with self.subTest(method=method.__name__):
+                res = method(
+                    detail_url(self.task.id),
+                    {"name": "Second", "status": "done"},
+                    HTTP_IF_MATCH=etag,
+                )
+
+                self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.name, "First")
+        self.assertEqual(self.task.status, "new")
+        self.assertFalse(self.task.changes.exists())
+
+    def test_update_changed_while_processed(self):
+        """Test the version is checked by the update, not only when read."""
+        etag = self.get_etag()
+        stale = Task.objects.get(id=self.task.id)
+
+        def change_task(view):
+            Task.objects.filter(id=self.task.id).update(name="Concurrent", version=5)
+            return stale
+
+        with patch("task.views.TaskViewSet.get_object", change_task):
+            res = self.client.patch(
+                detail_url(self.task.id), {"status": "done"}, HTTP_IF_MATCH=etag
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, "new")
+
+    def test_update_any_version(self):
+        """Test updates without If-Match, or with any, write the fields sent."""
+        for headers in [{}, {"HTTP_IF_MATCH": "*"}]:
+            with self.subTest(headers=headers):
+                Task.objects.filter(id=self.task.id).update(name="Renamed")
+
+                res = self.client.patch(
+                    detail_url(self.task.id), {"status": "done"}, **headers
+                )
+
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.task.refresh_from_db()
+                self.assertEqual(self.task.name, "Renamed")
+                self.assertEqual(self.task.status, "done")
+
+    def test_writes_bump_version(self):
+        """Test saving a task and changing its assignees bump its version."""
+        self.task.name = "Saved"
+        self.task.save()
+        self.task.assigned_to.add(self.user)
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.version, 3)
+
+    def test_stale_save_bumps_row_version(self):
+        """Test saving a stale task moves past the version written since."""
+        stale = Task.objects.get(id=self.task.id)
+        etag = self.get_etag()
+        self.client.patch(
+            detail_url(self.task.id), {"status": "done"}, HTTP_IF_MATCH=etag
+        )
+        etag = self.get_etag()
+
+        stale.name = "Saved"
+        stale.save()
+
+        self.assertEqual(stale.version, 3)
+        res = self.client.patch(
+            detail_url(self.task.id), {"name": "Overwritten"}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
@@ -0,0 +1,146 @@
+"""
+Tests for the task events stream.
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from core.models import Task
+from task import events
+
+
+EVENTS_URL = reverse("task:events")
+EVENT_TIMEOUT = 5
+
+
+def create_user(**kwargs):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**kwargs)
+
+
+def parse_event(chunk):
+    """Return the name and data of a Server-Sent Event."""
+    lines = dict(line.split(": ", 1) for line in chunk.decode().split("\n") if line)
+    return lines["event"], json.loads(lines["data"])
+
+
+class TaskEventsApiTests(TransactionTestCase):
+    """Test task changes are pushed once committed."""
+
+    def setUp(self):
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.token = Token.objects.create(user=self.user)
+
+    def tearDown(self):
+        events.broadcaster.stop()
+
+    @asynccontextmanager
+    async def subscribe(self):
+        """Open the events stream and return a function reading its events."""
+        res = await self.async_client.get(
+            EVENTS_URL, headers={"authorization": f"Token {self.token.key}"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        chunks = aiter(res.streaming_content)
+
+        async def read():
+            return parse_event(await asyncio.wait_for(anext(chunks), EVENT_TIMEOUT))
+
+        self.assertEqual(await read(), ("ready", {}))
+        try:
+            yield read
+        finally:
+            await res.streaming_content.aclose()
+
+    async def test_stream_pushes_task_changes(self):
+        """Test creating, updating and deleting a task is pushed."""
+        async with self.subscribe() as read:
+            task = await Task.objects.acreate(user=self.user, name="Task")
+            self.assertEqual(
+                await read(), ("created", {"event": "created", "ids": [task.id]})
+            )
+
+            task.name = "Updated"
+            await task.asave()
+            self.assertEqual(
+                await read(), ("updated", {"event": "updated", "ids": [task.id]})
+            )
+
+            task_id = task.id
+            await task.adelete()
+            self.assertEqual(
+                await read(), ("deleted", {"event": "deleted", "ids": [task_id]})
+            )
+
+    async def test_stream_skips_rolled_back_changes(self):
+        """Test changes of a rolled back transaction are not pushed."""
+
+        @sync_to_async
+        def create_rolled_back():
+            with transaction.atomic():
+                Task.objects.create(user=self.user, name="Rolled back")
+                transaction.set_rollback(True)
+
+        async with self.subscribe() as read:
+            await create_rolled_back()
+            task = await Task.objects.acreate(user=self.user, name="Task")
+
+            self.assertEqual((await read())[1]["ids"], [task.id])
+
+    async def test_stream_pushes_assignee_changes(self):
+        """Test assigning a user to a task is pushed as an update."""
+        task = await Task.objects.acreate(user=self.user, name="Task")
+
+        async with self.subscribe() as read:
+            await self.user.tasks_assigned.aadd(task)
+
+            self.assertEqual(
+                await read(), ("updated", {"event": "updated", "ids": [task.id]})
+            )
+
+    async def test_stream_requires_authentication(self):
+        """Test the stream rejects missing and invalid tokens."""
+        for headers in [{}, {"authorization": "Token invalid"}]:
+            with self.subTest(headers=headers):
+                res = await self.async_client.get(EVENTS_URL, headers=headers)
+
+                self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BroadcasterTests(SimpleTestCase):
+    """Test the fan out of notifications to subscriber queues."""
+
+    def test_publish_reaches_every_subscriber(self):
+        """Test a payload is added to the queue of every subscriber."""
+        broadcaster = events.Broadcaster(events.CHANNEL, queue_size=2)
+        queues = [asyncio.Queue(2), asyncio.Queue(2)]
+        broadcaster.queues.update(queues)
+
+        broadcaster.publish("payload")
+
+        self.assertEqual([queue.get_nowait() for queue in queues], ["payload"] * 2)
+
+    def test_slow_subscriber_is_reset(self):
+        """Test a full queue is emptied, told to resync and unsubscribed."""
+        broadcaster = events.Broadcaster(events.CHANNEL, queue_size=1)
+        queue = asyncio.Queue(1)
+        broadcaster.queues.add(queue)
+
+        broadcaster.publish("first")
+        broadcaster.publish("second")
+        broadcaster.publish("third")
+
+        self.assertIsNone(queue.get_nowait())
+        self.assertTrue(queue.empty())
+        self.assertNotIn(queue, broadcaster.queues)
@@ -0,0 +1,146 @@
+"""
+Tests for the task export API.
+"""
+
+import csv
+import io
+import json
+import warnings
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Task
+
+
+EXPORT_URL = reverse("task:task-export")
+
+
+def create_user(**kwargs):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**kwargs)
+
+
+def read_content(res):
+    """Consume a streaming response and return its text."""
+    return b"".join(res.streaming_content).decode()
+
+
+class TaskExportApiTests(TestCase):
+    """Test exporting tasks."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.other = create_user(email="other@example.com", password="Test123")
+        self.client.force_authenticate(self.user)
+        self.task1 = Task.objects.create(user=self.user, name="First", status="new")
+        self.task2 = Task.objects.create(
+            user=self.user, name="Second", description="Desc", status="done"
+        )
+        self.task1.assigned_to.set([self.user, self.other])
+
+    def test_export_auth_required(self):
+        """Test auth is required to export tasks."""
+        res = APIClient().get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_ndjson(self):
+        """Test exporting tasks as newline delimited JSON."""
+        res = self.client.get(EXPORT_URL, {"format": "ndjson"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in read_content(res).splitlines()]
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "id": self.task1.id,
+                    "name": "First",
+                    "description": None,
+                    "status": "new",
+                    "user": self.user.id,
+                    "assigned_to": sorted([self.user.id, self.other.id]),
+                },
+                {
+                    "id": self.task2.id,
+                    "name": "Second",
+                    "description": "Desc",
+                    "status": "done",
+                    "user": self.user.id,
+                    "assigned_to": [],
+                },
+            ],
+        )
+
+    def test_export_csv(self):
+        """Test exporting tasks as CSV."""
+        res = self.client.get(EXPORT_URL, {"format": "csv"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(read_content(res))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["id"], str(self.task1.id))
+        self.assertEqual(rows[0]["assigned_to"], f"{self.user.id} {self.other.id}")
+        self.assertEqual(rows[1]["description"], "Desc")
+
+    def test_export_applies_filters(self):
+        """Test the export accepts task filters."""
+        res = self.client.get(EXPORT_URL, {"format": "ndjson", "status": "done"})
+
+        rows = [json.loads(line) for line in read_content(res).splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.task2.id])
+
+    @patch("task.views.EXPORT_CHUNK_SIZE", 1)
+    async def test_export_streams_under_asgi(self):
+        """Test the export is streamed in chunks by ASGI servers, not read whole."""
+        token = await Token.objects.acreate(user=self.user)
+        headers = {"Authorization": f"Token {token.key}"}
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            res = await AsyncClient().get(
+                EXPORT_URL, {"format": "ndjson"}, headers=headers
+            )
+            self.assertTrue(res.is_async)
+            chunks = [chunk async for chunk in res.streaming_content]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(chunks), 2)
+        rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.task1.id, self.task2.id])
+
+    def test_export_unknown_format(self):
+        """Test an unsupported export format returns an error."""
+        res = self.client.get(EXPORT_URL, {"format": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch("task.views.EXPORT_CHUNK_SIZE", 2)
+    def test_export_fetches_assignees_per_chunk(self):
+        """Test assignees are fetched once per chunk, not once per task."""
+        for i in range(4):
+            task = Task.objects.create(user=self.user, name=f"Task {i}")
+            task.assigned_to.add(self.other)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(EXPORT_URL, {"format": "ndjson"})
+            lines = read_content(res).splitlines()
+
+        assignee_queries = [
+            query for query in queries if "core_task_assigned_to" in query["sql"]
+        ]
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(len(assignee_queries), 3)
@@ -0,0 +1,186 @@
+"""
+Tests for sparse fieldsets and expanded fields of task responses.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task
+
+
+TASK_URL = reverse("task:task-list")
+
+
+def detail_url(task_id):
+    """Create and return a task detail URL."""
+    return reverse("task:task-detail", args=[task_id])
+
+
+def create_user(**kwargs):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**kwargs)
+
+
+def get_queries(client, url, params):
+    """Request the URL and return the response and the SQL of its queries."""
+    with CaptureQueriesContext(connection) as queries:
+        res = client.get(url, params)
+    return res, [query["sql"] for query in queries.captured_queries]
+
+
+class TaskFieldsTests(TestCase):
+    """Test limiting and expanding the fields of task responses."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.client.force_authenticate(self.user)
+        self.assignee = create_user(
+            email="assignee@example.com", password="Test123", name="Assignee"
+        )
+        self.task = Task.objects.create(
+            user=self.user, name="Task", description="A long description"
+        )
+        self.task.assigned_to.set([self.assignee])
+
+    def test_list_fields(self):
+        """Test the list only shows and loads the requested fields."""
+        res, queries = get_queries(self.client, TASK_URL, {"fields": "id,status"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [{"id": self.task.id, "status": "new"}])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("description", queries[0])
+        self.assertNotIn("core_user", queries[0])
+
+    def test_list_default_fields(self):
+        """Test the list shows every field and ids of users in one query by default."""
+        res, queries = get_queries(self.client, TASK_URL, {})
+
+        self.assertEqual(
+            res.data["results"],
+            [
+                {
+                    "id": self.task.id,
+                    "name": "Task",
+                    "assigned_to": [self.assignee.id],
+                    "status": "new",
+                }
+            ],
+        )
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("core_user", queries[0])
+
+    def test_list_fields_ordering(self):
+        """Test the columns the list is ordered by are loaded with the fields."""
+        Task.objects.create(user=self.assignee, name="Another")
+
+        res, queries = get_queries(
+            self.client, TASK_URL, {"fields": "id", "ordering": "user__email"}
+        )
+
+        self.assertEqual(
+            [task["id"] for task in res.data["results"]],
+            list(
+                Task.objects.order_by("user__email", "id").values_list("id", flat=True)
+            ),
+        )
+        self.assertEqual(len(queries), 1)
+
+    def test_retrieve_fields(self):
+        """Test the detail skips the changes when they are not requested."""
+        res, queries = get_queries(
+            self.client, detail_url(self.task.id), {"fields": "id,description"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data, {"id": self.task.id, "description": "A long description"}
+        )
+        self.assertFalse(any("core_taskchangeshistory" in sql for sql in queries))
+
+    def test_retrieve_expand(self):
+        """Test expanded fields nest the users."""
+        res = self.client.get(
+            detail_url(self.task.id),
+            {"fields": "id,user,assigned_to", "expand": "user,assigned_to"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            {
+                "id": self.task.id,
+                "user": {"id": self.user.id, "email": "user@example.com", "name": ""},
+                "assigned_to": [
+                    {
+                        "id": self.assignee.id,
+                        "email": "assignee@example.com",
+                        "name": "Assignee",
+                    }
+                ],
+            },
+        )
+
+    def test_list_expand(self):
+        """Test expanding the assignees of the list."""
+        res = self.client.get(TASK_URL, {"expand": "assigned_to"})
+
+        self.assertEqual(
+            res.data["results"][0]["assigned_to"],
+            [
+                {
+                    "id": self.assignee.id,
+                    "email": "assignee@example.com",
+                    "name": "Assignee",
+                }
+            ],
+        )
+
+    def test_unknown_fields(self):
+        """Test unknown fields are rejected."""
+        res = self.client.get(TASK_URL, {"fields": "id,changes"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", res.data)
+
+    def test_unknown_expand(self):
+        """Test only user fields can be expanded."""
+        res = self.client.get(detail_url(self.task.id), {"expand": "changes"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("expand", res.data)
+
+    def test_expand_as_of(self):
+        """Test expanded fields cannot be read as of a past moment."""
+        res = self.client.get(
+            TASK_URL, {"expand": "assigned_to", "as_of": "2024-01-01T00:00:00Z"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fields_as_of(self):
+        """Test fields limit tasks read as of a past moment."""
+        res = self.client.get(
+            TASK_URL, {"fields": "id,name", "as_of": "2999-01-01T00:00:00Z"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [{"id": self.task.id, "name": "Task"}])
+
+    def test_update_shows_every_field(self):
+        """Test fields only apply to reads."""
+        res = self.client.patch(
+            detail_url(self.task.id) + "?fields=id", {"status": "done"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("changes", res.data)
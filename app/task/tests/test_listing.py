@@ -0,0 +1,83 @@
+"""
+Tests for the task list built from rows instead of serializers.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import Task
+
+
+TASK_URL = reverse("task:task-list")
+
+
+def create_user(**kwargs):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**kwargs)
+
+
+class TaskListRowsTests(TestCase):
+    """Test the task list rows match the serialized tasks."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.client.force_authenticate(self.user)
+        other = create_user(email="another@example.com", password="Test123")
+        statuses = ["new", "in_progress", "done"]
+        for i in range(12):
+            task = Task.objects.create(
+                user=other if i % 2 else self.user,
+                name=f"Review report {i}" if i % 3 else f"Deploy ‘ünïcode’ {i}",
+                description="Quarterly review" if i % 4 else "",
+                status=statuses[i % 3],
+            )
+            task.assigned_to.set([self.user, other][: i % 3])
+
+    def get_both(self, params):
+        """Return the list content built from rows and from serializers."""
+        cache.clear()
+        rows = self.client.get(TASK_URL, params)
+        cache.clear()
+        with patch("task.views.TaskViewSet.use_list_rows", return_value=False):
+            serialized = self.client.get(TASK_URL, params)
+        return rows, serialized
+
+    def test_rows_match_serializer(self):
+        """Test the rows render byte for byte like the serializer output."""
+        cases = [
+            {},
+            {"page_size": 5},
+            {"fields": "id,assigned_to"},
+            {"fields": "status,name"},
+            {"ordering": "name"},
+            {"ordering": "-user__email,name"},
+            {"status": "done"},
+            {"assigned_to": self.user.id},
+            {"search": "review"},
+        ]
+        for params in cases:
+            with self.subTest(params=params):
+                rows, serialized = self.get_both(params)
+
+                self.assertEqual(rows.status_code, serialized.status_code)
+                self.assertEqual(rows.content, serialized.content)
+
+    def test_next_page_matches_serializer(self):
+        """Test the following pages match the serializer output."""
+        next_url = self.client.get(TASK_URL, {"page_size": 5}).data["next"]
+
+        cache.clear()
+        rows = self.client.get(next_url)
+        cache.clear()
+        with patch("task.views.TaskViewSet.use_list_rows", return_value=False):
+            serialized = self.client.get(next_url)
+
+        self.assertEqual(rows.content, serialized.content)
+        self.assertEqual(len(rows.data["results"]), 5)
@@ -0,0 +1,142 @@
+"""
+Tests for task list pagination.
+"""
+
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task
+
+
+TASK_URL = reverse("task:task-list")
+
+
+def create_user(**kwargs):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**kwargs)
+
+
+def collect_pages(client, params):
+    """Follow next links and return the ids of every page."""
+    pages = []
+    res = client.get(TASK_URL, params)
+    while True:
+        pages.append([task["id"] for task in res.data["results"]])
+        if not res.data["next"]:
+            return pages, res
+        res = client.get(res.data["next"])
+
+
+class KeysetPaginationTests(TestCase):
+    """Test paging through the task list with cursors."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.client.force_authenticate(self.user)
+        self.tasks = [
+            Task.objects.create(
+                user=self.user,
+                name=f"Task {i % 3}",
+                status="done" if i % 2 else "new",
+            )
+            for i in range(7)
+        ]
+
+    def test_pages_follow_id_descending(self):
+        """Test next links walk every task once in -id order."""
+        pages, _ = collect_pages(self.client, {"page_size": 3})
+
+        expected = sorted((task.id for task in self.tasks), reverse=True)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_previous_link_returns_prior_page(self):
+        """Test the previous link of a page leads back to the page before."""
+        first = self.client.get(TASK_URL, {"page_size": 3})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertIsNone(first.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+
+    def test_pagination_with_ordering_on_duplicate_values(self):
+        """Test ordering by a non-unique field neither skips nor repeats tasks."""
+        pages, _ = collect_pages(self.client, {"page_size": 2, "ordering": "-name"})
+
+        expected = list(
+            Task.objects.order_by("-name", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_pagination_with_ordering_on_nullable_relation(self):
+        """Test ordering by user email keeps tasks without a user."""
+        other = create_user(email="another@example.com", password="Test123")
+        Task.objects.create(user=None, name="Orphan")
+        Task.objects.create(user=other, name="Other")
+
+        pages, _ = collect_pages(
+            self.client, {"page_size": 2, "ordering": "user__email"}
+        )
+
+        expected = list(
+            Task.objects.order_by("user__email", "id").values_list("id", flat=True)
+        )
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_pagination_with_filter(self):
+        """Test cursors keep the filter of the original request."""
+        pages, _ = collect_pages(self.client, {"page_size": 2, "status": "done"})
+
+        expected = sorted(
+            (task.id for task in self.tasks if task.status == "done"), reverse=True
+        )
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_cursor_seeks_instead_of_offset(self):
+        """Test the next page is fetched by key comparison without OFFSET."""
+        first = self.client.get(TASK_URL, {"page_size": 3})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data["next"])
+
+        sql = [query["sql"] for query in queries if '"core_task"' in query["sql"]]
+        self.assertNotIn("OFFSET", sql[0])
+        self.assertIn('"core_task"."id" <', sql[0])
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor returns an error."""
+        res = self.client.get(TASK_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_bound_to_ordering(self):
+        """Test a cursor can not be reused with another ordering."""
+        first = self.client.get(TASK_URL, {"page_size": 3})
+        cursor = parse_qs(urlparse(first.data["next"]).query)["cursor"][0]
+
+        res = self.client.get(TASK_URL, {"cursor": cursor, "ordering": "name"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_pagination_with_search_rank(self):
+        """Test paging through search results follows the rank ordering."""
+        Task.objects.create(user=self.user, name="Report", description="report")
+        Task.objects.create(user=self.user, name="Report draft")
+        Task.objects.create(user=self.user, name="Draft", description="report")
+
+        pages, _ = collect_pages(self.client, {"page_size": 1, "search": "report"})
+
+        first = self.client.get(TASK_URL, {"page_size": 10, "search": "report"})
+        expected = [task["id"] for task in first.data["results"]]
+        self.assertEqual(len(expected), 3)
+        self.assertEqual(sum(pages, []), expected)
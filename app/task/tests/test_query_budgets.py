@@ -0,0 +1,195 @@
+"""
+Tests for the number of queries run by the task API.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Task, TaskChangesHistory
+from core.tests.query_budget import QueryBudgetMixin
+
+
+TASK_URL = reverse("task:task-list")
+CLAIM_URL = reverse("task:task-claim")
+BULK_URL = reverse("task:task-bulk")
+# Bulk requests notify and delete in chunks of 100 tasks or more, so their
+# budgets hold up to that many tasks.
+BULK_BUDGET_SIZES = [1, 10, 100]
+
+
+def detail_url(task_id):
+    """Create and return a task detail URL."""
+    return reverse("task:task-detail", args=[task_id])
+
+
+def changes_url(task_id):
+    """Create and return a task changes URL."""
+    return reverse("task:task-changes", args=[task_id])
+
+
+class TaskQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Test task endpoints run a fixed number of queries."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="Test123"
+        )
+        self.client = APIClient()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def seed(self, size):
+        """
+        Create ``size`` users and tasks, with the first task assigned to every
+        user and ``size`` history records. Return the first task.
+        """
+        User = get_user_model()
+        users = User.objects.bulk_create(
+            User(email=f"seed{size}-{i}@example.com", password="!") for i in range(size)
+        )
+        tasks = Task.objects.bulk_create(
+            Task(user=users[i], name=f"Task {size}-{i}") for i in range(size)
+        )
+        Task.assigned_to.through.objects.bulk_create(
+            [
+                Task.assigned_to.through(task_id=tasks[0].id, user_id=user.id)
+                for user in users
+            ]
+            + [
+                Task.assigned_to.through(task_id=task.id, user_id=user.id)
+                for task, user in zip(tasks[1:], users)
+            ]
+        )
+        TaskChangesHistory.objects.bulk_create(
+            TaskChangesHistory(
+                task=tasks[0],
+                changed_by=self.user,
+                task_snapshot={"name": f"Version {i}"},
+            )
+            for i in range(size)
+        )
+        # Bulk inserts skip the signals invalidating cached responses.
+        cache.clear()
+        return tasks[0]
+
+    def seed_tasks(self, size):
+        """Seed data of the given size and return its ``size`` tasks."""
+        first = self.seed(size)
+        return list(Task.objects.filter(id__gte=first.id).order_by("id"))
+
+    def test_list_query_budget(self):
+        """Test listing tasks reads their assignee ids in the same query."""
+        self.assertConstantQueryBudget(
+            2, self.seed, lambda task: self.client.get(TASK_URL)
+        )
+
+    def test_list_fields_query_budget(self):
+        """Test listing tasks without their assignees skips prefetching them."""
+        self.assertConstantQueryBudget(
+            2, self.seed, lambda task: self.client.get(TASK_URL, {"fields": "id"})
+        )
+
+    def test_list_expand_query_budget(self):
+        """Test listing tasks with their assignees expanded."""
+        self.assertConstantQueryBudget(
+            3,
+            self.seed,
+            lambda task: self.client.get(TASK_URL, {"expand": "assigned_to"}),
+        )
+
+    def test_cached_list_query_budget(self):
+        """Test listing tasks again only authenticates the request."""
+
+        def seed(size):
+            self.seed(size)
+            self.client.get(TASK_URL)
+
+        self.assertConstantQueryBudget(1, seed, lambda _: self.client.get(TASK_URL))
+
+    def test_list_next_page_query_budget(self):
+        """Test following the next link of the task list."""
+
+        def seed(size):
+            Task.objects.create(user=self.user, name="Oldest")
+            self.seed(size)
+            return self.client.get(TASK_URL, {"page_size": 1}).data["next"]
+
+        self.assertConstantQueryBudget(3, seed, self.client.get)
+
+    def test_retrieve_query_budget(self):
+        """Test retrieving a task with its embedded changes."""
+        self.assertConstantQueryBudget(
+            5, self.seed, lambda task: self.client.get(detail_url(task.id))
+        )
+
+    def test_retrieve_fields_query_budget(self):
+        """Test retrieving a task without its embedded changes."""
+        self.assertConstantQueryBudget(
+            3,
+            self.seed,
+            lambda task: self.client.get(detail_url(task.id), {"fields": "id,name"}),
+        )
+
+    def test_changes_query_budget(self):
+        """Test listing the changes of a task."""
+        self.assertConstantQueryBudget(
+            3, self.seed, lambda task: self.client.get(changes_url(task.id))
+        )
+
+    def test_claim_query_budget(self):
+        """Test claiming tasks, queueing their history and publishing them."""
+        self.assertConstantQueryBudget(
+            11,
+            self.seed,
+            lambda task: self.client.post(f"{CLAIM_URL}?limit=10"),
+        )
+
+    def test_update_query_budget(self):
+        """Test updating a task, queueing its history and publishing it."""
+        self.assertConstantQueryBudget(
+            10,
+            self.seed,
+            lambda task: self.client.patch(detail_url(task.id), {"status": "done"}),
+        )
+
+    def test_bulk_create_query_budget(self):
+        """Test creating tasks in bulk, whatever their number."""
+        self.assertConstantQueryBudget(
+            5,
+            self.seed_tasks,
+            lambda tasks: self.client.post(
+                BULK_URL,
+                {"create": [{"name": f"New {task.id}"} for task in tasks]},
+                format="json",
+            ),
+            sizes=BULK_BUDGET_SIZES,
+        )
+
+    def test_bulk_update_query_budget(self):
+        """Test updating tasks in bulk and queueing their history."""
+        self.assertConstantQueryBudget(
+            8,
+            self.seed_tasks,
+            lambda tasks: self.client.post(
+                BULK_URL,
+                {"update": [{"id": task.id, "status": "done"} for task in tasks]},
+                format="json",
+            ),
+            sizes=BULK_BUDGET_SIZES,
+        )
+
+    def test_bulk_delete_query_budget(self):
+        """Test deleting tasks in bulk, leaving their tombstones."""
+        self.assertConstantQueryBudget(
+            11,
+            self.seed_tasks,
+            lambda tasks: self.client.post(
+                BULK_URL, {"delete": [task.id for task in tasks]}, format="json"
+            ),
+            sizes=BULK_BUDGET_SIZES,
+        )
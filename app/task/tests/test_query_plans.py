@@ -0,0 +1,220 @@
+"""
+Tests that the queries run by the task API are served by indexes.
+"""
+
+import hashlib
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from core.assignees import fill_assignees
+from core.models import Task
+from task.views import TaskViewSet
+
+
+TASK_URL = reverse("task:task-list")
+AUTOCOMPLETE_URL = reverse("task:task-autocomplete")
+CHANGES_SINCE_URL = reverse("task:task-changes-since")
+SEED_USERS = 500
+SEED_TASKS = 20000
+LARGE_TABLES = ["core_task", "core_task_assigned_to", "core_taskchangeshistory"]
+# Sorting on a joined column or on unbounded text can't be served by an index
+# on core_task, so these orderings always sort the filtered rows.
+UNINDEXED_ORDERINGS = ["description", "user__email"]
+
+
+def detail_url(task_id):
+    """Create and return a task detail URL."""
+    return reverse("task:task-detail", args=[task_id])
+
+
+def changes_url(task_id):
+    """Create and return a task changes URL."""
+    return reverse("task:task-changes", args=[task_id])
+
+
+def seed_tasks(users, tasks):
+    """
+    Insert tasks spread over users and statuses with two assignees and
+    two history records each.
+
+    Tests run inside a transaction where VACUUM can't flush the pending list
+    of GIN indexes, so it's flushed by hand to get production-like plans.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO core_user
+                (email, name, password, is_active, is_staff, is_superuser)
+            SELECT 'seed' || i || '@example.com', 'Seed ' || i, '!', true,
+                false, false
+            FROM generate_series(1, %s) AS i
+            """,
+            [users],
+        )
+        cursor.execute(
+            """
+            INSERT INTO core_task (name, description, status, user_id, created_at)
+            SELECT 'Task ' || md5(i::text), 'Description ' || i,
+                (ARRAY['new', 'in_progress', 'done'])[1 + i %% 3],
+                (SELECT min(id) FROM core_user) + i %% %s,
+                now() - interval '3 hours'
+            FROM generate_series(1, %s) AS i
+            """,
+            [users, tasks],
+        )
+        cursor.execute(
+            """
+            INSERT INTO core_task_assigned_to (task_id, user_id)
+            SELECT task.id, (SELECT min(id) FROM core_user) + (task.id + k) %% %s
+            FROM core_task AS task CROSS JOIN (VALUES (0), (1)) AS offsets(k)
+            """,
+            [users],
+        )
+        cursor.execute(
+            """
+            INSERT INTO core_taskchangeshistory
+                (task_id, changed_by_id, change_date, is_snapshot, task_snapshot)
+            SELECT task.id, task.user_id, now() - k * interval '1 hour', true, '{}'
+            FROM core_task AS task CROSS JOIN (VALUES (1), (2)) AS offsets(k)
+            """
+        )
+        fill_assignees()
+        cursor.execute(
+            """
+            SELECT gin_clean_pending_list(indexrelid)
+            FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+            WHERE indrelid = 'core_task'::regclass AND relam = (
+                SELECT oid FROM pg_am WHERE amname = 'gin'
+            )
+            """
+        )
+        cursor.execute(
+            "ANALYZE core_user, core_task, core_task_assigned_to, "
+            "core_taskchangeshistory"
+        )
+
+
+def explain(sql):
+    """Return the plan PostgreSQL picks for a captured query."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN {sql}")
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+
+class TaskQueryPlanTests(TestCase):
+    """Test task endpoints avoid sequential scans on a large table."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_tasks(SEED_USERS, SEED_TASKS)
+        cls.user = get_user_model().objects.create_user(
+            email="user@example.com", password="Test123"
+        )
+        cls.task = Task.objects.order_by("id").first()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_plans(self, url, params=None):
+        """Request the URL and return the plans of the SELECTs it ran."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+
+        plans = [
+            (query["sql"], explain(query["sql"]))
+            for query in queries
+            if query["sql"].startswith("SELECT")
+        ]
+        return res, plans
+
+    def assertNoSeqScan(self, plans):
+        """Assert no plan reads a large table sequentially."""
+        for sql, plan in plans:
+            for table in LARGE_TABLES:
+                self.assertNotIn(f"Seq Scan on {table} ", f"{plan} ", f"{sql}\n{plan}")
+
+    def get_list_params(self):
+        """Return list query parameters covering every filter and ordering."""
+        digest = hashlib.md5(b"1").hexdigest()
+        params = [
+            {},
+            {"status": "done"},
+            {"user": self.task.user_id},
+            {"assigned_to": self.task.user_id},
+            {"search": digest},
+            {"name": digest[:8]},
+        ]
+        for field in TaskViewSet.ordering_fields:
+            if field not in UNINDEXED_ORDERINGS:
+                params += [{"ordering": field}, {"ordering": f"-{field}"}]
+
+        return params
+
+    def test_list_queries_use_indexes(self):
+        """Test listing tasks with any filter or ordering uses indexes."""
+        for params in self.get_list_params():
+            with self.subTest(params=params):
+                _, plans = self.get_plans(TASK_URL, params)
+
+                self.assertNoSeqScan(plans)
+
+    def test_next_page_queries_seek_with_index(self):
+        """Test following a cursor starts the index scan at the cursor."""
+        for params in self.get_list_params():
+            with self.subTest(params=params):
+                res = self.client.get(TASK_URL, params)
+                if not res.data["next"]:
+                    continue
+
+                _, plans = self.get_plans(res.data["next"])
+
+                self.assertNoSeqScan(plans)
+                self.assertIn("Index Cond", plans[0][1], plans[0][0])
+
+    def test_detail_queries_use_indexes(self):
+        """Test retrieving a task uses indexes."""
+        _, plans = self.get_plans(detail_url(self.task.id))
+
+        self.assertNoSeqScan(plans)
+
+    def test_as_of_queries_use_indexes(self):
+        """Test reading tasks at a past moment uses the history index."""
+        as_of = (timezone.now() - timedelta(minutes=90)).isoformat()
+
+        _, plans = self.get_plans(TASK_URL, {"as_of": as_of})
+        _, detail_plans = self.get_plans(detail_url(self.task.id), {"as_of": as_of})
+
+        self.assertNoSeqScan(plans + detail_plans)
+
+    def test_changes_queries_use_indexes(self):
+        """Test paging through the history of a task uses indexes."""
+        res, plans = self.get_plans(changes_url(self.task.id), {"page_size": 1})
+        _, next_plans = self.get_plans(res.data["next"])
+
+        self.assertNoSeqScan(plans + next_plans)
+
+    def test_changes_since_queries_use_indexes(self):
+        """Test syncing tasks from a cursor seeks with the timestamp index."""
+        res = self.client.get(CHANGES_SINCE_URL, {"page_size": 10})
+        _, plans = self.get_plans(
+            CHANGES_SINCE_URL, {"cursor": res.data["cursor"], "page_size": 10}
+        )
+
+        self.assertNoSeqScan(plans)
+        self.assertIn("task_updated_at_id_idx", plans[0][1], plans[0][0])
+
+    def test_autocomplete_query_uses_index(self):
+        """Test autocomplete lookups use the trigram index."""
+        digest = hashlib.md5(b"1").hexdigest()
+        _, plans = self.get_plans(AUTOCOMPLETE_URL, {"q": digest[:8]})
+
+        self.assertNoSeqScan(plans)
@@ -0,0 +1,188 @@
+"""
+Tests for syncing tasks changed since a cursor.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Task, TaskTombstone
+
+
+CHANGES_SINCE_URL = reverse("task:task-changes-since")
+BULK_URL = reverse("task:task-bulk")
+
+
+def detail_url(task_id):
+    """Create and return a task detail URL."""
+    return reverse("task:task-detail", args=[task_id])
+
+
+def create_user(**kwargs):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**kwargs)
+
+
+@override_settings(TASK_SYNC_LAG=0)
+class TaskSyncApiTests(TestCase):
+    """Test the changes-since endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.client.force_authenticate(self.user)
+        self.tasks = [
+            Task.objects.create(user=self.user, name=f"Task {i}") for i in range(3)
+        ]
+
+    def sync(self, cursor=None, **params):
+        """Request the changes since a cursor and return the response data."""
+        if cursor is not None:
+            params["cursor"] = cursor
+        res = self.client.get(CHANGES_SINCE_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_initial_sync_returns_every_task(self):
+        """Test syncing without a cursor returns every task, oldest change first."""
+        data = self.sync()
+
+        self.assertEqual(
+            [task["id"] for task in data["upserts"]], [t.id for t in self.tasks]
+        )
+        self.assertEqual(data["deletes"], [])
+        self.assertFalse(data["has_more"])
+        self.assertIn("updated_at", data["upserts"][0])
+
+    def test_sync_returns_nothing_when_unchanged(self):
+        """Test syncing again without changes returns nothing."""
+        cursor = self.sync()["cursor"]
+
+        data = self.sync(cursor)
+
+        self.assertEqual((data["upserts"], data["deletes"]), ([], []))
+
+    def test_sync_returns_updated_tasks(self):
+        """Test tasks updated after the cursor are returned."""
+        cursor = self.sync()["cursor"]
+        self.client.patch(detail_url(self.tasks[0].id), {"name": "Updated"})
+
+        data = self.sync(cursor)
+
+        self.assertEqual([task["id"] for task in data["upserts"]], [self.tasks[0].id])
+        self.assertEqual(data["upserts"][0]["name"], "Updated")
+
+    def test_sync_returns_tasks_with_changed_assignees(self):
+        """Test assigning a user to tasks returns them as upserts."""
+        cursor = self.sync()["cursor"]
+        assignee = create_user(email="assignee@example.com")
+        assignee.tasks_assigned.add(self.tasks[1])
+
+        data = self.sync(cursor)
+
+        self.assertEqual([task["id"] for task in data["upserts"]], [self.tasks[1].id])
+        self.assertEqual(data["upserts"][0]["assigned_to"], [assignee.id])
+
+    def test_sync_returns_tasks_of_changed_assignees(self):
+        """Test tasks whose assignee changed email or was deleted are returned."""
+        assignee = create_user(email="assignee@example.com")
+        assignee.tasks_assigned.add(self.tasks[1])
+        cursor = self.sync()["cursor"]
+        assignee.name = "Assignee"
+        assignee.save()
+
+        self.assertEqual(self.sync(cursor)["upserts"], [])
+
+        assignee.email = "renamed@example.com"
+        assignee.save()
+
+        data = self.sync(cursor)
+
+        self.assertEqual([task["id"] for task in data["upserts"]], [self.tasks[1].id])
+        cursor = data["cursor"]
+        assignee.delete()
+
+        data = self.sync(cursor)
+
+        self.assertEqual([task["id"] for task in data["upserts"]], [self.tasks[1].id])
+        self.assertEqual(data["upserts"][0]["assigned_to"], [])
+
+    def test_sync_returns_deleted_tasks(self):
+        """Test deleted tasks are returned as deletes from their tombstones."""
+        cursor = self.sync()["cursor"]
+        self.client.delete(detail_url(self.tasks[2].id))
+
+        data = self.sync(cursor)
+
+        self.assertEqual(data["upserts"], [])
+        self.assertEqual(data["deletes"], [self.tasks[2].id])
+
+    def test_sync_returns_tasks_changed_in_bulk(self):
+        """Test tasks updated and deleted in bulk are returned."""
+        cursor = self.sync()["cursor"]
+        self.client.post(
+            BULK_URL,
+            {
+                "update": [{"id": self.tasks[0].id, "status": "done"}],
+                "delete": [self.tasks[1].id],
+            },
+            format="json",
+        )
+
+        data = self.sync(cursor)
+
+        self.assertEqual([task["id"] for task in data["upserts"]], [self.tasks[0].id])
+        self.assertEqual(data["deletes"], [self.tasks[1].id])
+
+    def test_sync_pages_through_changes(self):
+        """Test a cut page is flagged and continued from its cursor."""
+        first = self.sync(page_size=2)
+        second = self.sync(first["cursor"], page_size=2)
+
+        self.assertTrue(first["has_more"])
+        self.assertFalse(second["has_more"])
+        self.assertEqual(
+            [task["id"] for task in first["upserts"] + second["upserts"]],
+            [task.id for task in self.tasks],
+        )
+
+    @override_settings(TASK_SYNC_LAG=60)
+    def test_sync_returns_recent_changes_again(self):
+        """Test changes within the sync lag are returned again, not skipped."""
+        cursor = self.sync()["cursor"]
+
+        data = self.sync(cursor)
+
+        self.assertEqual(
+            [task["id"] for task in data["upserts"]], [t.id for t in self.tasks]
+        )
+
+    def test_invalid_cursor(self):
+        """Test an invalid cursor returns not found."""
+        for cursor in ["invalid", "eyJ1IjoxfQ==", "eyJ1IjpbIngiLDFdLCJkIjpudWxsfQ=="]:
+            with self.subTest(cursor=cursor):
+                res = self.client.get(CHANGES_SINCE_URL, {"cursor": cursor})
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_sync_requires_authentication(self):
+        """Test syncing requires authentication."""
+        res = APIClient().get(CHANGES_SINCE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TaskTombstoneTests(TestCase):
+    """Test tombstones are left for deleted tasks."""
+
+    def test_deleting_user_leaves_tombstones_of_their_tasks(self):
+        """Test tasks deleted with their owner leave tombstones."""
+        user = create_user(email="user@example.com", password="Test123")
+        task = Task.objects.create(user=user, name="Task")
+
+        user.delete()
+
+        self.assertTrue(TaskTombstone.objects.filter(task_id=task.id).exists())
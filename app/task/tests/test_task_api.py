@@ -3,18 +3,22 @@ Tests for task API.
 """
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.db.models import Min
 from django.forms import model_to_dict
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from core import history
 from core.models import (
     Task,
     TaskChangesHistory,
+    TaskHistoryOutbox,
 )
 from task.serializers import (
     TaskSerializer,
@@ -31,6 +35,16 @@ def detail_url(task_id):
     return reverse("task:task-detail", args=[task_id])
 
 
+def changes_url(task_id):
+    """Create and return a task changes URL."""
+    return reverse("task:task-changes", args=[task_id])
+
+
+def change_detail_url(task_id, change_id):
+    """Create and return a task change detail URL."""
+    return reverse("task:task-change-detail", args=[task_id, change_id])
+
+
 def create_task(user, assigned_to=None, **kwargs):
     """Create and return a sample task."""
     defaults = {
@@ -51,6 +65,15 @@ def create_user(**kwargs):
     return get_user_model().objects.create_user(**kwargs)
 
 
+def write_queries(queries):
+    """Return the captured queries writing to the database."""
+    return [
+        query["sql"]
+        for query in queries
+        if query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+    ]
+
+
 class PublicTaskApiTests(TestCase):
     """Test unauthenticated API requests."""
 
@@ -85,7 +108,7 @@ class PrivateTaskApiTests(TestCase):
         tasks = Task.objects.all().order_by("-id")
         serializer = TaskSerializer(tasks, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_get_task_detail(self):
         """Test get task detail."""
@@ -203,6 +226,67 @@ class PrivateTaskApiTests(TestCase):
         task.refresh_from_db()
         self.assertEqual(task.user, self.user)
 
+    def test_unchanged_update_writes_nothing(self):
+        """Test resending the current values of a task writes nothing."""
+        other = create_user(email="other@example.com", password="Test123")
+        task = create_task(user=self.user, assigned_to=[other])
+        task.refresh_from_db()
+        payload = {
+            "name": task.name,
+            "description": task.description,
+            "status": task.status,
+            "assigned_to": [other.id],
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.put(detail_url(task.id), payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["assigned_to"], [other.id])
+        self.assertEqual(write_queries(queries), [])
+        self.assertEqual(Task.objects.get(id=task.id).version, task.version)
+        self.assertFalse(TaskHistoryOutbox.objects.exists())
+
+    def test_update_writes_changed_fields_only(self):
+        """Test an update only writes and records the fields it changes."""
+        task = create_task(user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.patch(
+                detail_url(task.id), {"name": task.name, "status": "done"}
+            )
+
+        (update,) = [sql for sql in write_queries(queries) if sql.startswith("UPDATE")]
+        self.assertIn('"status" =', update)
+        self.assertNotIn('"name" =', update)
+        self.assertEqual(TaskHistoryOutbox.objects.get().changed_fields, ["status"])
+
+    def test_update_assignees_applies_diff(self):
+        """Test changing assignees only removes and adds the ones that differ."""
+        kept = create_user(email="kept@example.com", password="Test123")
+        removed = create_user(email="removed@example.com", password="Test123")
+        added = create_user(email="added@example.com", password="Test123")
+        task = create_task(user=self.user, assigned_to=[kept, removed])
+        through = Task.assigned_to.through
+        kept_row = through.objects.get(task=task, user=kept)
+
+        res = self.client.patch(
+            detail_url(task.id), {"assigned_to": [kept.id, added.id]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["assigned_to"], sorted([kept.id, added.id]))
+        self.assertEqual(
+            set(through.objects.filter(task=task).values_list("id", "user_id")),
+            {
+                (kept_row.id, kept.id),
+                (through.objects.get(task=task, user=added).id, added.id),
+            },
+        )
+        task.refresh_from_db()
+        self.assertEqual(task.assignee_ids, sorted([kept.id, added.id]))
+        self.assertEqual(task.primary_assignee_email, "added@example.com")
+
     def test_delete_task(self):
         """Test deleting a task successful."""
         task = create_task(user=self.user)
@@ -219,6 +303,7 @@ class PrivateTaskApiTests(TestCase):
         payload = {"name": "updated test name"}
         url = detail_url(task.id)
         res = self.client.patch(url, payload)
+        history.drain_outbox(limit=100)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         changes = TaskChangesHistory.objects.filter(task=task)
@@ -236,6 +321,7 @@ class PrivateTaskApiTests(TestCase):
         payload = {"name": "Changed name"}
         url = detail_url(task.id)
         res = self.client.patch(url, payload)
+        history.drain_outbox(limit=100)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         changes = TaskChangesHistory.objects.filter(task=task)
@@ -263,11 +349,132 @@ class PrivateTaskApiTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data["changes"]), 15)
+        self.assertEqual(len(res.data["changes"]), 10)
         changes = TaskChangesHistory.objects.filter(task=task).order_by("-change_date")
-        serializer = TaskChangesHistorySerializer(changes, many=True)
+        serializer = TaskChangesHistorySerializer(changes[:10], many=True)
         self.assertEqual(res.data["changes"], serializer.data)
 
+    @override_settings(TASK_DETAIL_CHANGES=3)
+    def test_retrieve_task_changes_limit_configurable(self):
+        """Test the number of changes embedded in the detail is configurable."""
+        task = create_task(user=self.user)
+        for i in range(5):
+            TaskChangesHistory.objects.create(
+                task=task, changed_by=self.user, task_snapshot={"name": f"Old {i}"}
+            )
+
+        res = self.client.get(detail_url(task.id))
+
+        self.assertEqual(len(res.data["changes"]), 3)
+
+    def test_list_task_changes(self):
+        """Test paging through the change history of a task."""
+        task = create_task(user=self.user)
+        other_task = create_task(user=self.user)
+        now = timezone.now()
+        changes = [
+            TaskChangesHistory.objects.create(
+                task=task,
+                changed_by=self.user,
+                change_date=now - timezone.timedelta(hours=i % 2),
+                task_snapshot={"name": f"Old Task Name {i}"},
+            )
+            for i in range(5)
+        ]
+        TaskChangesHistory.objects.create(
+            task=other_task, changed_by=self.user, task_snapshot={}
+        )
+
+        res = self.client.get(changes_url(task.id), {"page_size": 2})
+        results = res.data["results"]
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            results += res.data["results"]
+
+        expected = sorted(
+            changes, key=lambda change: (change.change_date, change.id), reverse=True
+        )
+        serializer = TaskChangesHistorySerializer(expected, many=True)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(results, serializer.data)
+
+    @override_settings(TASK_HISTORY_SNAPSHOT_INTERVAL=5)
+    def test_update_task_stores_changed_fields_only(self):
+        """Test updates after the first one only store the fields they change."""
+        task = create_task(user=self.user, description="Long description")
+        self.client.patch(detail_url(task.id), {"status": "in_progress"})
+        self.client.patch(detail_url(task.id), {"status": "done"})
+        history.drain_outbox(limit=100)
+
+        first, second = TaskChangesHistory.objects.order_by("change_date", "id")
+        self.assertTrue(first.is_snapshot)
+        self.assertFalse(second.is_snapshot)
+        self.assertEqual(second.task_snapshot, {"status": "in_progress"})
+
+    def test_retrieve_task_change_rebuilds_snapshot(self):
+        """Test retrieving a change returns the full state before it."""
+        user2 = create_user(email="user2@example.com", password="Test123")
+        task = create_task(user=self.user, name="Original")
+        self.client.patch(detail_url(task.id), {"name": "Renamed"})
+        self.client.patch(detail_url(task.id), {"assigned_to": [user2.id]})
+        self.client.patch(detail_url(task.id), {"status": "done"})
+        history.drain_outbox(limit=100)
+        change = TaskChangesHistory.objects.order_by("change_date", "id")[1]
+
+        res = self.client.get(change_detail_url(task.id, change.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data["is_snapshot"])
+        self.assertEqual(
+            res.data["task_snapshot"],
+            {
+                "name": "Renamed",
+                "description": "Test description",
+                "status": "new",
+                "assigned_to": [],
+            },
+        )
+
+    def test_deleting_user_keeps_history(self):
+        """Test deleting a user keeps their changes for the other rebuilds."""
+        user2 = create_user(email="user2@example.com", password="Test123")
+        task = create_task(user=self.user, name="Original")
+        self.client.patch(detail_url(task.id), {"name": "Renamed"})
+        self.client.patch(detail_url(task.id), {"name": "Again"})
+        other = APIClient()
+        other.force_authenticate(user2)
+        other.patch(detail_url(task.id), {"status": "done"})
+        history.drain_outbox(limit=100)
+        changes = list(TaskChangesHistory.objects.order_by("change_date", "id"))
+
+        user2.delete()
+
+        res = self.client.get(change_detail_url(task.id, changes[1].id))
+        self.assertEqual(res.data["task_snapshot"]["status"], "new")
+        self.assertEqual(res.data["task_snapshot"]["name"], "Renamed")
+        last = TaskChangesHistory.objects.get(id=changes[2].id)
+        self.assertIsNone(last.changed_by)
+        self.assertIn("by a deleted user", str(last))
+        self.assertEqual(last.task_snapshot, {"status": "new"})
+
+    def test_retrieve_task_change_of_other_task(self):
+        """Test a change can only be retrieved through its own task."""
+        task = create_task(user=self.user)
+        other_task = create_task(user=self.user)
+        self.client.patch(detail_url(task.id), {"name": "Renamed"})
+        history.drain_outbox(limit=100)
+        change = TaskChangesHistory.objects.get(task=task)
+
+        res = self.client.get(change_detail_url(other_task.id, change.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_task_changes_not_found(self):
+        """Test listing changes of a missing task returns an error."""
+        res = self.client.get(changes_url(0))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_filter_task_by_assigned_user(self):
         """Test filtering tasks by assigned user."""
         user2 = create_user(email="example2@test.com", password="Test123")
@@ -285,10 +492,10 @@ class PrivateTaskApiTests(TestCase):
         serializer2 = TaskSerializer(task2)
         serializer3 = TaskSerializer(task3)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
-        self.assertEqual(len(res.data), 2)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
+        self.assertEqual(len(res.data["results"]), 2)
 
     def test_filter_task_by_name(self):
         """Test filtering tasks by name."""
@@ -302,10 +509,10 @@ class PrivateTaskApiTests(TestCase):
         serializer2 = TaskSerializer(task2)
         serializer3 = TaskSerializer(task3)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
-        self.assertIn(serializer3.data, res.data)
-        self.assertEqual(len(res.data), 2)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
+        self.assertIn(serializer3.data, res.data["results"])
+        self.assertEqual(len(res.data["results"]), 2)
 
     def test_filter_task_by_status(self):
         """Test filtering tasks by status."""
@@ -319,10 +526,10 @@ class PrivateTaskApiTests(TestCase):
         serializer2 = TaskSerializer(task2)
         serializer3 = TaskSerializer(task3)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
-        self.assertEqual(len(res.data), 2)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
+        self.assertEqual(len(res.data["results"]), 2)
 
     def test_sort_task_by_name(self):
         """Test sorting tasks by name."""
@@ -335,8 +542,8 @@ class PrivateTaskApiTests(TestCase):
         tasks = Task.objects.all().order_by("name")
         serializer = TaskSerializer(tasks, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
-        self.assertEqual(len(res.data), 3)
+        self.assertEqual(res.data["results"], serializer.data)
+        self.assertEqual(len(res.data["results"]), 3)
 
     def test_sort_tasks_by_status(self):
         """Test sorting tasks by status."""
@@ -349,8 +556,8 @@ class PrivateTaskApiTests(TestCase):
         tasks = Task.objects.all().order_by("status")
         serializer = TaskSerializer(tasks, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
-        self.assertEqual(len(res.data), 3)
+        self.assertEqual(res.data["results"], serializer.data)
+        self.assertEqual(len(res.data["results"]), 3)
 
     def test_sort_tasks_by_assigned_user(self):
         """Test sorting tasks by user."""
@@ -363,8 +570,78 @@ class PrivateTaskApiTests(TestCase):
 
         tasks = Task.objects.annotate(
             assigned_user_email=Min("assigned_to__email")
-        ).order_by("-assigned_user_email")
+        ).order_by("-assigned_user_email", "-id")
         serializer = TaskSerializer(tasks, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
-        self.assertEqual(len(res.data), 3)
+        self.assertEqual(res.data["results"], serializer.data)
+        self.assertEqual(len(res.data["results"]), 3)
+
+    def test_sort_tasks_by_primary_assignee(self):
+        """Test sorting tasks by the first email of their assignees."""
+        zed = create_user(email="zed@example.com", password="testpass")
+        amy = create_user(email="amy@example.com", password="testpass")
+        task1 = create_task(user=self.user, assigned_to=[zed])
+        task2 = create_task(user=self.user, assigned_to=[zed, amy])
+        task3 = create_task(user=self.user)
+
+        res = self.client.get(TASK_URL, {"ordering": "primary_assignee_email"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [task["id"] for task in res.data["results"]],
+            [task3.id, task2.id, task1.id],
+        )
+
+    def test_filter_task_by_description(self):
+        """Test filtering tasks by description."""
+        task1 = create_task(user=self.user, description="Buy fresh vegetables")
+        create_task(user=self.user, description="Walk the dog")
+
+        res = self.client.get(TASK_URL, {"description": "VEGETABLES"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [task["id"] for task in res.data["results"]],
+            [task1.id],
+        )
+
+    def test_search_tasks(self):
+        """Test full-text search matches stemmed words in name and description."""
+        task1 = create_task(user=self.user, name="Deploy backend services")
+        task2 = create_task(
+            user=self.user, name="Weekly sync", description="Deployment checklist"
+        )
+        create_task(user=self.user, name="Write report")
+
+        res = self.client.get(TASK_URL, {"search": "deploying"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [task["id"] for task in res.data["results"]],
+            [task1.id, task2.id],
+        )
+
+    def test_search_tasks_ranks_name_above_description(self):
+        """Test a match in the name ranks above a match in the description."""
+        task1 = create_task(user=self.user, name="Notes", description="invoice")
+        task2 = create_task(user=self.user, name="Invoice", description="Notes")
+
+        res = self.client.get(TASK_URL, {"search": "invoice"})
+
+        self.assertEqual(
+            [task["id"] for task in res.data["results"]],
+            [task2.id, task1.id],
+        )
+
+    def test_search_tasks_web_search_syntax(self):
+        """Test search supports quoted phrases and excluded words."""
+        task1 = create_task(user=self.user, name="Fix login page")
+        create_task(user=self.user, name="Fix signup page")
+        create_task(user=self.user, name="Page login fix")
+
+        res = self.client.get(TASK_URL, {"search": '"fix login" -signup'})
+
+        self.assertEqual(
+            [task["id"] for task in res.data["results"]],
+            [task1.id],
+        )
@@ -17,4 +17,7 @@ router.register("tasks", views.TaskViewSet)
 
 app_name = "task"
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("events/", views.task_events, name="events"),
+    path("", include(router.urls)),
+]
@@ -2,18 +2,36 @@
 Views for the task APIs.
 """
 
+import hashlib
+from collections import defaultdict
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Prefetch, Min
-from django.forms import model_to_dict
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Case, F, Prefetch, Value, When
+from django.db.models.functions import Length
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
 
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from rest_framework import serializers as drf_serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.filters import OrderingFilter
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
 
 from django_filters.rest_framework import DjangoFilterBackend
 
+from core import history
+from core.assignees import assignee_columns, refresh_assignees
 from core.models import (
     Task,
     TaskChangesHistory,
@@ -21,7 +39,73 @@ from core.models import (
 from task import (
     serializers,
     filters,
+    renderers,
+    events,
+    listing,
+    sync,
+)
+from task.cache import bump_version, cached_response
+from task.conditional import (
+    PreconditionFailed,
+    if_match_versions,
+    task_etag,
+    task_list_etag,
+    task_updated_at,
 )
+from task.pagination import KeysetPagination, TaskChangesPagination
+from task.signals import bulk_deletion
+from user.authentication import CachedTokenAuthentication
+
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = ["id", "name", "description", "status", "user", "assigned_to"]
+AUTOCOMPLETE_MIN_LENGTH = 3
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_CACHE_TIMEOUT = 10
+# Task columns a read limited with ``fields`` may load.
+LOADABLE_COLUMNS = {"id", "name", "description", "status", "user", "updated_at"}
+
+
+def parse_field_names(request, param, allowed):
+    """
+    Return the comma-separated field names of a query parameter, or None if
+    it is missing or empty.
+    """
+    value = request.query_params.get(param, "")
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if not names:
+        return None
+
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise drf_serializers.ValidationError(
+            {param: [f"Unknown fields: {', '.join(unknown)}."]}
+        )
+    return names
+
+
+async def iter_chunks_async(iterator, size):
+    """
+    Yield the joined items of a synchronous iterator, ``size`` at a time,
+    each chunk read in the thread of sync code.
+    """
+    next_chunk = sync_to_async(lambda: "".join(islice(iterator, size)))
+    while chunk := await next_chunk():
+        yield chunk
+
+
+def autocomplete_cache_key(query):
+    """Return the cache key of the autocomplete results for a query."""
+    return "task:autocomplete:" + hashlib.md5(query.encode()).hexdigest()
+
+
+def autocomplete_sort_key(query):
+    """Return a sort key ranking prefix matches and shorter names first."""
+    return lambda task: (
+        not task["name"].lower().startswith(query),
+        len(task["name"]),
+        task["id"],
+    )
 
 
 class TaskViewSet(viewsets.ModelViewSet):
@@ -29,52 +113,546 @@ class TaskViewSet(viewsets.ModelViewSet):
 
     serializer_class = serializers.TaskSerializer
     queryset = Task.objects.all().order_by("-id")
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = filters.TaskFilter
-    ordering_fields = ["id", "name", "description", "status", "user__email"]
+    pagination_class = KeysetPagination
+    ordering_fields = [
+        "id",
+        "name",
+        "description",
+        "status",
+        "user__email",
+        "primary_assignee_email",
+    ]
 
     def get_queryset(self):
-        """Return the queryset of tasks with optimized database queries."""
-        return (
-            Task.objects.annotate(assigned_user_email=Min("assigned_to__email"))
-            .select_related("user")
-            .prefetch_related(
-                Prefetch("assigned_to", queryset=get_user_model().objects.all())
+        """
+        Return the queryset of tasks, loading only what the response shows.
+
+        Reads limited with ``fields`` only load the columns shown and those
+        the list is ordered by, and skip the assignees when not shown. Users
+        are only joined when expanded or ordered by. Reads as of a past
+        moment leave out the tasks created after it.
+        """
+        fields, expand = self.get_field_selection()
+        ordering = [
+            term.strip().lstrip("-").split("__")[0]
+            for term in self.request.query_params.get("ordering", "").split(",")
+        ]
+        queryset = Task.objects.order_by("-id")
+        as_of = self.get_as_of()
+        if as_of is not None:
+            queryset = queryset.filter(created_at__lte=as_of)
+        if fields is not None and as_of is None:
+            columns = {"id", *ordering, *fields} & LOADABLE_COLUMNS
+            if "user" in expand:
+                columns.add("user")
+            queryset = queryset.only(*columns)
+        else:
+            fields = None
+
+        if "user" in expand or "user" in ordering:
+            queryset = queryset.select_related("user")
+        if fields is None or "assigned_to" in fields:
+            users = get_user_model().objects.order_by("id")
+            if "assigned_to" not in expand:
+                users = users.only("id")
+            queryset = queryset.prefetch_related(Prefetch("assigned_to", users))
+        return queryset
+
+    def get_field_selection(self):
+        """
+        Return the fields requested for a read, or None for every field,
+        and the fields to expand.
+        """
+        if self.action not in ("list", "retrieve"):
+            return None, set()
+
+        allowed = self.get_serializer_class().Meta.fields
+        fields = parse_field_names(self.request, "fields", allowed)
+        expand = parse_field_names(
+            self.request, "expand", serializers.EXPANDABLE_FIELDS
+        )
+        if expand and "as_of" in self.request.query_params:
+            raise drf_serializers.ValidationError(
+                {"expand": ["Expanding fields cannot be combined with as_of."]}
             )
-            .order_by("-id")
+        return fields, set(expand or [])
+
+    def get_serializer_context(self):
+        """Return the serializer context with the fields requested for a read."""
+        context = super().get_serializer_context()
+        fields, expand = self.get_field_selection()
+        if fields is not None:
+            context["fields"] = fields
+        if expand:
+            context["expand"] = expand
+        return context
+
+    def get_as_of(self):
+        """Return the ``as_of`` moment requested for a read, if any."""
+        value = self.request.query_params.get("as_of")
+        if value is None or self.action not in ("list", "retrieve"):
+            return None
+        try:
+            return drf_serializers.DateTimeField().to_internal_value(value)
+        except drf_serializers.ValidationError as error:
+            raise drf_serializers.ValidationError({"as_of": error.detail})
+
+    def get_serializer(self, *args, **kwargs):
+        """Return a serializer showing tasks as they were at ``as_of``."""
+        as_of = self.get_as_of()
+        if as_of is not None and args:
+            tasks = args[0] if kwargs.get("many") else [args[0]]
+            kwargs["context"] = {
+                **self.get_serializer_context(),
+                "as_of": as_of,
+                "snapshots": history.snapshots_as_of(tasks, as_of),
+            }
+
+        return super().get_serializer(*args, **kwargs)
+
+    @method_decorator(condition(etag_func=task_list_etag))
+    def list(self, request, *args, **kwargs):
+        """Return the task list, cached until tasks change."""
+        if self.use_list_rows():
+            return cached_response(request, self.list_rows)
+        return cached_response(
+            request, lambda: super(TaskViewSet, self).list(request, *args, **kwargs)
+        )
+
+    def use_list_rows(self):
+        """
+        Return whether the list can be built from rows instead of serializing
+        tasks, which it can unless it is read as of a past moment or expanded.
+        """
+        _, expand = self.get_field_selection()
+        return self.get_as_of() is None and not expand
+
+    def list_rows(self):
+        """Return the task list read with ``values()``, as ``TaskSerializer``."""
+        fields, _ = self.get_field_selection()
+        queryset = self.filter_queryset(Task.objects.order_by("-id"))
+        page = self.paginate_queryset(listing.list_values(queryset, fields))
+        return self.get_paginated_response(listing.build_rows(page, fields))
+
+    @method_decorator(
+        condition(etag_func=task_etag, last_modified_func=task_updated_at)
+    )
+    def retrieve(self, request, *args, **kwargs):
+        """Return a task, cached until tasks change."""
+        return cached_response(
+            request,
+            lambda: super(TaskViewSet, self).retrieve(request, *args, **kwargs),
         )
 
     def get_serializer_class(self):
         """Return the serializer class for request."""
-        if self.action == "list":
+        if self.action in ("list", "claim"):
             return serializers.TaskSerializer
 
         return serializers.TaskDetailSerializer
 
+    @action(detail=True, methods=["get"], pagination_class=TaskChangesPagination)
+    def changes(self, request, pk=None):
+        """Return the change history of a task, newest first."""
+        task = get_object_or_404(Task.objects.only("id"), pk=pk)
+        page = self.paginate_queryset(task.changes.all())
+        serializer = serializers.TaskChangesHistorySerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="changes-since",
+        url_name="changes-since",
+    )
+    def changes_since(self, request):
+        """
+        Return tasks upserted and ids of tasks deleted since ``cursor``.
+
+        Clients apply the upserts then the deletes, keep the returned cursor
+        for the next sync, and continue right away while ``has_more``.
+        """
+        page = sync.changes_since(
+            request.query_params.get("cursor"),
+            sync.get_page_size(request.query_params.get("page_size")),
+            Task.objects.prefetch_related("assigned_to"),
+        )
+        page["upserts"] = serializers.TaskSyncSerializer(
+            page["upserts"], many=True
+        ).data
+        return Response(page)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path=r"changes/(?P<change_pk>[0-9]+)",
+        url_name="change-detail",
+    )
+    def change_detail(self, request, pk=None, change_pk=None):
+        """Return a change of a task with the full state rebuilt from history."""
+        change = get_object_or_404(
+            TaskChangesHistory.objects.select_related("task"), task_id=pk, pk=change_pk
+        )
+        change.task_snapshot = history.rebuild_snapshot(change)
+        change.is_snapshot = True
+        serializer = serializers.TaskChangesHistorySerializer(change)
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[renderers.NDJSONRenderer, renderers.CSVRenderer],
+    )
+    def export(self, request):
+        """Stream every filtered task as NDJSON or CSV."""
+        queryset = self.filter_queryset(Task.objects.order_by("id"))
+        renderer = request.accepted_renderer
+        content = renderer.iter_rows(self.iter_export_rows(queryset), EXPORT_FIELDS)
+        if isinstance(request._request, ASGIRequest):
+            # ASGI servers read synchronous iterators whole before sending
+            # them, so chunks are pulled from the sync thread one at a time.
+            content = iter_chunks_async(content, EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(content, content_type=renderer.media_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="tasks.{renderer.format}"'
+        )
+        return response
+
+    def iter_export_rows(self, queryset):
+        """Yield export rows read through a server-side cursor in chunks."""
+        rows = queryset.values_list(
+            "id", "name", "description", "status", "user_id"
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        while chunk := list(islice(rows, EXPORT_CHUNK_SIZE)):
+            assigned_to = defaultdict(list)
+            assignments = Task.assigned_to.through.objects.filter(
+                task_id__in=[row[0] for row in chunk]
+            ).order_by("user_id")
+            for task_id, user_id in assignments.values_list("task_id", "user_id"):
+                assigned_to[task_id].append(user_id)
+
+            for row in chunk:
+                yield dict(zip(EXPORT_FIELDS, row + (assigned_to[row[0]],)))
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """Create, update and delete tasks in one transaction."""
+        with transaction.atomic():
+            serializer = serializers.TaskBulkSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            data = serializer.validated_data
+
+            created = self.perform_bulk_create(data["create"])
+            updated = self.perform_bulk_update(data["update"], data["tasks"])
+            with bulk_deletion():
+                Task.objects.filter(id__in=data["delete"]).delete()
+            bump_version()
+            events.notify("created", [task.id for task in created])
+            events.notify("updated", [task.id for task in updated])
+
+        return Response(
+            {
+                "created": [task.id for task in created],
+                "updated": [task.id for task in updated],
+                "deleted": data["delete"],
+            }
+        )
+
+    def perform_bulk_create(self, items):
+        """Insert tasks and their assignees with one query each."""
+        tasks = Task.objects.bulk_create(
+            Task(
+                user=self.request.user,
+                **{key: value for key, value in item.items() if key != "assigned_to"},
+            )
+            for item in items
+        )
+        self.set_bulk_assignees(
+            (task, item["assigned_to"])
+            for task, item in zip(tasks, items)
+            if "assigned_to" in item
+        )
+        return tasks
+
+    def perform_bulk_update(self, items, tasks):
+        """Update tasks and queue their history with one query per step."""
+        changes = []
+        fields = {"updated_at", "version"}
+        now = timezone.now()
+        for item in items:
+            task = tasks[item["id"]]
+            before = history.take_snapshot(task)
+            task.updated_at = now
+            task.version = F("version") + 1
+            for field, value in item.items():
+                if field not in ("id", "assigned_to"):
+                    setattr(task, field, value)
+                    fields.add(field)
+            changes.append((task, before, history.apply_changes(before, item)))
+
+        Task.objects.bulk_update([task for task, _, _ in changes], fields)
+        self.set_bulk_assignees(
+            (tasks[item["id"]], item["assigned_to"])
+            for item in items
+            if "assigned_to" in item
+        )
+        history.enqueue_changes(changes, self.request.user)
+        return [task for task, _, _ in changes]
+
+    def set_bulk_assignees(self, assignments):
+        """
+        Replace the assignees of tasks and refresh their assignee columns
+        with one update.
+        """
+        assignments = list(assignments)
+        if not assignments:
+            return
+
+        self.replace_assignees(assignments)
+        refresh_assignees(
+            Task.objects.filter(id__in=[task.id for task, _ in assignments])
+        )
+
+    def replace_assignees(self, assignments):
+        """
+        Replace the assignees of tasks with one delete and one insert, without
+        refreshing their assignee columns.
+        """
+        through = Task.assigned_to.through
+        through.objects.filter(
+            task_id__in=[task.id for task, _ in assignments]
+        ).delete()
+        through.objects.bulk_create(
+            through(task_id=task.id, user_id=user_id)
+            for task, user_ids in assignments
+            for user_id in set(user_ids)
+        )
+
+    @action(detail=False, methods=["post"])
+    def claim(self, request):
+        """
+        Claim the oldest tasks matching the filters for the caller, new
+        tasks unless another ``status`` is asked for.
+
+        Tasks locked by a concurrent claim are skipped rather than waited
+        for, so workers claiming at the same time never get the same task.
+        Claimed tasks are set in progress, assigned to the caller and their
+        change queued for the history in one transaction.
+        """
+        limit = self.get_claim_limit()
+        queryset = self.filter_queryset(self.get_queryset())
+        if "status" not in request.query_params:
+            queryset = queryset.filter(status="new")
+        with transaction.atomic():
+            tasks = list(
+                queryset.order_by("id").select_for_update(
+                    skip_locked=True, of=("self",)
+                )[:limit]
+            )
+            ids = [task.id for task in tasks]
+            if ids:
+                self.perform_claim(tasks)
+                bump_version()
+                events.notify("updated", ids)
+
+        claimed = self.get_queryset().filter(id__in=ids).order_by("id")
+        return Response(self.get_serializer(claimed, many=True).data)
+
+    def get_claim_limit(self):
+        """Return the number of tasks a claim asks for."""
+        field = drf_serializers.IntegerField(
+            min_value=1, max_value=settings.TASK_CLAIM_MAX_LIMIT
+        )
+        try:
+            return field.run_validation(self.request.query_params.get("limit", 1))
+        except drf_serializers.ValidationError as error:
+            raise drf_serializers.ValidationError({"limit": error.detail})
+
+    def perform_claim(self, tasks):
+        """Start and assign locked tasks to the caller with one query per step."""
+        user = self.request.user
+        now = timezone.now()
+        changes = []
+        for task in tasks:
+            before = history.take_snapshot(task)
+            after = history.apply_changes(
+                before,
+                {
+                    "status": "in_progress",
+                    "assigned_to": {*before["assigned_to"], user.pk},
+                },
+            )
+            changes.append((task, before, after))
+
+        through = Task.assigned_to.through
+        through.objects.bulk_create(
+            [through(task_id=task.id, user_id=user.pk) for task in tasks],
+            ignore_conflicts=True,
+        )
+        refresh_assignees(
+            Task.objects.filter(id__in=[task.id for task in tasks]),
+            status="in_progress",
+            updated_at=now,
+        )
+        history.enqueue_changes(changes, user, now)
+
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        """Return the ids and names of tasks whose name contains ``q``."""
+        query = request.query_params.get("q", "").strip().lower()
+        if len(query) < AUTOCOMPLETE_MIN_LENGTH:
+            return Response([])
+
+        return Response(self.get_autocomplete_results(query))
+
+    def get_autocomplete_results(self, query):
+        """Return autocomplete matches, narrowing a cached shorter prefix if any."""
+        cached = cache.get_many(
+            [
+                autocomplete_cache_key(query[:length])
+                for length in range(len(query), AUTOCOMPLETE_MIN_LENGTH - 1, -1)
+            ]
+        )
+        key = autocomplete_cache_key(query)
+        if key in cached:
+            return cached[key]
+
+        complete = next(
+            (found for found in cached.values() if len(found) < AUTOCOMPLETE_LIMIT),
+            None,
+        )
+        if complete is not None:
+            results = sorted(
+                (task for task in complete if query in task["name"].lower()),
+                key=autocomplete_sort_key(query),
+            )
+        else:
+            results = list(
+                Task.objects.filter(name__icontains=query)
+                .order_by(
+                    Case(When(name__istartswith=query, then=Value(0)), default=1),
+                    Length("name"),
+                    "id",
+                )
+                .values("id", "name")[:AUTOCOMPLETE_LIMIT]
+            )
+        cache.set(key, results, AUTOCOMPLETE_CACHE_TIMEOUT)
+
+        return results
+
     def perform_create(self, serializer):
         """Create a new task."""
         serializer.save(user=self.request.user)
 
-    def perform_update(self, serializer):
-        """Update a task and create a change history record."""
+    def update(self, request, *args, **kwargs):
+        """
+        Update a task, returning the ETag of its new version if ``If-Match``
+        named the version it was updated from.
+        """
+        partial = kwargs.pop("partial", False)
         task = self.get_object()
-        user = self.request.user
+        serializer = self.get_serializer(task, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        # Read the assignees again for the response.
+        task._prefetched_objects_cache = {}
 
-        task_snapshot = model_to_dict(
-            task, fields=["name", "description", "status", "assigned_to"]
+        res = Response(serializer.data)
+        if if_match_versions(request) is not None:
+            res["ETag"] = quote_etag(task_etag(request, task.pk))
+        return res
+
+    def perform_update(self, serializer):
+        """
+        Write the fields of a task that changed with one query and queue its
+        change for the history.
+
+        With ``If-Match`` the query only updates the task if it is still at
+        the version it was read at, so concurrent updates never overwrite
+        each other and no row lock is held across the request. An update
+        changing nothing writes nothing.
+        """
+        task = serializer.instance
+        data = serializer.validated_data
+        versions = if_match_versions(self.request)
+        if versions is not None and task.version not in versions:
+            raise PreconditionFailed()
+
+        before = history.take_snapshot(task)
+        after = history.apply_changes(before, data)
+        changed = history.diff_snapshots(before, after)
+        if not changed:
+            return
+
+        columns = {field: after[field] for field in changed if field != "assigned_to"}
+        tasks = Task.objects.filter(pk=task.pk)
+        if versions is None:
+            version = F("version") + 1
+        else:
+            tasks = tasks.filter(version=task.version)
+            version = task.version + 1
+        now = timezone.now()
+        with transaction.atomic():
+            update = dict(columns)
+            if "assigned_to" in changed:
+                self.diff_assignees(task, before["assigned_to"], after["assigned_to"])
+                update.update(assignee_columns())
+            if not tasks.update(**update, updated_at=now, version=version):
+                if versions is None:
+                    raise Http404
+                raise PreconditionFailed()
+
+            bump_version()
+            events.notify("updated", [task.pk])
+            history.enqueue_change(task, self.request.user, before, after)
+
+        for field, value in columns.items():
+            setattr(task, field, value)
+        task.updated_at = now
+        task.version = version
+
+    def diff_assignees(self, task, before, after):
+        """
+        Remove the assignees of a task missing from ``after`` and add those
+        missing from ``before``, leaving the others in place.
+        """
+        through = Task.assigned_to.through
+        removed = set(before) - set(after)
+        if removed:
+            through.objects.filter(task_id=task.pk, user_id__in=removed).delete()
+        through.objects.bulk_create(
+            through(task_id=task.pk, user_id=user_id)
+            for user_id in sorted(set(after) - set(before))
         )
-        if task_snapshot["assigned_to"]:
-            task_snapshot["assigned_to"] = list(
-                task.assigned_to.values_list("id", flat=True)
-            )
 
-        super().perform_update(serializer)
 
-        TaskChangesHistory.objects.create(
-            task=task,
-            changed_by=user,
-            task_snapshot=task_snapshot,
-            change_date=timezone.now(),
+async def task_events(request):
+    """
+    Stream the tasks created, updated and deleted as Server-Sent Events.
+
+    The stream is long-lived, so it is a plain async view served without
+    holding a thread, authenticated with the same tokens as the task API.
+    """
+    authentication = CachedTokenAuthentication()
+    try:
+        authenticated = await sync_to_async(authentication.authenticate)(request)
+    except AuthenticationFailed as error:
+        return JsonResponse({"detail": error.detail}, status=error.status_code)
+    if authenticated is None:
+        return JsonResponse(
+            {"detail": AuthenticationFailed.default_detail},
+            status=AuthenticationFailed.status_code,
+            headers={"WWW-Authenticate": authentication.authenticate_header(request)},
         )
+
+    response = StreamingHttpResponse(
+        events.stream(events.broadcaster.subscribe()),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,171 @@
+"""
+Token authentication served from caches.
+"""
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.routers import read_from_replicas
+
+
+def token_digest(key):
+    """Return the digest of a token, standing for it in cache keys."""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def token_cache_key(key):
+    """Return the shared cache key of a token, without the token in clear."""
+    return "user:token:" + token_digest(key)
+
+
+def auth_version_key(key):
+    """Return the shared cache key of the authentication version of a token."""
+    return "user:auth-version:" + token_digest(key)
+
+
+def get_auth_version(key):
+    """Return the authentication version of a token, creating it if missing."""
+    version_key = auth_version_key(key)
+    version = cache.get(version_key)
+    if version is None:
+        # Start from the clock so a lost version never matches an old entry.
+        cache.add(version_key, time.time_ns(), None)
+        version = cache.get(version_key)
+    return version
+
+
+def invalidate_token(key):
+    """
+    Invalidate a cached token in every process.
+
+    The version is dropped right away and again once the transaction
+    commits, so a token read before the commit can't be cached as current.
+    """
+    keys = [token_cache_key(key), auth_version_key(key)]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_user(user_id):
+    """Invalidate every cached token of a user in every process."""
+    for key in Token.objects.filter(user_id=user_id).values_list("key", flat=True):
+        invalidate_token(key)
+
+
+class LRUCache:
+    """Thread-safe in-process cache keeping the most recently used entries."""
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value of a key, or None if missing or expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry if full."""
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        """Remove a key if present."""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry."""
+        with self.lock:
+            self.entries.clear()
+
+
+local_tokens = LRUCache(
+    settings.TOKEN_AUTH_CACHE_SIZE, settings.TOKEN_AUTH_CACHE_TIMEOUT
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication keeping authenticated tokens in a bounded
+    in-process LRU backed by the shared cache.
+
+    Entries carry the authentication version of their token. A cached token
+    is only trusted while that version is current, so invalidating a token
+    or its user takes effect in every process at once, at the cost of one
+    shared cache read per request instead of a database query.
+    """
+
+    def authenticate_credentials(self, key):
+        """Return the user and token of a key, from the caches if possible."""
+        cache_key = token_cache_key(key)
+        entry = local_tokens.get(cache_key)
+        if entry is None:
+            entry = cache.get(cache_key)
+            if entry is not None:
+                local_tokens.set(cache_key, entry)
+        if entry is not None:
+            user, token, version = entry
+            if version == cache.get(auth_version_key(key)):
+                # Requests may change their user, so they get their own copy.
+                user, token = copy.copy(user), copy.copy(token)
+                token.user = user
+                return user, token
+
+        # A lagging replica could return a token created or invalidated
+        # moments ago as it was before, to be cached as current.
+        with read_from_replicas(False):
+            entry = self.load_credentials(key)
+        local_tokens.set(cache_key, entry)
+        cache.set(cache_key, entry, settings.TOKEN_AUTH_CACHE_TIMEOUT)
+
+        user, token, _ = entry
+        return user, token
+
+    def load_credentials(self, key):
+        """
+        Return the user and token of a key, read from the database, with the
+        authentication version of the token.
+
+        The version is read before the token, so an invalidation committing
+        after the token was read drops the version the entry is cached with.
+        The user is read without its password hash, which stays out of the
+        caches.
+        """
+        version = get_auth_version(key)
+        model = self.get_model()
+        token = (
+            model.objects.select_related("user")
+            .defer("user__password")
+            .filter(key=key)
+            .first()
+        )
+        if token is None:
+            raise AuthenticationFailed(_("Invalid token."))
+        if not token.user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+        return token.user, token, version
@@ -0,0 +1,176 @@
+"""
+Tests for the cached token authentication.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import (
+    CachedTokenAuthentication,
+    LRUCache,
+    invalidate_user,
+    local_tokens,
+    token_cache_key,
+)
+
+
+ME_URL = reverse("user:me")
+
+
+def create_user(**kwargs):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**kwargs)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating with tokens served from caches."""
+
+    def setUp(self):
+        cache.clear()
+        local_tokens.clear()
+        self.user = create_user(email="user@example.com", password="Test123")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def count_queries(self):
+        """Request the authenticated user and return the queries it ran."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(ME_URL)
+
+        return res, len(queries)
+
+    def test_token_is_cached(self):
+        """Test a token is only looked up in the database once."""
+        _, first = self.count_queries()
+        res, second = self.count_queries()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+        self.assertEqual((first, second), (1, 0))
+
+    def test_token_cached_in_shared_cache(self):
+        """Test a process without the token in memory reads the shared cache."""
+        self.client.get(ME_URL)
+        local_tokens.clear()
+
+        res, queries = self.count_queries()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, 0)
+
+    def test_deleted_token_is_rejected(self):
+        """Test deleting a token rejects it right away."""
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res, _ = self.count_queries()
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_inactive_user_is_rejected(self):
+        """Test deactivating a user rejects their token right away."""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res, _ = self.count_queries()
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_invalidates_token(self):
+        """Test changing the password looks the token up again."""
+        self.client.get(ME_URL)
+        self.user.set_password("Changed123")
+        self.user.save()
+
+        res, queries = self.count_queries()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, 1)
+
+    def test_invalidated_while_loaded(self):
+        """Test a user invalidated after being read is not cached as current."""
+        load_credentials = CachedTokenAuthentication.load_credentials
+
+        def load_then_deactivate(authentication, key):
+            entry = load_credentials(authentication, key)
+            get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+            invalidate_user(self.user.pk)
+            return entry
+
+        with patch.object(
+            CachedTokenAuthentication, "load_credentials", load_then_deactivate
+        ):
+            self.client.get(ME_URL)
+
+        res, _ = self.count_queries()
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_not_cached(self):
+        """Test the cached user has no password hash."""
+        self.client.get(ME_URL)
+
+        user, _, _ = cache.get(token_cache_key(self.token.key))
+
+        self.assertNotIn("password", user.__dict__)
+
+    def test_change_password_of_cached_user(self):
+        """Test the cached user changes their password."""
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {"password": "Changed123"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("Changed123"))
+
+    def test_update_me_refreshes_cached_user(self):
+        """Test the cached user is not reused after the user is updated."""
+        self.client.patch(ME_URL, {"name": "Updated"})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["name"], "Updated")
+
+    def test_invalid_token(self):
+        """Test an unknown token is rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LRUCacheTests(SimpleTestCase):
+    """Test the in-process LRU cache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted when full."""
+        lru = LRUCache(size=2, timeout=60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+
+        self.assertEqual(lru.get("a"), 1)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("c"), 3)
+
+    def test_expires_entries(self):
+        """Test entries older than the timeout are dropped."""
+        lru = LRUCache(size=2, timeout=-1)
+        lru.set("a", 1)
+
+        self.assertIsNone(lru.get("a"))
@@ -0,0 +1,64 @@
+"""
+Tests for the number of queries run by the user API.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Task
+from core.tests.query_budget import QueryBudgetMixin
+
+
+TOKEN_URL = reverse("user:token")
+ME_URL = reverse("user:me")
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Test user endpoints run a fixed number of queries."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="Test123", name="Test name"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+
+    def seed(self, size):
+        """Create ``size`` tasks owned by and assigned to the user."""
+        tasks = Task.objects.bulk_create(
+            Task(user=self.user, name=f"Task {i}") for i in range(size)
+        )
+        self.user.tasks_assigned.add(*tasks)
+
+    def test_token_query_budget(self):
+        """Test obtaining the token of a user."""
+        payload = {"email": "user@example.com", "password": "Test123"}
+
+        self.assertConstantQueryBudget(
+            2, self.seed, lambda _: self.client.post(TOKEN_URL, payload)
+        )
+
+    def test_me_query_budget(self):
+        """Test retrieving the authenticated user with an uncached token."""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        def seed(size):
+            self.seed(size)
+            cache.clear()
+
+        self.assertConstantQueryBudget(1, seed, lambda _: self.client.get(ME_URL))
+
+    def test_cached_me_query_budget(self):
+        """Test retrieving the authenticated user again runs no query."""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        def seed(size):
+            self.seed(size)
+            self.client.get(ME_URL)
+
+        self.assertConstantQueryBudget(0, seed, lambda _: self.client.get(ME_URL))